@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
 
     'core',
@@ -55,6 +56,18 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Report the SQL, serialization and render time of every request in a
+# Server-Timing header and in the `core.timing` logger
+
+REQUEST_TIMING = bool(int(os.environ.get('REQUEST_TIMING', 0)))
+
+REQUEST_TIMING_SLOW_QUERY_MS = int(
+    os.environ.get('REQUEST_TIMING_SLOW_QUERY_MS', 100)
+)
+
+if REQUEST_TIMING:
+    MIDDLEWARE.insert(0, 'core.middleware.RequestTimingMiddleware')
+
 ROOT_URLCONF = 'app.urls'
 
 TEMPLATES = [
@@ -90,6 +103,47 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Cache used for the grade and classroom responses, and for how long
+
+RESPONSE_CACHE_ALIAS = 'default'
+
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+
+
+# Logging
+# https://docs.djangoproject.com/en/3.1/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -127,3 +181,96 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.0/howto/static-files/
 
 STATIC_URL = '/static/'
+
+
+# Member lists
+# Lists are only paginated when a page size is set here or requested by the
+# client through the `page_size` query parameter
+
+MEMBER_LIST_PAGE_SIZE = int(os.environ.get('MEMBER_LIST_PAGE_SIZE', 0)) or None
+
+MEMBER_LIST_MAX_PAGE_SIZE = 1000
+
+# Build the member lists straight from the database rows, skipping the
+# serializers. Can also be turned on per request with `?fast=1`
+
+MEMBER_FAST_LIST = bool(int(os.environ.get('MEMBER_FAST_LIST', 0)))
+
+# Read the member stats from a summary table kept current by signals,
+# instead of aggregating the member tables on every request. Run
+# `manage.py refresh_member_summary` after turning it on
+
+MEMBER_STATS_SUMMARY = bool(int(os.environ.get('MEMBER_STATS_SUMMARY', 0)))
+
+# Most members returned by a search, unless a smaller page size is asked
+
+MEMBER_SEARCH_MAX_RESULTS = 50
+
+# Maximum number of members created or updated by one bulk request
+
+MEMBER_BULK_MAX_ROWS = 10000
+
+# Number of rows fetched at a time when exporting the member lists
+
+MEMBER_EXPORT_CHUNK_SIZE = 2000
+
+# Number of members deactivated by each update of a bulk deactivation
+
+MEMBER_DEACTIVATE_CHUNK_SIZE = 2000
+
+# Minutes a class lasts. Classes in the same room, or with a student or
+# teacher in common, conflict when they start closer than this on a day
+
+CLASSROOM_DURATION_MINUTES = 60
+
+
+# Students moved to their next grade by each update of a promotion
+
+GRADE_PROMOTION_CHUNK_SIZE = 5000
+
+# Days after a promotion in which a new one is refused unless forced, so
+# the students aren't promoted twice in a school year
+
+GRADE_PROMOTION_INTERVAL_DAYS = int(
+    os.environ.get('GRADE_PROMOTION_INTERVAL_DAYS', 180)
+)
+
+
+# Most ids asked for in one request of the `batch` views of the students,
+# teachers and classrooms
+
+BATCH_RETRIEVE_MAX_IDS = int(os.environ.get('BATCH_RETRIEVE_MAX_IDS', 100))
+
+
+# Most changes returned by one request of the /changes/ delta endpoint
+
+SYNC_MAX_CHANGES = 1000
+
+
+# Background jobs
+# The function running each kind of job, called by the `run_jobs` workers
+# with the job and its params
+
+JOB_KINDS = {
+    'promote_students': 'grade.promotion.run_promotion_job',
+    'import_members': 'member.bulk.run_import_job',
+}
+
+# Processes started by `run_jobs` and workers in each of them. Each worker
+# holds a database connection
+
+JOB_WORKER_PROCESSES = int(os.environ.get('JOB_WORKER_PROCESSES', 1))
+
+JOB_WORKER_THREADS = int(os.environ.get('JOB_WORKER_THREADS', 4))
+
+# Seconds idle workers wait before looking for queued jobs again
+
+JOB_POLL_INTERVAL = 1.0
+
+# Seconds a running job stays taken without a heartbeat from its worker.
+# The jobs of workers that died are then queued again, and failed once run
+# JOB_MAX_ATTEMPTS times
+
+JOB_LEASE = 60
+
+JOB_MAX_ATTEMPTS = 3
@@ -0,0 +1,47 @@
+"""
+Production settings for app project.
+
+Select them with DJANGO_SETTINGS_MODULE=app.settings_production. Everything
+not changed here comes from app.settings.
+"""
+
+import os
+
+from app.settings import *  # noqa: F401,F403
+from app.settings import DATABASES, CACHES
+
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', 'localhost').split(',')
+
+
+# Database
+# Connections are kept open between requests for CONN_MAX_AGE seconds, and
+# checked at the start of each request, so one dropped by the server or the
+# pooler is replaced instead of failing the request
+
+DATABASES['default']['CONN_MAX_AGE'] = int(
+    os.environ.get('CONN_MAX_AGE', 60)
+)
+
+DB_CONN_HEALTH_CHECKS = True
+
+# Behind a pooler in transaction mode, like pgbouncer, consecutive
+# transactions may run on different server connections, which breaks
+# server side cursors
+
+if os.environ.get('DB_POOLER'):
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+
+# Cache
+# Every worker process must see the same response cache versions, so the
+# per process memory cache is replaced by the database one, unless another
+# backend is configured. Create its table with `manage.py createcachetable`
+
+if not os.environ.get('CACHE_BACKEND'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'response_cache',
+    }
@@ -6,4 +6,5 @@ urlpatterns = [
     path('grades/', include('grade.urls')),
     path('classrooms/', include('classroom.urls')),
     path('members/', include('member.urls')),
+    path('', include('core.urls')),
 ]
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 
 class ClassesConfig(AppConfig):
-    name = 'classes'
+    name = 'classroom'
+
+    def ready(self):
+        import classroom.signals  # noqa
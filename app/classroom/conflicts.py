@@ -0,0 +1,138 @@
+import datetime
+from collections import defaultdict
+from itertools import groupby
+
+from django.conf import settings
+from django.db.models import Q
+
+from classroom.models import Classroom
+from member.models import Student, Teacher
+
+
+def get_duration():
+    """Return the minutes a class lasts, used to find overlapping classes"""
+    return max(getattr(settings, 'CLASSROOM_DURATION_MINUTES', 60), 1)
+
+
+def get_days(days_of_week):
+    """Return the list of days in the comma separated string"""
+    return [int(day) for day in days_of_week.split(',') if day]
+
+
+def get_sessions(classroom_id, days_of_week, time):
+    """Return the (day, start minute, classroom id) sessions of a class"""
+    start = time.hour * 60 + time.minute
+    return [(day, start, classroom_id) for day in get_days(days_of_week)]
+
+
+def overlapping_sessions(sessions, duration):
+    """Yield the (first id, second id, day) of the overlapping sessions
+
+    The sessions are swept in (day, start) order keeping a window of the
+    ones still running, so the cost is O(n log n) plus the number of
+    overlaps found, instead of comparing every pair.
+    """
+    window = []
+    for day, start, classroom_id in sorted(sessions):
+        window = [
+            session for session in window
+            if session[0] == day and session[1] + duration > start
+        ]
+        for _, _, other_id in window:
+            if other_id != classroom_id:
+                yield min(other_id, classroom_id), \
+                    max(other_id, classroom_id), day
+        window.append((day, start, classroom_id))
+
+
+def _group_overlaps(overlaps):
+    """Return the {(first id, second id): sorted days} of the overlaps"""
+    pairs = defaultdict(set)
+    for first, second, day in overlaps:
+        pairs[(first, second)].add(day)
+    return {pair: sorted(days) for pair, days in pairs.items()}
+
+
+def find_conflicts():
+    """Return the room, student and teacher schedule conflicts
+
+    Rooms booked by two classes at the same time are listed under `rooms`,
+    members enrolled in two classes at the same time under `students` and
+    `teachers`. Each conflict names the pair of classrooms and the days
+    they overlap.
+    """
+    duration = get_duration()
+    sessions = {}
+    sessions_by_room = defaultdict(list)
+
+    rows = Classroom.objects.values_list('id', 'room', 'days_of_week', 'time')
+    for classroom_id, room, days_of_week, time in rows.iterator():
+        sessions[classroom_id] = get_sessions(classroom_id, days_of_week, time)
+        sessions_by_room[room].extend(sessions[classroom_id])
+
+    conflicts = {'rooms': []}
+    for room, room_sessions in sessions_by_room.items():
+        pairs = _group_overlaps(overlapping_sessions(room_sessions, duration))
+        conflicts['rooms'].extend(
+            {'room': room, 'classrooms': list(pair), 'days': days}
+            for pair, days in pairs.items()
+        )
+
+    for key, model in [('students', Student), ('teachers', Teacher)]:
+        conflicts[key] = []
+        field = model.classes.field
+        source = field.m2m_field_name() + '_id'
+        enrollments = field.remote_field.through.objects \
+            .values_list(source, 'classroom_id') \
+            .order_by(source)
+
+        for member_id, rows in groupby(enrollments.iterator(), lambda r: r[0]):
+            member_sessions = [
+                session
+                for _, classroom_id in rows
+                for session in sessions[classroom_id]
+            ]
+            pairs = _group_overlaps(
+                overlapping_sessions(member_sessions, duration)
+            )
+            conflicts[key].extend(
+                {'member': member_id, 'classrooms': list(pair), 'days': days}
+                for pair, days in pairs.items()
+            )
+
+    return conflicts
+
+
+def find_classroom_conflicts(room, days_of_week, time, instance=None):
+    """Return the classrooms clashing with a class at the given schedule
+
+    Returns a (room conflicts, member conflicts) pair of classroom lists:
+    the classes booking the same room at the same time, and the classes
+    sharing a student or teacher with the instance at the same time.
+    """
+    duration = datetime.timedelta(minutes=get_duration())
+    start = datetime.datetime.combine(datetime.date.today(), time)
+
+    candidates = Classroom.objects.filter(days_of_week__overlaps=days_of_week)
+    if (start - duration).date() == start.date():
+        candidates = candidates.filter(time__gt=(start - duration).time())
+    if (start + duration).date() == start.date():
+        candidates = candidates.filter(time__lt=(start + duration).time())
+
+    if instance is None or instance.pk is None:
+        return list(candidates.filter(room=room).order_by('id')), []
+
+    candidates = candidates.exclude(pk=instance.pk)
+    room_conflicts = list(candidates.filter(room=room).order_by('id'))
+
+    condition = Q()
+    for model in [Student, Teacher]:
+        through = model.classes.through
+        source = model.classes.field.m2m_field_name() + '_id'
+        members = through.objects.filter(classroom=instance).values(source)
+        condition |= Q(id__in=through.objects
+                       .filter(**{f'{source}__in': members})
+                       .values('classroom_id'))
+    member_conflicts = list(candidates.filter(condition).order_by('id'))
+
+    return room_conflicts, member_conflicts
@@ -0,0 +1,88 @@
+from django import forms
+from django.db import models
+from django.utils.functional import cached_property
+
+
+# Bits available for days in a positive small integer
+MAX_DAY = 15
+
+
+def days_to_mask(days):
+    """Return the bitmask of a comma separated list of days, like "1,3,5"
+
+    Day 1 is stored in the lowest bit. None is returned when the string is
+    not a list of days that fits the mask.
+    """
+    mask = 0
+    try:
+        for day in str(days).split(','):
+            day = int(day)
+            if day < 1 or day > MAX_DAY:
+                return None
+            mask |= 1 << (day - 1)
+    except ValueError:
+        return None
+
+    return mask
+
+
+def mask_to_days(mask):
+    """Return the sorted comma separated list of days set in the bitmask"""
+    return ','.join(
+        str(day) for day in range(1, MAX_DAY + 1)
+        if mask & (1 << (day - 1))
+    )
+
+
+def day_bit(day):
+    """Return the bitmask with only the given day set"""
+    return 1 << (day - 1)
+
+
+class WeekdaysField(models.PositiveSmallIntegerField):
+    """A set of weekdays stored as a bitmask
+
+    In Python the value is the comma separated list of days, like "1,3,5",
+    so it is validated and represented as the old character field was. In
+    the database it is a small integer that can be tested with the
+    `overlaps` lookup and served by partial indexes.
+    """
+    description = "Set of weekdays stored as a bitmask"
+
+    @cached_property
+    def validators(self):
+        # The integer range validators don't apply to the string value
+        return [*self.default_validators, *self._validators]
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return mask_to_days(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, str):
+            return value
+        return mask_to_days(value)
+
+    def get_prep_value(self, value):
+        if value is None or isinstance(value, int):
+            return value
+        return days_to_mask(value)
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **{
+            'form_class': forms.CharField,
+            'max_length': 30,
+            **kwargs,
+        })
+
+
+@WeekdaysField.register_lookup
+class WeekdaysOverlap(models.Lookup):
+    """Matches the rows sharing any of the given days"""
+    lookup_name = 'overlaps'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'({lhs} & {rhs}) <> 0', lhs_params + rhs_params
@@ -0,0 +1,90 @@
+import re
+
+import django.core.validators
+from django.db import migrations, models
+
+import classroom.fields
+import classroom.models
+
+
+def forwards(apps, schema_editor):
+    Classroom = apps.get_model('classroom', 'Classroom')
+    for obj in Classroom.objects.only('days_of_week'):
+        obj.days_mask = \
+            classroom.fields.days_to_mask(obj.days_of_week) or 0
+        obj.save(update_fields=['days_mask'])
+
+
+def backwards(apps, schema_editor):
+    Classroom = apps.get_model('classroom', 'Classroom')
+    for obj in Classroom.objects.only('days_mask'):
+        obj.days_of_week = classroom.fields.mask_to_days(obj.days_mask)
+        obj.save(update_fields=['days_of_week'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classroom',
+            name='days_mask',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='classroom',
+            name='days_of_week',
+            field=models.CharField(max_length=30, null=True),
+        ),
+        migrations.RunPython(forwards, backwards),
+        migrations.RemoveField(
+            model_name='classroom',
+            name='days_of_week',
+        ),
+        migrations.RenameField(
+            model_name='classroom',
+            old_name='days_mask',
+            new_name='days_of_week',
+        ),
+        migrations.AlterField(
+            model_name='classroom',
+            name='days_of_week',
+            field=classroom.fields.WeekdaysField(validators=[django.core.validators.RegexValidator(re.compile('^\\d+(?:,\\d+)*\\Z'), code='invalid', message='Enter only digits separated by commas.'), classroom.models.Classroom.validate_comma_separated_weekday_list]),
+        ),
+        migrations.AlterField(
+            model_name='classroom',
+            name='time',
+            field=models.TimeField(db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='classroom',
+            index=models.Index(condition=models.Q(days_of_week__overlaps=1), fields=['time'], name='classroom_day1_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classroom',
+            index=models.Index(condition=models.Q(days_of_week__overlaps=2), fields=['time'], name='classroom_day2_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classroom',
+            index=models.Index(condition=models.Q(days_of_week__overlaps=4), fields=['time'], name='classroom_day3_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classroom',
+            index=models.Index(condition=models.Q(days_of_week__overlaps=8), fields=['time'], name='classroom_day4_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classroom',
+            index=models.Index(condition=models.Q(days_of_week__overlaps=16), fields=['time'], name='classroom_day5_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classroom',
+            index=models.Index(condition=models.Q(days_of_week__overlaps=32), fields=['time'], name='classroom_day6_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classroom',
+            index=models.Index(condition=models.Q(days_of_week__overlaps=64), fields=['time'], name='classroom_day7_time_idx'),
+        ),
+    ]
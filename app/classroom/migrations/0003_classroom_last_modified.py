@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-17 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0002_classroom_weekdays_mask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classroom',
+            name='last_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
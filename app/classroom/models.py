@@ -4,6 +4,7 @@ from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
 from grade.models import Grade
+from classroom.fields import WeekdaysField, day_bit
 
 
 class Classroom(models.Model):
@@ -26,20 +27,30 @@ class Classroom(models.Model):
     name = models.CharField(max_length=255)
     identifier = models.CharField(max_length=50, unique=True)
     room = models.CharField(max_length=50)
-    days_of_week = models.CharField(
-        max_length=30,
+    days_of_week = WeekdaysField(
         validators=[
             validate_comma_separated_integer_list,
             validate_comma_separated_weekday_list
         ]
     )
-    time = models.TimeField()
+    time = models.TimeField(db_index=True)
     grade = models.ForeignKey(
         Grade,
         null=True,
         on_delete=models.SET_NULL,
         related_name='classes'
     )
+    last_modified = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['time'],
+                condition=models.Q(days_of_week__overlaps=day_bit(day)),
+                name=f'classroom_day{day}_time_idx',
+            )
+            for day in range(1, 8)
+        ]
 
     def __str__(self):
         """String represetation of the model"""
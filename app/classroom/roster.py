@@ -0,0 +1,57 @@
+from django.db.models import Prefetch, prefetch_related_objects
+
+from member.models import Student, Teacher
+
+
+# The member models enrolled in classrooms, by the roster key they go under
+ROSTER_MODELS = {
+    'students': Student,
+    'teachers': Teacher,
+}
+
+
+def get_enrolled_ids(classroom, model):
+    """Return the ids of the members of the model enrolled in the class"""
+    field = model.classes.field
+    return set(
+        field.remote_field.through.objects
+        .filter(classroom=classroom)
+        .values_list(field.m2m_field_name() + '_id', flat=True)
+    )
+
+
+def change_roster(classroom, model, add=(), remove=(), replace=None):
+    """Enroll and unenroll members of the model, returning the changes
+
+    Only the difference with the current roster is written: the members
+    not yet enrolled are added with a single bulk insert and the enrolled
+    ones removed with a single DELETE. With `replace`, the roster becomes
+    exactly those members. The enrollments go through the related manager,
+    so the m2m_changed receivers keep the members and caches current.
+    """
+    current = get_enrolled_ids(classroom, model)
+    if replace is not None:
+        add, remove = replace, current.difference(replace)
+
+    added = sorted(set(add) - current)
+    removed = sorted(current.intersection(remove))
+
+    manager = getattr(classroom, model.classes.field.related_query_name())
+    if removed:
+        manager.remove(*removed)
+    if added:
+        manager.add(*added)
+
+    return {'added': added, 'removed': removed}
+
+
+def prefetch_roster(classroom):
+    """Load the students and teachers of the class, sorted by name
+
+    The members of each kind are read with one query, and left in the
+    related managers' caches.
+    """
+    prefetch_related_objects([classroom], *[
+        Prefetch(key, model.objects.order_by('fullname', 'id'))
+        for key, model in ROSTER_MODELS.items()
+    ])
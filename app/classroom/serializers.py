@@ -1,27 +1,122 @@
+from django.utils.translation import gettext_lazy as _
+
 from rest_framework import serializers
 
+from classroom.conflicts import find_classroom_conflicts
+from classroom.fields import days_to_mask, mask_to_days
 from classroom.models import Classroom
+from classroom.roster import ROSTER_MODELS
 from grade.models import Grade
 from grade.serializers import GradeSerializer
+from core.sparse import SparseFieldsSerializerMixin
 
 
-class ClassroomListSerializer(serializers.ModelSerializer):
+class ClassroomListSerializer(SparseFieldsSerializerMixin,
+                              serializers.ModelSerializer):
     """Serializer for the list view of the classroom model"""
 
     grade = serializers.PrimaryKeyRelatedField(queryset=Grade.objects.all())
+    days_of_week = serializers.CharField(
+        max_length=30,
+        validators=Classroom._meta.get_field('days_of_week').validators
+    )
+
+    expandable_fields = {'grade': (GradeSerializer, {})}
 
     class Meta:
         model = Classroom
         fields = '__all__'
         read_only_fields = ['id']
 
+    def validate_days_of_week(self, value):
+        """Return the days sorted and without repetitions"""
+        return mask_to_days(days_to_mask(value))
+
+    def validate(self, attrs):
+        """Check the class doesn't clash with the schedule of others"""
+        schedule_fields = ['room', 'days_of_week', 'time']
+        if self.instance is not None and \
+                not any(field in attrs for field in schedule_fields):
+            return attrs
+
+        room, days_of_week, time = [
+            attrs[field] if field in attrs else getattr(self.instance, field)
+            for field in schedule_fields
+        ]
+        room_conflicts, member_conflicts = find_classroom_conflicts(
+            room, days_of_week, time, self.instance
+        )
+
+        errors = {}
+        if room_conflicts:
+            errors['room'] = _(
+                'The room is already booked at this time by %(classes)s'
+            ) % {'classes': ', '.join(map(str, room_conflicts))}
+        if member_conflicts:
+            errors['time'] = _(
+                'Members of this class attend %(classes)s at this time'
+            ) % {'classes': ', '.join(map(str, member_conflicts))}
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return attrs
+
+
+class ClassroomCountListSerializer(ClassroomListSerializer):
+    """Serializer for the list view with the number of members enrolled"""
+
+    student_count = serializers.IntegerField(read_only=True)
+    teacher_count = serializers.IntegerField(read_only=True)
 
-class ClassroomDetailSerializer(serializers.ModelSerializer):
+    field_columns = {'student_count': [], 'teacher_count': []}
+
+
+class ClassroomDetailSerializer(SparseFieldsSerializerMixin,
+                                serializers.ModelSerializer):
     """Serializer for the detail view of the classroom model"""
 
     grade = GradeSerializer(read_only=True)
+    days_of_week = serializers.CharField(read_only=True)
+
+    default_expand = ['grade']
+    expandable_fields = ClassroomListSerializer.expandable_fields
 
     class Meta:
         model = Classroom
         fields = '__all__'
         read_only_fields = ['id']
+
+
+class ClassroomRosterSerializer(serializers.Serializer):
+    """Serializer for the students and teachers of a roster change"""
+
+    students = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False
+    )
+    teachers = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False
+    )
+
+    def validate(self, attrs):
+        """Check the members exist, reading each kind with one query"""
+        if not attrs:
+            raise serializers.ValidationError(
+                _('Students or teachers are required.')
+            )
+
+        errors = {}
+        for key, ids in attrs.items():
+            found = ROSTER_MODELS[key].objects \
+                .filter(pk__in=ids) \
+                .values_list('pk', flat=True)
+            unknown = set(ids).difference(found)
+            if unknown:
+                errors[key] = _('Unknown ids: %(ids)s') % {
+                    'ids': ', '.join(map(str, sorted(unknown)))
+                }
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return attrs
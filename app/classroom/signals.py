@@ -0,0 +1,46 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, \
+    m2m_changed
+from django.dispatch import receiver
+
+from classroom.models import Classroom
+from grade.models import Grade
+from member.models import Student, Teacher
+from core.cache import invalidate_responses
+from core.changes import record_changes, touch_objects
+
+
+@receiver(post_save, sender=Classroom)
+@receiver(post_delete, sender=Classroom)
+@receiver(m2m_changed, sender=Student.classes.through)
+@receiver(m2m_changed, sender=Teacher.classes.through)
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Teacher)
+def invalidate_classroom_responses(sender, **kwargs):
+    """Discard the cached classroom responses when a classroom changes
+
+    Deleting a member removes its enrollments without m2m_changed, but
+    changes the counts of its classes.
+    """
+    if kwargs.get('action', 'post_').startswith('post_'):
+        invalidate_responses('classroom')
+
+
+@receiver(post_save, sender=Classroom)
+def record_change_on_save(sender, instance, **kwargs):
+    """Record a saved classroom for the delta endpoint"""
+    record_changes(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=Classroom)
+def record_change_on_delete(sender, instance, **kwargs):
+    """Record a deleted classroom for the delta endpoint"""
+    record_changes(sender, [instance.pk], deleted=True)
+
+
+@receiver(pre_delete, sender=Grade)
+def touch_classrooms_on_grade_delete(sender, instance, **kwargs):
+    """Mark the classrooms losing their grade as modified"""
+    touch_objects(
+        Classroom,
+        Classroom.objects.filter(grade=instance).values_list('pk', flat=True)
+    )
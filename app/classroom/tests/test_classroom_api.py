@@ -15,6 +15,7 @@ from core.utils import \
 
 
 CLASSROOM_LIST_URL = reverse('classroom:classroom-list')
+CLASSROOM_BATCH_URL = reverse('classroom:classroom-batch')
 
 
 def classroom_detail_url(classroom_id):
@@ -127,3 +128,24 @@ class PrivateClassroomApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(classroom.name, payload['name'])
         self.assertEqual(classroom.room, payload['room'])
+
+    def test_batch_retrieve(self):
+        """Test retrieving many classrooms at once, in the order asked"""
+        classrooms = [sample_classroom(grade=sample_grade()) for _ in range(3)]
+        ids = [classrooms[2].id, classrooms[0].id, 0]
+
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                CLASSROOM_BATCH_URL,
+                {'ids': ','.join(map(str, ids))}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'],
+            ClassroomDetailSerializer(
+                [classrooms[2], classrooms[0]],
+                many=True
+            ).data
+        )
+        self.assertEqual(res.data['missing'], [0])
@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.utils import \
+    sample_classroom, sample_grade, sample_student, sample_user
+
+
+CLASSROOM_LIST_URL = reverse('classroom:classroom-list')
+
+
+def classroom_detail_url(classroom_id):
+    return reverse('classroom:classroom-detail', args=[classroom_id])
+
+
+class ClassroomResponseCacheTests(TestCase):
+    """Test the cache of the classroom api responses"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.classroom = sample_classroom(name='Physics')
+
+    def test_list_served_from_cache(self):
+        """Test a repeated list request does not query the database"""
+        res = self.client.get(CLASSROOM_LIST_URL)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(CLASSROOM_LIST_URL)
+
+        self.assertEqual(cached.data, res.data)
+
+    def test_cache_invalidated_on_save(self):
+        """Test saving a classroom discards the cached responses"""
+        self.client.get(classroom_detail_url(self.classroom.id))
+        self.classroom.name = 'Chemistry'
+        self.classroom.save()
+        res = self.client.get(classroom_detail_url(self.classroom.id))
+
+        self.assertEqual(res.data['name'], 'Chemistry')
+
+    def test_cache_invalidated_on_grade_change(self):
+        """Test changing a grade discards the classroom responses"""
+        self.client.get(classroom_detail_url(self.classroom.id))
+        grade = self.classroom.grade
+        grade.name = 'Renamed grade'
+        grade.save()
+        res = self.client.get(classroom_detail_url(self.classroom.id))
+
+        self.assertEqual(res.data['grade']['name'], 'Renamed grade')
+
+    def test_cache_invalidated_on_grade_delete(self):
+        """Test deleting a grade discards the classroom responses"""
+        self.client.get(CLASSROOM_LIST_URL)
+        self.classroom.grade.delete()
+        res = self.client.get(CLASSROOM_LIST_URL)
+
+        self.assertIsNone(res.data[0]['grade'])
+
+    def test_cache_invalidated_on_enrollment(self):
+        """Test changing the students of a classroom changes the ETag"""
+        res = self.client.get(CLASSROOM_LIST_URL)
+        sample_student().classes.add(self.classroom)
+        updated = self.client.get(
+            CLASSROOM_LIST_URL,
+            HTTP_IF_NONE_MATCH=res['ETag']
+        )
+
+        self.assertEqual(updated.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(updated['ETag'], res['ETag'])
+
+    def test_new_classroom_listed(self):
+        """Test a new classroom shows up in a previously cached list"""
+        self.client.get(CLASSROOM_LIST_URL)
+        sample_classroom(grade=sample_grade())
+        res = self.client.get(CLASSROOM_LIST_URL)
+
+        self.assertEqual(len(res.data), 2)
@@ -0,0 +1,180 @@
+import datetime
+
+from django.test import TestCase
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from classroom.conflicts import overlapping_sessions, find_conflicts
+from core.utils import \
+    sample_classroom_payload, \
+    sample_classroom, \
+    sample_grade, \
+    sample_student, \
+    sample_teacher, \
+    sample_user
+
+
+CLASSROOM_LIST_URL = reverse('classroom:classroom-list')
+CONFLICTS_URL = reverse('classroom:classroom-conflicts')
+
+
+def classroom_detail_url(classroom_id):
+    return reverse('classroom:classroom-detail', args=[classroom_id])
+
+
+class OverlappingSessionsTests(TestCase):
+    """Test the sweep over the class sessions"""
+
+    def test_overlapping_sessions(self):
+        """Test only the sessions starting closer than the duration overlap"""
+        sessions = [
+            (1, 540, 1),
+            (1, 570, 2),
+            (1, 600, 3),
+            (2, 540, 4),
+            (1, 540, 5),
+        ]
+        self.assertEqual(
+            sorted(overlapping_sessions(sessions, 60)),
+            [(1, 2, 1), (1, 5, 1), (2, 3, 1), (2, 5, 1)]
+        )
+
+    def test_same_classroom_does_not_overlap(self):
+        """Test the sessions of a classroom don't conflict with themselves"""
+        sessions = [(1, 540, 1), (1, 540, 1)]
+        self.assertEqual(list(overlapping_sessions(sessions, 60)), [])
+
+
+class FindConflictsTests(TestCase):
+    """Test finding the conflicts of every classroom"""
+
+    def test_room_conflicts(self):
+        """Test the classes booking a room at the same time are found"""
+        first = sample_classroom(room='A1', days_of_week='1,3')
+        second = sample_classroom(room='A1', days_of_week='3,5')
+        sample_classroom(room='A2', days_of_week='3')
+        sample_classroom(
+            room='A1', days_of_week='3', time=datetime.time(11, 0)
+        )
+
+        conflicts = find_conflicts()
+
+        self.assertEqual(conflicts['rooms'], [{
+            'room': 'A1',
+            'classrooms': [first.id, second.id],
+            'days': [3],
+        }])
+
+    def test_member_conflicts(self):
+        """Test the members attending two classes at a time are found"""
+        first = sample_classroom(room='A1', days_of_week='1')
+        second = sample_classroom(room='A2', days_of_week='1,2')
+        other = sample_classroom(room='A3', time=datetime.time(14, 0))
+        student = sample_student()
+        student.classes.set([first, second, other])
+        sample_student().classes.set([first, other])
+        teacher = sample_teacher()
+        teacher.classes.set([first, second])
+
+        conflicts = find_conflicts()
+
+        self.assertEqual(conflicts['rooms'], [])
+        self.assertEqual(conflicts['students'], [{
+            'member': student.id,
+            'classrooms': [first.id, second.id],
+            'days': [1],
+        }])
+        self.assertEqual(conflicts['teachers'], [{
+            'member': teacher.id,
+            'classrooms': [first.id, second.id],
+            'days': [1],
+        }])
+
+    def test_queries_do_not_grow_with_classrooms(self):
+        """Test the conflicts are found with a fixed number of queries"""
+        for i in range(20):
+            classroom = sample_classroom(room=f'R{i}')
+            sample_student().classes.add(classroom)
+
+        with self.assertNumQueries(3):
+            find_conflicts()
+
+
+class ClassroomConflictsApiTests(TestCase):
+    """Test the classroom conflicts api"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+
+    def test_retrieve_conflicts(self):
+        """Test retrieving the conflicts"""
+        first = sample_classroom(room='A1')
+        second = sample_classroom(room='A1', time=datetime.time(10, 0))
+        res = self.client.get(CONFLICTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            'rooms': [{
+                'room': 'A1',
+                'classrooms': [first.id, second.id],
+                'days': [1, 3, 5],
+            }],
+            'students': [],
+            'teachers': [],
+        })
+
+    def test_create_in_booked_room_rejected(self):
+        """Test a class can't be created in a room booked at that time"""
+        sample_classroom(room='A1', days_of_week='1')
+        payload = sample_classroom_payload(
+            room='A1',
+            days_of_week='1,2',
+            time=datetime.time(10, 0),
+            grade=sample_grade().id
+        )
+        res = self.client.post(CLASSROOM_LIST_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('room', res.data)
+
+    def test_create_without_conflicts(self):
+        """Test classes can share a room on other days or times"""
+        sample_classroom(room='A1', days_of_week='1')
+        payloads = [
+            sample_classroom_payload(room='A1', days_of_week='2'),
+            sample_classroom_payload(room='A1', time=datetime.time(10, 30)),
+            sample_classroom_payload(room='A2', days_of_week='1'),
+        ]
+
+        for payload in payloads:
+            payload['grade'] = sample_grade().id
+            res = self.client.post(CLASSROOM_LIST_URL, payload)
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_update_clashing_with_members_rejected(self):
+        """Test a class can't move to a time its members are busy"""
+        first = sample_classroom(room='A1', days_of_week='1')
+        second = sample_classroom(
+            room='A2', days_of_week='1', time=datetime.time(14, 0)
+        )
+        sample_student().classes.set([first, second])
+        payload = {'time': '09:00'}
+        res = self.client.patch(classroom_detail_url(second.id), payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('time', res.data)
+
+    def test_update_keeping_schedule_allowed(self):
+        """Test a class can be updated without clashing with itself"""
+        classroom = sample_classroom(room='A1')
+        payload = sample_classroom_payload(
+            name='Other name',
+            room='A1',
+            grade=sample_grade().id
+        )
+        res = self.client.put(classroom_detail_url(classroom.id), payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
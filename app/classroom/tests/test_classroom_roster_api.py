@@ -0,0 +1,245 @@
+from django.test import TestCase
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from classroom.models import Classroom
+from member.models import Student
+from member.serializers import StudentListSerializer, TeacherListSerializer
+from core.models import Change
+from core.utils import \
+    sample_classroom, \
+    sample_student, \
+    sample_teacher, \
+    sample_user
+
+
+CLASSROOM_LIST_URL = reverse('classroom:classroom-list')
+
+
+def roster_url(classroom_id, operation=None):
+    name = f'roster-{operation}' if operation else 'roster'
+    return reverse(f'classroom:classroom-{name}', args=[classroom_id])
+
+
+class ClassroomRosterApiTests(TestCase):
+    """Test changing the students and teachers of a classroom"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.classroom = sample_classroom()
+        self.students = [sample_student() for _ in range(3)]
+        self.teacher = sample_teacher()
+
+    def get_roster(self):
+        """Return the ids of the students and teachers of the classroom"""
+        return (
+            set(self.classroom.students.values_list('pk', flat=True)),
+            set(self.classroom.teachers.values_list('pk', flat=True)),
+        )
+
+    def test_roster_add(self):
+        """Test enrolling members, skipping the ones already enrolled"""
+        self.classroom.students.add(self.students[0])
+        payload = {
+            'students': [self.students[0].id, self.students[1].id],
+            'teachers': [self.teacher.id],
+        }
+        res = self.client.post(
+            roster_url(self.classroom.id, 'add'),
+            payload,
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            'students': {'added': [self.students[1].id], 'removed': []},
+            'teachers': {'added': [self.teacher.id], 'removed': []},
+        })
+        self.assertEqual(self.get_roster(), (
+            {self.students[0].id, self.students[1].id},
+            {self.teacher.id},
+        ))
+
+        res = self.client.post(
+            roster_url(self.classroom.id, 'add'),
+            payload,
+            format='json'
+        )
+        self.assertEqual(res.data['students']['added'], [])
+
+    def test_roster_remove(self):
+        """Test unenrolling members, ignoring the ones not enrolled"""
+        self.classroom.students.add(*self.students[:2])
+        res = self.client.post(
+            roster_url(self.classroom.id, 'remove'),
+            {'students': [self.students[1].id, self.students[2].id]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            'students': {'added': [], 'removed': [self.students[1].id]},
+        })
+        self.assertEqual(self.get_roster(), ({self.students[0].id}, set()))
+
+    def test_roster_replace(self):
+        """Test replacing the roster, leaving the kinds not sent alone"""
+        self.classroom.students.add(*self.students[:2])
+        self.classroom.teachers.add(self.teacher)
+        res = self.client.put(
+            roster_url(self.classroom.id),
+            {'students': [self.students[1].id, self.students[2].id]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'students': {
+            'added': [self.students[2].id],
+            'removed': [self.students[0].id],
+        }})
+        self.assertEqual(self.get_roster(), (
+            {self.students[1].id, self.students[2].id},
+            {self.teacher.id},
+        ))
+
+    def test_roster_touches_members(self):
+        """Test the members changed are marked modified and recorded"""
+        student = self.students[0]
+        Change.objects.all().delete()
+        self.client.post(
+            roster_url(self.classroom.id, 'add'),
+            {'students': [student.id]},
+            format='json'
+        )
+
+        self.assertGreater(
+            Student.objects.get(pk=student.pk).last_modified,
+            student.last_modified
+        )
+        self.assertTrue(Change.objects.filter(object_id=student.id).exists())
+
+    def test_roster_unknown_ids(self):
+        """Test nothing changes when any of the members doesn't exist"""
+        res = self.client.post(
+            roster_url(self.classroom.id, 'add'),
+            {
+                'students': [self.students[0].id, self.teacher.id],
+                'teachers': [self.teacher.id],
+            },
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(str(self.teacher.id), res.data['students'][0])
+        self.assertNotIn('teachers', res.data)
+        self.assertEqual(self.get_roster(), (set(), set()))
+
+    def test_roster_empty_negative(self):
+        """Test a change without students or teachers is rejected"""
+        res = self.client.post(
+            roster_url(self.classroom.id, 'add'),
+            {},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_roster_classroom_not_found(self):
+        """Test changing the roster of a missing classroom returns 404"""
+        classroom_id = self.classroom.id
+        Classroom.objects.filter(pk=classroom_id).delete()
+        res = self.client.put(
+            roster_url(classroom_id),
+            {'students': []},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ClassroomRosterReadApiTests(TestCase):
+    """Test reading the members of the classrooms"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.classroom = sample_classroom()
+        self.other = sample_classroom()
+
+    def get_student_count(self):
+        """Return the student count of the classroom in the list"""
+        res = self.client.get(CLASSROOM_LIST_URL, {'counts': 1})
+        return next(
+            row['student_count'] for row in res.data
+            if row['id'] == self.classroom.id
+        )
+
+    def test_retrieve_roster(self):
+        """Test the roster returns the members sorted, in three queries"""
+        students = [
+            sample_student(fullname='Zoe'),
+            sample_student(fullname='Ana', active=False),
+        ]
+        teacher = sample_teacher()
+        self.classroom.students.add(*students)
+        self.classroom.teachers.add(teacher)
+        self.other.students.add(sample_student())
+
+        with self.assertNumQueries(3):
+            res = self.client.get(roster_url(self.classroom.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            'student_count': 2,
+            'teacher_count': 1,
+            'students': StudentListSerializer(
+                self.classroom.students.order_by('fullname'),
+                many=True
+            ).data,
+            'teachers': TeacherListSerializer(
+                self.classroom.teachers.all(),
+                many=True
+            ).data,
+        })
+
+    def test_list_counts(self):
+        """Test the list counts the members of every class in one query"""
+        students = [sample_student() for _ in range(3)]
+        teachers = [sample_teacher() for _ in range(2)]
+        self.classroom.students.add(*students)
+        self.classroom.teachers.add(*teachers)
+        self.other.teachers.add(teachers[0])
+
+        with self.assertNumQueries(1):
+            res = self.client.get(CLASSROOM_LIST_URL, {'counts': 1})
+
+        counts = {
+            row['id']: (row['student_count'], row['teacher_count'])
+            for row in res.data
+        }
+        self.assertEqual(counts, {
+            self.classroom.id: (3, 2),
+            self.other.id: (0, 1),
+        })
+
+    def test_list_counts_follow_changes(self):
+        """Test the counts cached are discarded when the members change"""
+        student = sample_student()
+        self.client.post(
+            roster_url(self.classroom.id, 'add'),
+            {'students': [student.id]},
+            format='json'
+        )
+        self.assertEqual(self.get_student_count(), 1)
+
+        student.delete()
+        self.assertEqual(self.get_student_count(), 0)
+
+    def test_list_without_counts(self):
+        """Test the counts are only returned when asked for"""
+        res = self.client.get(CLASSROOM_LIST_URL)
+
+        self.assertNotIn('student_count', res.data[0])
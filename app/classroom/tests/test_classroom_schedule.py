@@ -0,0 +1,181 @@
+import datetime
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.shortcuts import reverse
+
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework import status
+
+from classroom.models import Classroom
+from classroom.views import ClassroomViewSet
+from core.utils import \
+    sample_classroom_payload, \
+    sample_classroom, \
+    sample_grade, \
+    sample_user
+
+
+CLASSROOM_LIST_URL = reverse('classroom:classroom-list')
+
+
+def list_queryset(params=None):
+    """Return the queryset the list action runs for the given parameters"""
+    request = APIRequestFactory().get('/', params or {})
+    view = ClassroomViewSet(action='list', request=Request(request))
+    return view.get_queryset()
+
+
+class WeekdaysFieldTests(TestCase):
+    """Test the weekdays of the classroom stored as a bitmask"""
+
+    def test_days_stored_as_bitmask(self):
+        """Test the days are stored as bits and read back as a string"""
+        classroom = sample_classroom(days_of_week='1,3,5')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT days_of_week FROM classroom_classroom WHERE id = %s',
+                [classroom.id]
+            )
+            self.assertEqual(cursor.fetchone()[0], 0b10101)
+
+        classroom.refresh_from_db()
+        self.assertEqual(classroom.days_of_week, '1,3,5')
+
+    def test_exact_lookup(self):
+        """Test filtering by the exact days ignores their order"""
+        classroom = sample_classroom(days_of_week='2,4')
+
+        self.assertEqual(
+            list(Classroom.objects.filter(days_of_week='4,2')),
+            [classroom]
+        )
+        self.assertFalse(Classroom.objects.filter(days_of_week='2').exists())
+        self.assertFalse(Classroom.objects.filter(days_of_week='x').exists())
+
+    def test_overlaps_lookup(self):
+        """Test the overlaps lookup matches the classrooms sharing a day"""
+        monday = sample_classroom(days_of_week='1,3')
+        sample_classroom(days_of_week='2,4')
+
+        self.assertEqual(
+            list(Classroom.objects.filter(days_of_week__overlaps='1,5')),
+            [monday]
+        )
+
+
+class ClassroomScheduleFilterTests(TestCase):
+    """Test filtering the classroom list by day and time"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.monday_early = sample_classroom(
+            identifier='A', days_of_week='1,3', time=datetime.time(8, 0)
+        )
+        self.tuesday = sample_classroom(
+            identifier='B', days_of_week='2,4', time=datetime.time(9, 30)
+        )
+        self.monday_late = sample_classroom(
+            identifier='C', days_of_week='1', time=datetime.time(14, 0)
+        )
+
+    def get_identifiers(self, params):
+        res = self.client.get(CLASSROOM_LIST_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [classroom['identifier'] for classroom in res.data]
+
+    def test_filter_by_day(self):
+        """Test only the classrooms on the given day are returned"""
+        self.assertEqual(self.get_identifiers({'day': 1}), ['A', 'C'])
+        self.assertEqual(self.get_identifiers({'day': 4}), ['B'])
+        self.assertEqual(self.get_identifiers({'day': 7}), [])
+
+    def test_filter_by_several_days(self):
+        """Test the classrooms on any of the given days are returned"""
+        self.assertEqual(self.get_identifiers({'day': '3,4'}), ['A', 'B'])
+
+    def test_filter_by_time_range(self):
+        """Test only the classrooms in the time range are returned"""
+        self.assertEqual(
+            self.get_identifiers({'time_from': '09:00'}),
+            ['B', 'C']
+        )
+        self.assertEqual(
+            self.get_identifiers({'time_from': '09:00', 'time_to': '10:00'}),
+            ['B']
+        )
+
+    def test_filter_by_day_and_time(self):
+        """Test the classrooms on a day at a given time are returned"""
+        params = {'day': 2, 'time_from': '09:30', 'time_to': '09:30'}
+        self.assertEqual(self.get_identifiers(params), ['B'])
+
+    def test_invalid_filters_ignored(self):
+        """Test invalid day and time filters are ignored"""
+        for params in [{'day': 8}, {'day': 'a'}, {'time_from': '25:00'}]:
+            self.assertEqual(self.get_identifiers(params), ['A', 'B', 'C'])
+
+    def test_days_representation_normalized(self):
+        """Test the days are sorted and deduplicated on creation"""
+        payload = sample_classroom_payload(
+            days_of_week='5,1,3,1',
+            grade=sample_grade().id
+        )
+        res = self.client.post(CLASSROOM_LIST_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['days_of_week'], '1,3,5')
+
+
+@skipUnless(
+    connection.vendor == 'postgresql',
+    "Query plans are only checked on PostgreSQL"
+)
+class ClassroomScheduleQueryPlanTests(TestCase):
+    """Test the schedule filters are served by indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Classroom.objects.bulk_create([
+            Classroom(**sample_classroom_payload(
+                days_of_week=str(i % 7 + 1),
+                time=datetime.time(7 + i % 12, 30),
+            ))
+            for i in range(2000)
+        ])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def test_day_filter_plan(self):
+        """Test the day filter uses the partial index of the day"""
+        plan = list_queryset({'day': 2}).explain()
+        self.assertNotIn('Seq Scan', plan, plan)
+        self.assertIn('classroom_day2_time_idx', plan, plan)
+
+    def test_several_days_filter_plan(self):
+        """Test filtering by several days combines their partial indexes"""
+        plan = list_queryset({'day': '2,4'}).explain()
+        self.assertNotIn('Seq Scan', plan, plan)
+        self.assertIn('classroom_day2_time_idx', plan, plan)
+        self.assertIn('classroom_day4_time_idx', plan, plan)
+
+    def test_day_and_time_filter_plan(self):
+        """Test the day and time filters are served by an index"""
+        params = {'day': 2, 'time_from': '09:30', 'time_to': '09:30'}
+        plan = list_queryset(params).explain()
+        self.assertNotIn('Seq Scan', plan, plan)
+
+    def test_time_filter_plan(self):
+        """Test the time range filter uses an index"""
+        plan = list_queryset({'time_from': '09:00'}).explain()
+        self.assertNotIn('Seq Scan', plan, plan)
@@ -0,0 +1,66 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from grade.serializers import GradeSerializer
+from core.utils import sample_classroom, sample_user
+
+
+CLASSROOM_LIST_URL = reverse('classroom:classroom-list')
+
+
+def classroom_detail_url(classroom_id):
+    return reverse('classroom:classroom-detail', args=[classroom_id])
+
+
+class ClassroomSparseFieldsTests(TestCase):
+    """Test choosing the fields and relations of the classroom views"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.classroom = sample_classroom()
+
+    def test_list_fields(self):
+        """Test the list only returns and loads the fields asked for"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(CLASSROOM_LIST_URL, {'fields': 'name'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [
+            {'id': self.classroom.id, 'name': self.classroom.name}
+        ])
+        self.assertNotIn('"room"', queries[-1]['sql'])
+
+    def test_list_expand_grade(self):
+        """Test the grade of the classrooms can be nested in the list"""
+        res = self.client.get(CLASSROOM_LIST_URL, {'expand': 'grade'})
+
+        self.assertEqual(
+            res.data[0]['grade'],
+            GradeSerializer(self.classroom.grade).data
+        )
+
+    def test_detail_without_expansion(self):
+        """Test the detail returns the grade id when not expanded"""
+        res = self.client.get(
+            classroom_detail_url(self.classroom.id),
+            {'expand': ''}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['grade'], self.classroom.grade.id)
+
+    def test_unknown_names_negative(self):
+        """Test unknown fields and relations are rejected"""
+        res = self.client.get(CLASSROOM_LIST_URL, {'fields': 'name,color'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+        res = self.client.get(CLASSROOM_LIST_URL, {'expand': 'students'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('expand', res.data)
@@ -1,23 +1,171 @@
+from datetime import time
+
+from django.db import transaction
+from django.db.models import Count, Q
+
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
+from classroom.conflicts import find_conflicts
+from classroom.fields import day_bit
 from classroom.models import Classroom
+from classroom.roster import ROSTER_MODELS, change_roster, prefetch_roster
 from classroom.serializers import \
-    ClassroomListSerializer, ClassroomDetailSerializer
+    ClassroomListSerializer, \
+    ClassroomCountListSerializer, \
+    ClassroomDetailSerializer, \
+    ClassroomRosterSerializer
+from member.serializers import StudentListSerializer, TeacherListSerializer
+from core.batch import BatchRetrieveMixin
+from core.cache import CachedResponseMixin
+from core.middleware import SerializerTimingMixin
+from core.sparse import SparseFieldsMixin
+from core.utils import get_int_from_param
 
 
-class ClassroomViewSet(viewsets.ModelViewSet):
+class ClassroomViewSet(
+    SerializerTimingMixin,
+    CachedResponseMixin,
+    SparseFieldsMixin,
+    BatchRetrieveMixin,
+    viewsets.ModelViewSet
+):
     """Views for managing the classroom model"""
 
+    cache_namespace = 'classroom'
+    cache_dependencies = ['grade']
     queryset = Classroom.objects.all()
     serializer_class = ClassroomListSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        """Return the queryset ordered by indetifier"""
-        return self.queryset.order_by('identifier')
+        """Return the filtered queryset ordered by indetifier"""
+        queryset = self.get_sparse_queryset(self.queryset)
+
+        days = self.request.query_params.get('day')
+        days = _get_days_from_param(days)
+        if days:
+            # One condition per day, so each can use its partial index
+            condition = Q()
+            for day in days:
+                condition |= Q(days_of_week__overlaps=day_bit(day))
+            queryset = queryset.filter(condition)
+
+        time_from = self.request.query_params.get('time_from')
+        time_from = _get_time_from_param(time_from)
+        if time_from is not None:
+            queryset = queryset.filter(time__gte=time_from)
+
+        time_to = self.request.query_params.get('time_to')
+        time_to = _get_time_from_param(time_to)
+        if time_to is not None:
+            queryset = queryset.filter(time__lte=time_to)
+
+        if self.with_counts():
+            queryset = queryset.annotate(
+                student_count=Count('students', distinct=True),
+                teacher_count=Count('teachers', distinct=True),
+            )
+
+        return queryset.order_by('identifier')
+
+    def with_counts(self):
+        """Return whether the list was asked for the members enrolled"""
+        counts = self.request.query_params.get('counts')
+        return self.action == 'list' and bool(get_int_from_param(counts))
+
+    @action(detail=False, methods=['get'])
+    def conflicts(self, request):
+        """Return the double booked rooms and the members' clashing classes"""
+        return Response(find_conflicts())
+
+    @action(detail=True, methods=['get', 'put'])
+    def roster(self, request, pk=None):
+        """Return the members of the class, or enroll exactly the ones sent
+
+        Every enrolled member is returned, with its `active` flag, the
+        students and the teachers read with one query each.
+        """
+        if request.method == 'PUT':
+            return self.change_roster(request, 'replace')
+
+        classroom = self.get_object()
+        prefetch_roster(classroom)
+        students = classroom.students.all()
+        teachers = classroom.teachers.all()
+
+        return Response({
+            'student_count': len(students),
+            'teacher_count': len(teachers),
+            'students': StudentListSerializer(students, many=True).data,
+            'teachers': TeacherListSerializer(teachers, many=True).data,
+        })
+
+    @action(detail=True, methods=['post'], url_path='roster/add')
+    def roster_add(self, request, pk=None):
+        """Enroll the students and teachers sent in the class"""
+        return self.change_roster(request, 'add')
+
+    @action(detail=True, methods=['post'], url_path='roster/remove')
+    def roster_remove(self, request, pk=None):
+        """Unenroll the students and teachers sent from the class"""
+        return self.change_roster(request, 'remove')
+
+    def change_roster(self, request, operation):
+        """Apply the roster change, returning the members added and removed
+
+        Only the kinds of members sent are changed, and sending members
+        already in the wanted state changes nothing.
+        """
+        classroom = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            changes = {
+                key: change_roster(
+                    classroom,
+                    ROSTER_MODELS[key],
+                    **{operation: ids}
+                )
+                for key, ids in serializer.validated_data.items()
+            }
+
+        return Response(changes)
 
     def get_serializer_class(self):
         """Get the appropriate serializer"""
-        if self.action == "retrieve":
+        if self.action in ["retrieve", "batch"]:
             return ClassroomDetailSerializer
+        if self.action in ['roster', 'roster_add', 'roster_remove']:
+            return ClassroomRosterSerializer
+        if self.with_counts():
+            return ClassroomCountListSerializer
         return self.serializer_class
+
+
+def _get_days_from_param(param_str):
+    """Return the list of weekdays in the comma sepparated string"""
+    if not param_str:
+        return None
+
+    try:
+        days = list(map(int, param_str.split(',')))
+    except ValueError:
+        return None
+
+    if any(day < 1 or day > 7 for day in days):
+        return None
+    return days
+
+
+def _get_time_from_param(param_str):
+    """Return the time in the HH:MM[:SS] string"""
+    if not param_str:
+        return None
+
+    try:
+        return time.fromisoformat(param_str)
+    except ValueError:
+        return None
@@ -0,0 +1,484 @@
+import asyncio
+import math
+import statistics
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings, \
+    setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from member.models import Student, Teacher
+from grade.models import Grade
+from classroom.models import Classroom
+from core.utils import \
+    sample_student_payload, \
+    sample_teacher_payload, \
+    sample_classroom_payload
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    """Run the block on a test database, created like the test runner does
+
+    The data of the configured database is never touched.
+    """
+    old_name = connection.settings_dict['NAME']
+    setup_test_environment()
+    connection.creation.create_test_db(
+        verbosity=0,
+        autoclobber=True,
+        keepdb=keepdb
+    )
+
+    try:
+        yield
+    finally:
+        connection.close()
+        connection.creation.destroy_test_db(
+            old_name,
+            verbosity=0,
+            keepdb=keepdb
+        )
+        teardown_test_environment()
+
+
+def seed_database(grades=10, classrooms=100, students=1000, teachers=100,
+                  enrollments=3, batch_size=2000):
+    """Fill the database with sample objects, using bulk inserts
+
+    Every student and teacher is enrolled in `enrollments` classrooms.
+    Return a dict with the number of objects created of each kind.
+    """
+    grade_objs = Grade.objects.bulk_create([
+        Grade(name=f'Grade {i}', rank=i) for i in range(1, grades + 1)
+    ])
+    classroom_objs = Classroom.objects.bulk_create([
+        Classroom(**sample_classroom_payload(
+            name=f'Classroom {i}',
+            room=f'R{i:04}',
+            grade=grade_objs[i % grades] if grades else None,
+        ))
+        for i in range(classrooms)
+    ], batch_size)
+    student_objs = Student.objects.bulk_create([
+        Student(**sample_student_payload(
+            fullname=f'Student {i:07}',
+            grade=grade_objs[i % grades] if grades else None,
+        ))
+        for i in range(students)
+    ], batch_size)
+    teacher_objs = Teacher.objects.bulk_create([
+        Teacher(**sample_teacher_payload(
+            fullname=f'Teacher {i:07}',
+            academic_level=['Gr', 'Ms', 'Dr'][i % 3],
+        ))
+        for i in range(teachers)
+    ], batch_size)
+
+    enrolled = 0
+    if classroom_objs:
+        for model, members in [
+            (Student, student_objs),
+            (Teacher, teacher_objs),
+        ]:
+            field = model.classes.field
+            through = field.remote_field.through
+            source = field.m2m_field_name() + '_id'
+            rows = [
+                through(**{
+                    source: member.id,
+                    'classroom_id': classroom_objs[(i + j) % classrooms].id,
+                })
+                for i, member in enumerate(members)
+                for j in range(min(enrollments, classrooms))
+            ]
+            through.objects.bulk_create(rows, batch_size)
+            enrolled += len(rows)
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    return {
+        'grades': len(grade_objs),
+        'classrooms': len(classroom_objs),
+        'students': len(student_objs),
+        'teachers': len(teacher_objs),
+        'enrollments': enrolled,
+    }
+
+
+def count_database():
+    """Return the number of objects of each kind, as seed_database does"""
+    return {
+        'grades': Grade.objects.count(),
+        'classrooms': Classroom.objects.count(),
+        'students': Student.objects.count(),
+        'teachers': Teacher.objects.count(),
+        'enrollments': sum(
+            model.classes.through.objects.count()
+            for model in [Student, Teacher]
+        ),
+    }
+
+
+def get_benchmark_user():
+    """Return the user sending the requests, created on first use
+
+    A kept benchmark database already has it from a previous run.
+    """
+    user, _ = get_user_model().objects.get_or_create(
+        username='Benchmark User'
+    )
+    return user
+
+
+# The query parameters the extra actions are measured with, by action
+ACTION_PARAMS = {
+    'batch': lambda viewset: 'ids=' + ','.join(
+        str(pk) for pk in viewset.queryset.order_by('pk')
+        .values_list('pk', flat=True)[:50]
+    ),
+    'export': lambda viewset: 'format=ndjson',
+}
+
+
+def get_endpoints():
+    """Return the (name, url) pairs of every GET endpoint to measure
+
+    Besides the list, a list page and a detail of every router viewset,
+    the extra actions answering GET are measured, with the parameters of
+    `ACTION_PARAMS`, as well as the member stats and the changes feed.
+    """
+    from grade.urls import router as grade_router
+    from classroom.urls import router as classroom_router
+    from member.urls import router as member_router
+
+    endpoints = []
+    for namespace, router in [
+        ('grade', grade_router),
+        ('classroom', classroom_router),
+        ('member', member_router),
+    ]:
+        for _, viewset, basename in router.registry:
+            list_url = reverse(f'{namespace}:{basename}-list')
+            endpoints.append((f'{basename} list', list_url))
+
+            if viewset.pagination_class is not None:
+                endpoints.append(
+                    (f'{basename} list page', f'{list_url}?page_size=50')
+                )
+
+            obj = viewset.queryset.order_by('pk').first()
+            if obj is not None:
+                endpoints.append((
+                    f'{basename} detail',
+                    reverse(f'{namespace}:{basename}-detail', args=[obj.pk])
+                ))
+
+            for extra_action in viewset.get_extra_actions():
+                if 'get' not in extra_action.mapping:
+                    continue
+                if extra_action.detail and obj is None:
+                    continue
+
+                url = reverse(
+                    f'{namespace}:{basename}-{extra_action.url_name}',
+                    args=[obj.pk] if extra_action.detail else []
+                )
+                params = ACTION_PARAMS.get(extra_action.__name__)
+                if params is not None:
+                    url = f'{url}?{params(viewset)}'
+                endpoints.append(
+                    (f'{basename} {extra_action.url_name}', url)
+                )
+
+    endpoints.append(('member stats', reverse('member:stats')))
+    endpoints.append(
+        ('changes', f"{reverse('core:changes')}?changed_since=0")
+    )
+
+    return endpoints
+
+
+def get_write_endpoints():
+    """Return the (name, url, method, data) of the writes to measure
+
+    Only the bulk update is measured, sending the members their own names
+    so every request leaves the data as it was. The other writes, such as
+    the promotion, the deactivations, the roster changes and the bulk
+    create, change the data the other endpoints are measured on.
+    """
+    endpoints = []
+    for basename, model in [('student', Student), ('teacher', Teacher)]:
+        rows = [
+            {'id': pk, 'fullname': fullname}
+            for pk, fullname in model.objects.order_by('pk')
+            .values_list('pk', 'fullname')[:50]
+        ]
+        if rows:
+            endpoints.append((
+                f'{basename} bulk update',
+                reverse(f'member:{basename}-bulk'),
+                'patch',
+                rows
+            ))
+
+    return endpoints
+
+
+def percentile(values, percent):
+    """Return the given percentile of the values, by nearest rank"""
+    values = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(values)) - 1)
+    return values[index]
+
+
+def measure_endpoint(client, url, repeat=20, method='get', data=None):
+    """Return latency, query count and memory figures for a request
+
+    A first request warms the caches and is not timed. Memory is measured
+    on one extra request, so tracing does not slow the timed ones. The
+    content of streaming responses is read as part of the request.
+    """
+    def send():
+        if data is None:
+            res = getattr(client, method)(url)
+        else:
+            res = getattr(client, method)(url, data, format='json')
+        if res.streaming:
+            return res, b''.join(res.streaming_content)
+        return res, res.content
+
+    res, _ = send()
+    if res.status_code != 200:
+        raise RuntimeError(
+            f'{method.upper()} {url} returned {res.status_code}'
+        )
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        send()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    with CaptureQueriesContext(connection) as queries:
+        tracemalloc.start()
+        _, content = send()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p90_ms': round(percentile(timings, 90), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'queries': len(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'response_kb': round(len(content) / 1024, 1),
+    }
+
+
+def run_benchmarks(repeat=20, endpoints=None):
+    """Measure every endpoint, returning the results by endpoint name
+
+    The endpoints are (name, url) pairs, or (name, url, method, data) for
+    the requests other than GET. By default every GET endpoint is measured,
+    then the writes.
+    """
+    client = APIClient()
+    client.force_authenticate(get_benchmark_user())
+    if endpoints is None:
+        endpoints = get_endpoints() + get_write_endpoints()
+
+    return {
+        name: measure_endpoint(client, url, repeat, *request)
+        for name, url, *request in endpoints
+    }
+
+
+def compare_results(baseline, current):
+    """Return the (endpoint, metric, before, after, change %) differences"""
+    rows = []
+    for name, metrics in current.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric, value in metrics.items():
+            before = previous.get(metric)
+            if before is None:
+                continue
+            change = (value - before) / before * 100 if before else 0.0
+            rows.append((name, metric, before, value, round(change, 1)))
+
+    return rows
+
+
+def get_read_endpoints():
+    """Return the (name, url) of the read endpoints to load test"""
+    endpoints = get_endpoints()
+    names = {name for name, _ in endpoints}
+
+    # Lists with pages are requested a page at a time, as clients would,
+    # and the exports, reading whole tables, are left out
+    return [
+        (name, url)
+        for name, url in endpoints
+        if f'{name} page' not in names and not name.endswith(' export')
+    ]
+
+
+def _summarize(latencies, errors, elapsed):
+    """Return the throughput and latency figures of a load test"""
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+    }
+
+
+def load_test_wsgi(user, urls, requests=1000, concurrency=100, threads=20):
+    """Load test the urls through the WSGI handler
+
+    `concurrency` clients send the requests in turns, but only `threads`
+    are handled at a time, like a WSGI server with that many threads.
+    """
+    server = threading.BoundedSemaphore(threads)
+    latencies = []
+    errors = []
+    login = Client()
+    login.force_login(user)
+
+    def run_client(index):
+        client = Client()
+        client.cookies = login.cookies
+        for i in range(index, requests, concurrency):
+            start = time.perf_counter()
+            with server:
+                res = client.get(urls[i % len(urls)])
+            latencies.append((time.perf_counter() - start) * 1000)
+            if res.status_code != 200:
+                errors.append(res.status_code)
+        # The test client leaves the connections of the thread open
+        connections.close_all()
+
+    clients = [
+        threading.Thread(target=run_client, args=[index])
+        for index in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+
+    return _summarize(latencies, len(errors), time.perf_counter() - start)
+
+
+def load_test_asgi(user, urls, requests=1000, concurrency=100):
+    """Load test the urls through the ASGI handler
+
+    `concurrency` clients send the requests in turns from an event loop.
+    """
+    latencies = []
+    errors = []
+    login = Client()
+    login.force_login(user)
+
+    async def run_client(index):
+        client = AsyncClient()
+        client.cookies = login.cookies
+        for i in range(index, requests, concurrency):
+            start = time.perf_counter()
+            res = await client.get(urls[i % len(urls)])
+            latencies.append((time.perf_counter() - start) * 1000)
+            if res.status_code != 200:
+                errors.append(res.status_code)
+
+    async def run_clients():
+        await asyncio.gather(*(
+            run_client(index) for index in range(concurrency)
+        ))
+        # Closes the connections of the thread running synchronous code
+        await sync_to_async(connections.close_all)()
+
+    start = time.perf_counter()
+    asyncio.run(run_clients())
+
+    return _summarize(latencies, len(errors), time.perf_counter() - start)
+
+
+def measure_connection_setup(repeat=20):
+    """Return the median milliseconds to open a database connection"""
+    timings = []
+    for _ in range(repeat):
+        connection.close()
+        start = time.perf_counter()
+        connection.ensure_connection()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return round(statistics.median(timings), 3)
+
+
+def measure_connection_reuse(user, url, repeat=200, conn_max_age=0,
+                             health_checks=False):
+    """Return the latency of GET requests with the given connection age
+
+    The requests go through the WSGI handler, which opens and closes the
+    database connections as a server would, unlike the test client. The
+    number of connections opened is returned too.
+    """
+    login = Client()
+    login.force_login(user)
+    cookie = '; '.join(
+        f'{name}={morsel.value}' for name, morsel in login.cookies.items()
+    )
+    environ = RequestFactory(HTTP_COOKIE=cookie).get(url).environ
+    handler = WSGIHandler()
+    opened = []
+
+    def count_connection(sender, connection, **kwargs):
+        opened.append(connection)
+
+    def start_response(status, headers):
+        if not status.startswith('200'):
+            raise RuntimeError(f'GET {url} returned {status}')
+
+    old_max_age = connection.settings_dict['CONN_MAX_AGE']
+    connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+    connection.close()
+    connection_created.connect(count_connection)
+    timings = []
+
+    try:
+        with override_settings(DB_CONN_HEALTH_CHECKS=health_checks):
+            for _ in range(repeat):
+                start = time.perf_counter()
+                response = handler(dict(environ), start_response)
+                b''.join(response)
+                response.close()
+                timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        connection_created.disconnect(count_connection)
+        connection.settings_dict['CONN_MAX_AGE'] = old_max_age
+        connection.close()
+
+    return {
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p90_ms': round(percentile(timings, 90), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'connections': len(opened),
+    }
@@ -0,0 +1,108 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_etags, quote_etag
+
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(namespace):
+    return f'response-cache:{namespace}:version'
+
+
+def get_versions(namespaces):
+    """Return the current cache version of each of the namespaces"""
+    cache = _get_cache()
+    keys = [_version_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+
+    return [versions[key] for key in keys]
+
+
+def invalidate_responses(namespace):
+    """Discard every cached response of the namespace
+
+    The version is changed right away, so the rest of the transaction sees
+    fresh data, and once more on commit, so responses cached by concurrent
+    requests before the commit are discarded as well.
+    """
+    def bump():
+        _get_cache().set(_version_key(namespace), uuid.uuid4().hex, None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+class CachedResponseMixin:
+    """Caches the list and retrieve responses of a viewset
+
+    Responses are stored under the versions of `cache_namespace` and of the
+    `cache_dependencies` namespaces, so changing the version of any of them
+    discards the stored responses. The versions also make the ETag sent to
+    clients, so matching If-None-Match requests are answered with a 304
+    before touching the database.
+    """
+    cache_namespace = None
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list,
+            request,
+            *args,
+            **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve,
+            request,
+            *args,
+            **kwargs
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        """Return the response from the cache, calling the handler on miss"""
+        namespaces = [self.cache_namespace, *self.cache_dependencies]
+        versions = get_versions(namespaces)
+        digest = hashlib.md5(
+            ':'.join([*versions, request.get_full_path()]).encode('utf-8')
+        ).hexdigest()
+        etag = quote_etag(digest)
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            if etag in etags or '*' in etags:
+                return Response(
+                    status=status.HTTP_304_NOT_MODIFIED,
+                    headers={'ETag': etag}
+                )
+
+        cache = _get_cache()
+        key = f'response-cache:{self.cache_namespace}:{digest}'
+        data = cache.get(key)
+
+        if data is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        else:
+            response = Response(data)
+
+        response['ETag'] = etag
+        return response
@@ -0,0 +1,161 @@
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from core.cache import invalidate_responses
+from core.models import Change
+
+
+SEQUENCE_NAME = 'core_change_sequence'
+
+# Key of the advisory lock taken while numbering the changes
+SEQUENCE_LOCK = 4418
+
+
+def get_synced_models():
+    """Return the (queryset, serializer class) of every synced kind
+
+    They're listed in the order clients should apply them, so the related
+    objects of a row are known when it arrives.
+    """
+    from grade.models import Grade
+    from grade.serializers import GradeSerializer
+    from classroom.models import Classroom
+    from classroom.serializers import ClassroomListSerializer
+    from member.models import Student, Teacher
+    from member.serializers import StudentCreateSerializer, \
+        TeacherCreateSerializer
+
+    return {
+        'grades': (Grade.objects.all(), GradeSerializer),
+        'classrooms': (Classroom.objects.all(), ClassroomListSerializer),
+        'students': (
+            Student.objects.prefetch_related('classes'),
+            StudentCreateSerializer
+        ),
+        'teachers': (
+            Teacher.objects.prefetch_related('classes'),
+            TeacherCreateSerializer
+        ),
+    }
+
+
+def record_changes(model, pks, deleted=False, using=None):
+    """Record the objects as changed, or deleted, for the delta endpoint
+
+    The change row of each object is written again without a sequence
+    number, so it's sent once more with the next changes read. The
+    response cache version of the model is moved as well, which the
+    conditional list views use as their validator.
+    """
+    pks = list(pks)
+    if not pks:
+        return
+
+    content_type = ContentType.objects \
+        .db_manager(using) \
+        .get_for_model(model)
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    table = connection.ops.quote_name(Change._meta.db_table)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} '
+            f'(content_type_id, object_id, deleted, sequence) '
+            f'SELECT %s, object_id, %s, NULL '
+            f'FROM unnest(%s::integer[]) AS object_id '
+            f'ON CONFLICT (content_type_id, object_id) DO UPDATE '
+            f'SET deleted = EXCLUDED.deleted, sequence = NULL',
+            [content_type.id, deleted, pks]
+        )
+    invalidate_responses(model._meta.model_name)
+
+
+def touch_objects(model, pks, using=None):
+    """Mark the objects as modified by a change save() doesn't see
+
+    Moves their `last_modified` and records the change for the delta
+    endpoint. Returns the new modification time.
+    """
+    now = timezone.now()
+    pks = list(pks)
+    if not pks:
+        return now
+
+    owner = model._meta.get_field('last_modified').model
+    owner._base_manager.using(using) \
+        .filter(pk__in=pks) \
+        .update(last_modified=now)
+    record_changes(model, pks, using=using)
+
+    return now
+
+
+def assign_sequences(using=None):
+    """Number the changes written since they were last read
+
+    Numbers are given by one reader at a time and only to committed
+    changes, so every change numbered later gets a higher number.
+    """
+    pending = Change.objects.using(using).filter(sequence__isnull=True)
+    if not pending.exists():
+        return
+
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    table = connection.ops.quote_name(Change._meta.db_table)
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [SEQUENCE_LOCK])
+        cursor.execute(
+            f'UPDATE {table} SET sequence = nextval(%s) '
+            f'WHERE sequence IS NULL',
+            [SEQUENCE_NAME]
+        )
+
+
+def get_changes(since, limit):
+    """Return the objects changed and deleted after the sequence number
+
+    At most `limit` changes are returned, the oldest first. `sequence` is
+    the number to ask the next changes from, and `more` tells whether
+    there are changes left after it.
+    """
+    assign_sequences()
+    changes = list(
+        Change.objects
+        .filter(sequence__gt=since)
+        .order_by('sequence')[:limit + 1]
+    )
+    more = len(changes) > limit
+    changes = changes[:limit]
+
+    updated = defaultdict(list)
+    deleted = defaultdict(list)
+    for change in changes:
+        pks = deleted if change.deleted else updated
+        pks[change.content_type_id].append(change.object_id)
+
+    data = {
+        'changed_since': since,
+        'sequence': changes[-1].sequence if changes else since,
+        'more': more,
+    }
+    for name, (queryset, serializer_class) in get_synced_models().items():
+        content_type = ContentType.objects.get_for_model(queryset.model)
+        pks = updated[content_type.id]
+        objs = queryset.in_bulk(pks) if pks else {}
+
+        data[name] = {
+            'updated': serializer_class(
+                [objs[pk] for pk in sorted(objs)],
+                many=True
+            ).data,
+            # Objects deleted after their change was numbered are missing
+            'deleted': sorted(
+                deleted[content_type.id] +
+                [pk for pk in pks if pk not in objs]
+            ),
+        }
+
+    return data
@@ -0,0 +1,152 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Max
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, \
+    quote_etag
+
+from rest_framework import serializers, status
+from rest_framework.response import Response
+
+from core.cache import get_versions
+
+
+class ConditionalGetMixin:
+    """Answers conditional GET requests of the list and detail views
+
+    The state of the data is read before running the view. A detail reads
+    the latest `last_modified` of the object and of its
+    `last_modified_dependencies` with a single aggregate query. A list
+    reads the response cache version of its model, which every recorded
+    change moves, so its cost doesn't grow with the table. Requests whose
+    If-None-Match or If-Modified-Since still match that state are answered
+    with a 304 without serializing anything.
+
+    Lists only get an ETag, since the version tells the data changed but
+    not when.
+    """
+    last_modified_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_etag(request, *get_versions(
+            self.get_version_namespaces()
+        ))
+
+        return self.get_conditional_response(
+            super().list,
+            request,
+            etag,
+            None,
+            *args,
+            **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        last_modified = self.get_object_last_modified()
+        if last_modified is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag = self.get_etag(request, last_modified.isoformat())
+
+        return self.get_conditional_response(
+            super().retrieve,
+            request,
+            etag,
+            last_modified,
+            *args,
+            **kwargs
+        )
+
+    def get_version_namespaces(self):
+        """Return the response cache namespaces the list is made from
+
+        The models nested in the response, like the expanded relations,
+        are included, so renaming a grade changes the lists embedding it.
+        """
+        models = _get_serializer_models(self.get_serializer())
+        return list(dict.fromkeys(model._meta.model_name for model in models))
+
+    def get_object_last_modified(self):
+        """Return when the object or its dependencies last changed
+
+        None is returned when the object doesn't exist, so the view answers
+        as it would otherwise.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        aggregates = {
+            f'{path}__last_modified': Max(f'{path}__last_modified')
+            for path in self.last_modified_dependencies
+        }
+
+        try:
+            values = queryset \
+                .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}) \
+                .order_by() \
+                .aggregate(last_modified=Max('last_modified'), **aggregates)
+        except (TypeError, ValueError, ValidationError):
+            return None
+
+        if values['last_modified'] is None:
+            return None
+        return max(value for value in values.values() if value is not None)
+
+    def get_etag(self, request, *state):
+        """Return the ETag of the response for the given state of the data"""
+        parts = [
+            *state,
+            request.accepted_media_type or '',
+            request.get_full_path(),
+        ]
+        return quote_etag(
+            hashlib.md5(':'.join(parts).encode('utf-8')).hexdigest()
+        )
+
+    def get_conditional_response(self, handler, request, etag, last_modified,
+                                 *args, **kwargs):
+        """Return a 304 if the client's copy is current, else the handler's"""
+        headers = {'ETag': etag}
+        if last_modified is not None:
+            headers['Last-Modified'] = http_date(last_modified.timestamp())
+
+        if _is_not_modified(request, etag, last_modified):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED,
+                headers=headers
+            )
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for name, value in headers.items():
+                response[name] = value
+        return response
+
+
+def _get_serializer_models(serializer):
+    """Return the model of the serializer and of the ones nested in it"""
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    models = [serializer.Meta.model]
+    for field in serializer.fields.values():
+        if isinstance(field, serializers.BaseSerializer):
+            models += _get_serializer_models(field)
+    return models
+
+
+def _is_not_modified(request, etag, last_modified):
+    """Return whether the validators of the request match the current ones
+
+    If-Modified-Since is ignored when If-None-Match is sent, as RFC 7232
+    requires.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return etag in etags or '*' in etags
+
+    if_modified_since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE')
+    )
+    if if_modified_since is None or last_modified is None:
+        return False
+    return int(last_modified.timestamp()) <= if_modified_since
@@ -0,0 +1,182 @@
+import datetime
+import threading
+import traceback
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.models import Job
+
+
+class JobError(Exception):
+    """Raised by a handler to fail its job with a message for the user
+
+    The message is saved as the error instead of a traceback, along with
+    the given result.
+    """
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+def enqueue(kind, params=None, user=None):
+    """Queue a job of the kind, to be run by the next free worker"""
+    if kind not in settings.JOB_KINDS:
+        raise ValueError(f'Unknown job kind: {kind}')
+
+    return Job.objects.create(kind=kind, params=params or {}, created_by=user)
+
+
+def get_lease_end():
+    """Return until when a job taken now is kept by its worker"""
+    return timezone.now() + datetime.timedelta(seconds=settings.JOB_LEASE)
+
+
+def reclaim_jobs():
+    """Queue again the running jobs whose worker stopped keeping them
+
+    Jobs already tried `JOB_MAX_ATTEMPTS` times are failed instead, so a
+    job killing its worker isn't run forever.
+    """
+    now = timezone.now()
+    expired = Job.objects.filter(status=Job.RUNNING, locked_until__lt=now)
+    expired \
+        .filter(attempts__gte=settings.JOB_MAX_ATTEMPTS) \
+        .update(
+            status=Job.FAILED,
+            error='The worker running the job stopped responding',
+            finished=now
+        )
+    expired.update(status=Job.QUEUED, locked_until=None)
+
+
+def dequeue():
+    """Take the oldest queued job and mark it as running
+
+    The queued rows are read with FOR UPDATE SKIP LOCKED, so every worker
+    takes a different job without waiting for the others. Jobs left running
+    by a worker that died are queued again first. None is returned when no
+    job is queued.
+    """
+    reclaim_jobs()
+    with transaction.atomic():
+        job = Job.objects \
+            .select_for_update(skip_locked=True) \
+            .filter(status=Job.QUEUED) \
+            .order_by('pk') \
+            .first()
+        if job is None:
+            return None
+
+        job.status = Job.RUNNING
+        job.started = timezone.now()
+        job.locked_until = get_lease_end()
+        job.attempts += 1
+        job.save(update_fields=[
+            'status', 'started', 'locked_until', 'attempts'
+        ])
+
+    return job
+
+
+def keep_job(job, stop):
+    """Move the lease of the running job forward until `stop` is set
+
+    Runs in its own thread, with its own database connection, so the job
+    is kept however long its handler goes without a query.
+    """
+    try:
+        while not stop.wait(settings.JOB_LEASE / 3):
+            Job.objects \
+                .filter(pk=job.pk, status=Job.RUNNING) \
+                .update(locked_until=get_lease_end())
+    finally:
+        connections.close_all()
+
+
+def run_job(job):
+    """Run the handler of the job, saving its result or the error raised
+
+    The job is kept by a heartbeat thread while the handler runs.
+    """
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=keep_job, args=(job, stop))
+    heartbeat.start()
+    try:
+        handler = import_string(settings.JOB_KINDS[job.kind])
+        result = handler(job, **job.params)
+    except JobError as error:
+        job.status = Job.FAILED
+        job.error = str(error)
+        job.result = error.result
+    except Exception:
+        job.status = Job.FAILED
+        job.error = traceback.format_exc()
+    else:
+        job.status = Job.DONE
+        job.result = result
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    job.finished = timezone.now()
+    job.locked_until = None
+    job.save(update_fields=[
+        'status', 'result', 'error', 'finished', 'locked_until'
+    ])
+    return job
+
+
+def work(stop, once=False, poll_interval=None):
+    """Run queued jobs until `stop` is set, returning how many were run
+
+    Idle workers look for new jobs every `poll_interval` seconds, or stop
+    when `once` is set. The database connection is checked between jobs,
+    as Django does between requests.
+    """
+    if poll_interval is None:
+        poll_interval = settings.JOB_POLL_INTERVAL
+    count = 0
+
+    while not stop.is_set():
+        close_old_connections()
+        job = dequeue()
+        if job is None:
+            if once:
+                break
+            stop.wait(poll_interval)
+            continue
+
+        run_job(job)
+        count += 1
+
+    return count
+
+
+def run_workers(threads, stop, once=False, poll_interval=None):
+    """Run `threads` workers in this process, returning the jobs run
+
+    A single worker runs in the calling thread. Each other thread closes
+    its database connection when it stops.
+    """
+    if threads == 1:
+        return work(stop, once, poll_interval)
+
+    counts = []
+
+    def run_worker():
+        try:
+            counts.append(work(stop, once, poll_interval))
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=run_worker) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    return sum(counts)
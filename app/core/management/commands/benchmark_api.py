@@ -0,0 +1,133 @@
+import json
+import platform
+import subprocess
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from core.benchmark import \
+    benchmark_database, seed_database, count_database, run_benchmarks, \
+    compare_results
+
+
+class Command(BaseCommand):
+    """Benchmark every API endpoint against a seeded test database
+
+    The database is created and destroyed like the test runner does, so
+    the data of the configured database is never touched.
+    """
+    help = (
+        "Seed a test database and measure every GET endpoint, the extra "
+        "actions of the routers included, and the bulk updates. The "
+        "other writes are not measured, as they change the data"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grades', type=int, default=10)
+        parser.add_argument('--classrooms', type=int, default=200)
+        parser.add_argument('--students', type=int, default=10000)
+        parser.add_argument('--teachers', type=int, default=500)
+        parser.add_argument(
+            '--enrollments',
+            type=int,
+            default=5,
+            help="Classrooms each student and teacher is enrolled in"
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help="Timed requests per endpoint"
+        )
+        parser.add_argument(
+            '--output',
+            help="Write the results as JSON to this file"
+        )
+        parser.add_argument(
+            '--compare',
+            help="Compare the results with a previous JSON output"
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help="Keep the benchmark database between runs"
+        )
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options['keepdb']):
+            self.stdout.write("Seeding the database...")
+            if options['keepdb'] and _is_seeded():
+                volumes = count_database()
+            else:
+                volumes = seed_database(
+                    grades=options['grades'],
+                    classrooms=options['classrooms'],
+                    students=options['students'],
+                    teachers=options['teachers'],
+                    enrollments=options['enrollments'],
+                )
+
+            self.stdout.write("Measuring the endpoints...")
+            results = run_benchmarks(repeat=options['repeat'])
+
+        self._write_table(results)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump({
+                    'commit': _get_commit(),
+                    'date': datetime.now().isoformat(),
+                    'python': platform.python_version(),
+                    'volumes': volumes,
+                    'results': results,
+                }, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['compare']:
+            with open(options['compare']) as baseline_file:
+                baseline = json.load(baseline_file)
+            self._write_comparison(baseline, results)
+
+    def _write_table(self, results):
+        self.stdout.write(
+            f"{'endpoint':<28}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"
+            f"{'queries':>9}{'peak KB':>10}{'size KB':>10}"
+        )
+        for name, metrics in results.items():
+            self.stdout.write(
+                f"{name:<28}{metrics['p50_ms']:>10.2f}"
+                f"{metrics['p90_ms']:>10.2f}{metrics['p99_ms']:>10.2f}"
+                f"{metrics['queries']:>9}{metrics['peak_memory_kb']:>10.1f}"
+                f"{metrics['response_kb']:>10.1f}"
+            )
+
+    def _write_comparison(self, baseline, results):
+        self.stdout.write(
+            f"\nCompared with {baseline.get('commit') or 'the baseline'}:"
+        )
+        for name, metric, before, after, change in compare_results(
+            baseline['results'],
+            results
+        ):
+            line = f"{name:<28}{metric:<16}{before:>12}{after:>12}" \
+                   f"{change:>+9.1f}%"
+            if change > 10 and metric != 'response_kb':
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
+
+
+def _is_seeded():
+    """Return whether a kept benchmark database already has data"""
+    from member.models import Student
+    return Student.objects.exists()
+
+
+def _get_commit():
+    """Return the current git commit, if available"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+
+from core.benchmark import \
+    benchmark_database, seed_database, get_benchmark_user, get_endpoints, \
+    measure_connection_setup, measure_connection_reuse
+
+
+class Command(BaseCommand):
+    """Measure the request latency with and without persistent connections
+
+    The requests go through the WSGI handler, which opens and closes the
+    database connections as a server does, on a seeded test database.
+    """
+    help = "Compare the request latency with and without CONN_MAX_AGE"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=200,
+            help="Requests per endpoint and setting"
+        )
+        parser.add_argument(
+            '--conn-max-age',
+            type=int,
+            default=60,
+            help="CONN_MAX_AGE of the persistent connections"
+        )
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        profiles = [
+            ('CONN_MAX_AGE=0', 0, False),
+            (f"CONN_MAX_AGE={options['conn_max_age']}",
+             options['conn_max_age'], False),
+            ('+ health checks', options['conn_max_age'], True),
+        ]
+
+        with benchmark_database():
+            self.stdout.write("Seeding the database...")
+            seed_database(students=1000, teachers=100, classrooms=50)
+            user = get_benchmark_user()
+            setup_ms = measure_connection_setup()
+            endpoints = [
+                (name, url) for name, url in get_endpoints()
+                if 'detail' in name or 'page' in name
+            ]
+
+            results = []
+            for name, url in endpoints:
+                for profile, conn_max_age, health_checks in profiles:
+                    results.append((name, profile, measure_connection_reuse(
+                        user,
+                        url,
+                        repeat,
+                        conn_max_age,
+                        health_checks
+                    )))
+
+        self.stdout.write(f"\nOpening a connection takes {setup_ms:.2f} ms\n")
+        self.stdout.write(
+            f"{'endpoint':<24}{'profile':<20}{'p50 ms':>10}{'p90 ms':>10}"
+            f"{'connections':>13}"
+        )
+        for name, profile, result in results:
+            self.stdout.write(
+                f"{name:<24}{profile:<20}{result['p50_ms']:>10.2f}"
+                f"{result['p90_ms']:>10.2f}{result['connections']:>13}"
+            )
@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.benchmark import \
+    benchmark_database, seed_database, get_benchmark_user, \
+    get_read_endpoints, load_test_wsgi, load_test_asgi
+
+
+class Command(BaseCommand):
+    """Compare the read throughput under WSGI and ASGI
+
+    The read endpoints are requested by many concurrent clients through
+    the WSGI handler and through the ASGI handler. The database is created
+    and destroyed like the test runner does.
+    """
+    help = "Load test the read endpoints under WSGI and ASGI"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--teachers', type=int, default=200)
+        parser.add_argument('--classrooms', type=int, default=100)
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help="Requests sent in each run"
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=200,
+            help="Clients sending requests at the same time"
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=20,
+            help="Threads of the WSGI server"
+        )
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            # The WSGI test client keeps its connections open, so the ASGI
+            # handler's threads keep theirs too
+            connection.settings_dict['CONN_MAX_AGE'] = None
+
+            self.stdout.write("Seeding the database...")
+            seed_database(
+                students=options['students'],
+                teachers=options['teachers'],
+                classrooms=options['classrooms'],
+            )
+            user = get_benchmark_user()
+            endpoints = get_read_endpoints()
+            urls = [url for _, url in endpoints]
+            requests = options['requests']
+            concurrency = options['concurrency']
+
+            results = []
+            self.stdout.write("Load testing WSGI...")
+            results.append(('wsgi', load_test_wsgi(
+                user, urls, requests, concurrency, options['threads']
+            )))
+            self.stdout.write("Load testing ASGI...")
+            results.append(('asgi', load_test_asgi(
+                user, urls, requests, concurrency
+            )))
+
+        self.stdout.write(
+            f"\n{len(urls)} endpoints, {requests} requests, "
+            f"{concurrency} concurrent clients\n"
+        )
+        self.stdout.write(
+            f"{'handler':<20}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}"
+            f"{'errors':>8}"
+        )
+        for name, result in results:
+            self.stdout.write(
+                f"{name:<20}{result['requests_per_second']:>10.1f}"
+                f"{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                f"{result['errors']:>8}"
+            )
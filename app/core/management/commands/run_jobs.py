@@ -0,0 +1,95 @@
+import multiprocessing
+import signal
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.jobs import run_workers
+
+
+class Command(BaseCommand):
+    """Run the queued background jobs until stopped
+
+    Every process runs `--threads` workers, each taking one job at a time.
+    SIGINT and SIGTERM let the running jobs finish before stopping.
+    """
+    help = "Run the queued background jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=settings.JOB_WORKER_PROCESSES,
+            help="Worker processes to start"
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=settings.JOB_WORKER_THREADS,
+            help="Workers in every process"
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.JOB_POLL_INTERVAL,
+            help="Seconds idle workers wait before looking for jobs again"
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="Stop once no job is queued"
+        )
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        worker_args = [options['threads']]
+        worker_kwargs = {
+            'once': options['once'],
+            'poll_interval': options['poll_interval'],
+        }
+
+        if processes == 1:
+            stop = threading.Event()
+            with stop_on_signals(stop):
+                count = run_workers(*worker_args, stop, **worker_kwargs)
+            self.stdout.write(self.style.SUCCESS(f"Ran {count} jobs"))
+            return
+
+        # The forked processes can't share the database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        stop = context.Event()
+        workers = [
+            context.Process(
+                target=run_workers,
+                args=[*worker_args, stop],
+                kwargs=worker_kwargs
+            )
+            for _ in range(processes)
+        ]
+        with stop_on_signals(stop):
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+        self.stdout.write(self.style.SUCCESS("Workers stopped"))
+
+
+@contextmanager
+def stop_on_signals(stop):
+    """Set the stop event on SIGINT and SIGTERM while in the block"""
+    signums = [signal.SIGINT, signal.SIGTERM]
+    previous = [
+        signal.signal(signum, lambda signum, frame: stop.set())
+        for signum in signums
+    ]
+
+    try:
+        yield
+    finally:
+        for signum, handler in zip(signums, previous):
+            signal.signal(signum, handler)
@@ -0,0 +1,218 @@
+import json
+import logging
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('core.timing')
+
+
+class RequestTiming:
+    """The timings collected while handling a single request"""
+
+    def __init__(self):
+        self.start = perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.slow_queries = []
+        self.view = None
+        self.action = None
+        self.view_start = None
+        self.view_time = None
+        self.view_sql_time = None
+        self.render_start = None
+        self.render_time = None
+        self.serialize_time = 0.0
+
+    @contextmanager
+    def time_queries(self):
+        """Time the queries of every connection of the current thread"""
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(self.record_query)
+                )
+            yield
+
+    def record_query(self, execute, sql, params, many, context):
+        """Database execute wrapper timing every query"""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - start
+            self.queries += 1
+            self.sql_time += duration
+            if duration * 1000 >= settings.REQUEST_TIMING_SLOW_QUERY_MS:
+                self.slow_queries.append((sql, duration))
+
+    def rendered(self, response):
+        """Post render callback closing the render timing"""
+        self.render_time = perf_counter() - self.render_start
+
+
+class TimedDataSerializerMixin:
+    """Serializer adding the time spent building its data to the request
+
+    The SQL run meanwhile, such as lazily loaded relations, is left out as
+    it's already counted in the SQL time.
+    """
+
+    @property
+    def data(self):
+        timing = self.context['request'].timing
+        start = perf_counter()
+        sql_time = timing.sql_time
+        try:
+            return super().data
+        finally:
+            timing.serialize_time += perf_counter() - start \
+                - (timing.sql_time - sql_time)
+
+
+@lru_cache(maxsize=None)
+def _get_timed_serializer_class(serializer_class):
+    return type(
+        serializer_class.__name__,
+        (TimedDataSerializerMixin, serializer_class),
+        {}
+    )
+
+
+class SerializerTimingMixin:
+    """Adds the time spent in `serializer.data` to the request timing
+
+    Only the serializers of the view are timed, so it must come before the
+    mixins building them. Nothing changes unless the request is timed.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if hasattr(self.request, 'timing'):
+            serializer.__class__ = \
+                _get_timed_serializer_class(serializer.__class__)
+        return serializer
+
+
+class RequestTimingMiddleware:
+    """Reports where the time of each request is spent
+
+    Adds a `Server-Timing` header with the SQL time and query count, the
+    time spent in `serializer.data` (by the views with the
+    `SerializerTimingMixin`) and in the rest of the view outside SQL, the
+    render time and the total. The same figures are logged as a JSON line
+    on the `core.timing` logger, along with every query slower than
+    `REQUEST_TIMING_SLOW_QUERY_MS`.
+
+    The queries of a streaming response run while it's sent, after the
+    headers, so its header only covers the time until the stream starts
+    and its log line is written once the stream ends, with the queries of
+    the whole stream.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = request.timing = RequestTiming()
+
+        with timing.time_queries():
+            response = self.get_response(request)
+
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration * 1000:.2f}' +
+            (f';desc="{desc}"' if desc else '')
+            for name, duration, desc in self._get_metrics(timing)
+        )
+        if response.streaming:
+            response.streaming_content = self._stream(
+                request, response, timing, response.streaming_content
+            )
+        else:
+            self._log(request, response, timing)
+
+        return response
+
+    def _stream(self, request, response, timing, content):
+        """Yield the streamed content, timing the queries producing it"""
+        try:
+            while True:
+                with timing.time_queries():
+                    chunk = next(content, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            self._log(request, response, timing)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = request.timing
+        view_class = getattr(view_func, 'cls', None)
+        actions = getattr(view_func, 'actions', None) or {}
+
+        timing.view = view_class.__name__ if view_class \
+            else view_func.__name__
+        timing.action = actions.get(request.method.lower())
+        timing.view_start = perf_counter()
+        timing.view_sql_time = timing.sql_time
+
+    def process_template_response(self, request, response):
+        timing = request.timing
+        if timing.view_start is not None:
+            timing.view_time = perf_counter() - timing.view_start
+            timing.view_sql_time = timing.sql_time - timing.view_sql_time
+
+        timing.render_start = perf_counter()
+        response.add_post_render_callback(timing.rendered)
+        return response
+
+    def _get_metrics(self, timing):
+        metrics = [
+            ('db', timing.sql_time, f'{timing.queries} queries'),
+            ('serialize', timing.serialize_time, 'serializer.data'),
+        ]
+        if timing.view_time is not None:
+            metrics.append((
+                'view',
+                max(
+                    timing.view_time - timing.view_sql_time
+                    - timing.serialize_time,
+                    0.0
+                ),
+                'view code outside SQL and serializers'
+            ))
+        if timing.render_time is not None:
+            metrics.append(('render', timing.render_time, None))
+        metrics.append(('total', perf_counter() - timing.start, None))
+
+        return metrics
+
+    def _log(self, request, response, timing):
+        context = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'view': timing.view,
+            'action': timing.action,
+        }
+        logger.info(json.dumps({
+            'event': 'request',
+            **context,
+            'queries': timing.queries,
+            **{
+                f'{name}_ms': round(duration * 1000, 2)
+                for name, duration, _ in self._get_metrics(timing)
+            },
+        }))
+
+        for sql, duration in timing.slow_queries:
+            logger.warning(json.dumps({
+                'event': 'slow_query',
+                **context,
+                'duration_ms': round(duration * 1000, 2),
+                'sql': sql,
+            }))
@@ -0,0 +1,67 @@
+# Generated by Django 3.1.14 on 2026-10-17 12:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+SYNCED_MODELS = [
+    ('grade', 'grade'),
+    ('classroom', 'classroom'),
+    ('member', 'student'),
+    ('member', 'teacher'),
+]
+
+
+def record_existing_objects(apps, schema_editor):
+    """Record every existing object as changed, so clients get them all"""
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    for app_label, model_name in SYNCED_MODELS:
+        model = apps.get_model(app_label, model_name)
+        content_type, _ = ContentType.objects.get_or_create(
+            app_label=app_label,
+            model=model_name
+        )
+        schema_editor.execute(
+            f'INSERT INTO core_change (content_type_id, object_id, deleted) '
+            f'SELECT %s, {model._meta.pk.column}, false '
+            f'FROM {model._meta.db_table}',
+            [content_type.id]
+        )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('grade', '0002_grade_last_modified'),
+        ('classroom', '0003_classroom_last_modified'),
+        ('member', '0010_member_last_modified'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('sequence', models.BigIntegerField(null=True, unique=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(condition=models.Q(sequence__isnull=True), fields=['id'], name='core_change_pending_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='change',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id'), name='core_change_object_key'),
+        ),
+        migrations.RunSQL(
+            'CREATE SEQUENCE core_change_sequence',
+            'DROP SEQUENCE core_change_sequence',
+        ),
+        migrations.RunPython(record_existing_objects, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class Change(models.Model):
+    """The latest change of a synced object, for the delta endpoint
+
+    There is a single row per object, written again on every change with
+    an empty `sequence`. Sequence numbers are only given when the changes
+    are read, in order and one reader at a time, so a change committed
+    late can't get a number below one a client has already seen.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    deleted = models.BooleanField(default=False)
+    sequence = models.BigIntegerField(null=True, unique=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_type', 'object_id'],
+                name='core_change_object_key',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['id'],
+                condition=models.Q(sequence__isnull=True),
+                name='core_change_pending_idx',
+            ),
+        ]
+
+
+class Job(models.Model):
+    """A piece of work run in the background by the `run_jobs` workers
+
+    `kind` names one of the `JOB_KINDS` handlers, which is called with the
+    job and its `params` and returns the `result`. Queued jobs are taken
+    by the workers oldest first. A running job is taken `locked_until` a
+    time its worker keeps moving, after which the job is taken again.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    _status_choices = [
+        (QUEUED, _('Queued')),
+        (RUNNING, _('Running')),
+        (DONE, _('Done')),
+        (FAILED, _('Failed')),
+    ]
+
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10,
+        choices=_status_choices,
+        default=QUEUED
+    )
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='+'
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['id'],
+                condition=models.Q(status='queued'),
+                name='core_job_queued_idx',
+            ),
+            models.Index(
+                fields=['locked_until'],
+                condition=models.Q(status='running'),
+                name='core_job_running_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} #{self.pk}'
+
+    def report_progress(self, progress, total=None):
+        """Save how much of the work is done, right away"""
+        self.progress = progress
+        if total is not None:
+            self.total = total
+        Job.objects.filter(pk=self.pk).update(
+            progress=self.progress,
+            total=self.total
+        )
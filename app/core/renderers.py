@@ -0,0 +1,58 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from rest_framework.renderers import BaseRenderer
+
+
+class Echo:
+    """File-like object returning what is written instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Renders a list of rows as newline delimited JSON"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(self._encode(row) for row in rows).encode(self.charset)
+
+    def stream(self, fields, rows):
+        """Yield one encoded line for each of the rows value tuples"""
+        for row in rows:
+            yield self._encode(dict(zip(fields, row))).encode(self.charset)
+
+    def _encode(self, row):
+        return json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+class CSVRenderer(BaseRenderer):
+    """Renders a list of rows as CSV, with a header line"""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0].keys()) if rows else []
+        return b''.join(self.stream(
+            fields,
+            ([row.get(field) for field in fields] for row in rows)
+        ))
+
+    def stream(self, fields, rows):
+        """Yield the encoded header followed by one line for each row"""
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields).encode(self.charset)
+        for row in rows:
+            yield writer.writerow(row).encode(self.charset)
@@ -0,0 +1,25 @@
+from rest_framework import serializers
+
+from core.models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for the Job model"""
+
+    class Meta:
+        model = Job
+        fields = [
+            'id',
+            'kind',
+            'params',
+            'status',
+            'progress',
+            'total',
+            'result',
+            'error',
+            'attempts',
+            'created',
+            'started',
+            'finished',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.dispatch import receiver
+
+
+@receiver(request_started)
+def check_persistent_connections(sender, **kwargs):
+    """Close the persistent connections that stopped working
+
+    Django reuses a persistent connection without checking it, so one the
+    server or a pooler dropped fails the first query of the next request.
+    Enabled by the `DB_CONN_HEALTH_CHECKS` setting, at the cost of a
+    `SELECT 1` per open connection and request.
+    """
+    if not getattr(settings, 'DB_CONN_HEALTH_CHECKS', False):
+        return
+
+    for connection in connections.all():
+        if connection.connection is not None and \
+                not connection.in_atomic_block and \
+                not connection.is_usable():
+            connection.close()
@@ -0,0 +1,146 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsSerializerMixin:
+    """Serializer returning the fields and nested relations asked for
+
+    The `fields` and `expand` lists of the context choose the fields
+    returned and the relations rendered as nested objects instead of ids.
+    Without them, the fields not in `default_exclude` are returned, with
+    the relations in `default_expand` nested. The id is always returned.
+
+    `expandable_fields` maps every relation that can be nested to its
+    serializer class and options, and `field_columns` maps the fields
+    computed from model properties to the columns they read.
+    """
+    default_exclude = ()
+    default_expand = ()
+    expandable_fields = {}
+    field_columns = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        context = kwargs.get('context') or {}
+        fields = context.get('fields')
+        expand = context.get('expand')
+        asked = expand or []
+
+        if expand is None:
+            expand = self.default_expand
+        unknown = set(expand) - set(self.expandable_fields)
+        if unknown:
+            raise ValidationError({'expand': [
+                _('Unknown relations: %(names)s.')
+                % {'names': ', '.join(sorted(unknown))}
+            ]})
+
+        if fields is None:
+            keep = set(self.fields) - set(self.default_exclude) | set(asked)
+        else:
+            unknown = set(fields) - set(self.fields)
+            if unknown:
+                raise ValidationError({'fields': [
+                    _('Unknown fields: %(names)s.')
+                    % {'names': ', '.join(sorted(unknown))}
+                ]})
+            keep = {'id', *fields, *asked}
+
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
+
+        for name, (serializer_class, options) in \
+                self.expandable_fields.items():
+            field = self.fields.get(name)
+            nested = isinstance(field, serializers.BaseSerializer)
+            if field is None or nested == (name in expand):
+                continue
+            if nested:
+                self.fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True,
+                    many=options.get('many', False)
+                )
+            else:
+                self.fields[name] = serializer_class(read_only=True, **options)
+
+
+class SparseFieldsMixin:
+    """Adds the `fields` and `expand` parameters to the read views
+
+    Both take a comma separated list of names. The queryset then only
+    loads the columns of the fields returned, joins the nested relations
+    and prefetches the many to many relations returned.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    sparse_actions = ['list', 'retrieve', 'batch']
+
+    def get_sparse_params(self):
+        """Return the (fields, expand) lists asked for, None if not given"""
+        if self.action not in self.sparse_actions:
+            return None, None
+
+        return tuple(
+            _get_names_from_param(self.request.query_params.get(param))
+            for param in [self.fields_query_param, self.expand_query_param]
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'], context['expand'] = self.get_sparse_params()
+        return context
+
+    def get_sparse_queryset(self, queryset):
+        """Return the queryset loading only what the serializer returns"""
+        if self.action not in self.sparse_actions:
+            return queryset
+
+        fields, expand = self.get_sparse_params()
+        serializer = self.get_serializer_class()(
+            context={'fields': fields, 'expand': expand}
+        )
+        model = queryset.model
+        columns = {model._meta.pk.name}
+        columns.update(getattr(self.paginator, 'ordering', None) or ())
+        related, prefetches = [], []
+
+        for name, field in serializer.fields.items():
+            if name in serializer.field_columns:
+                columns.update(serializer.field_columns[name])
+                continue
+
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                # The columns read by the field are unknown
+                return queryset
+
+            nested = isinstance(field, serializers.BaseSerializer)
+            if model_field.many_to_many:
+                prefetch_queryset = model_field.related_model.objects.all()
+                if not nested:
+                    prefetch_queryset = prefetch_queryset.only('pk')
+                prefetches.append(Prefetch(field.source, prefetch_queryset))
+            else:
+                columns.add(model_field.name)
+                if nested:
+                    related.append(field.source)
+
+        queryset = queryset.only(*columns)
+        if related:
+            queryset = queryset.select_related(*related)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
+
+
+def _get_names_from_param(param_str):
+    """Return the names in a comma separated parameter, None if not given"""
+    if param_str is None:
+        return None
+    return [name.strip() for name in param_str.split(',') if name.strip()]
@@ -1,8 +1,62 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
 from django.core.management import call_command
-from unittest.mock import patch
+from django.shortcuts import reverse
+from unittest.mock import patch, Mock
 from django.db.utils import OperationalError
 
+from member.models import Student, Teacher
+from grade.models import Grade
+from classroom.models import Classroom
+from rest_framework.test import APIClient
+
+from core.utils import \
+    sample_student, sample_teacher, sample_grade, sample_classroom, \
+    sample_student_payload, sample_user
+from core.benchmark import \
+    seed_database, count_database, get_benchmark_user, get_endpoints, \
+    get_write_endpoints, run_benchmarks, compare_results, \
+    percentile, get_read_endpoints, load_test_wsgi, load_test_asgi, \
+    measure_connection_reuse
+from core.changes import assign_sequences, record_changes
+from core.jobs import enqueue, dequeue, run_job
+from core.models import Change, Job
+from core.signals import check_persistent_connections
+
+
+TEST_JOB_KINDS = {
+    'sample': 'core.tests.sample_job',
+    'failing': 'core.tests.failing_job',
+    'slow': 'core.tests.slow_job',
+}
+
+
+def sample_job(job, count=3):
+    """Job handler counting up to `count`, reporting the progress"""
+    for done in range(count + 1):
+        job.report_progress(done, count)
+    return {'counted': count}
+
+
+def failing_job(job):
+    """Job handler always failing"""
+    raise RuntimeError('Job failed')
+
+
+def slow_job(job, seconds):
+    """Job handler waiting without queries, returning its lease end"""
+    time.sleep(seconds)
+    return Job.objects.get(pk=job.pk).locked_until.isoformat()
+
 
 class AuxCursorClass:
     """A class whose objects can call a cursor method successully"""
@@ -21,3 +75,592 @@ class CommandTests(TestCase):
             gi.side_effect = [OperationalError] * 5 + [AuxCursorClass()]
             call_command('wait_for_db')
             self.assertTrue(gi.call_count, 6)
+
+
+class BenchmarkTests(TestCase):
+    """Test the benchmark harness"""
+
+    def test_seed_database(self):
+        """Test the database is seeded with the requested volumes"""
+        volumes = seed_database(
+            grades=3,
+            classrooms=5,
+            students=20,
+            teachers=4,
+            enrollments=2
+        )
+
+        self.assertEqual(volumes['students'], 20)
+        self.assertEqual(Student.objects.count(), 20)
+        self.assertEqual(Teacher.objects.count(), 4)
+        self.assertEqual(Classroom.objects.count(), 5)
+        self.assertEqual(volumes['enrollments'], 48)
+        self.assertEqual(Student.classes.through.objects.count(), 40)
+        self.assertEqual(count_database(), volumes)
+
+    def test_benchmark_user_reused(self):
+        """Test the benchmark user of a kept database is used again"""
+        self.assertEqual(get_benchmark_user(), get_benchmark_user())
+
+    def test_run_benchmarks(self):
+        """Test every router endpoint is measured"""
+        seed_database(grades=2, classrooms=2, students=5, teachers=2)
+        endpoints = get_endpoints()
+        results = run_benchmarks(repeat=2, endpoints=endpoints)
+
+        self.assertEqual(len(results), len(endpoints))
+        self.assertIn('student list', results)
+        self.assertIn('student detail', results)
+        self.assertIn('classroom detail', results)
+        self.assertIn('classroom roster', results)
+        self.assertIn('student batch', results)
+        self.assertIn('teacher export', results)
+        self.assertIn('member stats', results)
+        for metrics in results.values():
+            self.assertLessEqual(metrics['p50_ms'], metrics['p99_ms'])
+            self.assertGreaterEqual(metrics['queries'], 0)
+        self.assertGreater(results['student export']['response_kb'], 0)
+
+    def test_run_write_benchmarks(self):
+        """Test the bulk updates are measured and leave the data as it was"""
+        seed_database(grades=2, classrooms=2, students=5, teachers=2)
+        names = dict(Student.objects.values_list('pk', 'fullname'))
+        results = run_benchmarks(repeat=2, endpoints=get_write_endpoints())
+
+        self.assertEqual(
+            set(results),
+            {'student bulk update', 'teacher bulk update'}
+        )
+        self.assertEqual(
+            dict(Student.objects.values_list('pk', 'fullname')),
+            names
+        )
+
+    def test_percentile(self):
+        """Test the nearest rank percentile"""
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3], 90), 3)
+
+    def test_compare_results(self):
+        """Test the relative change of each metric is computed"""
+        rows = compare_results(
+            {'grade list': {'p50_ms': 2.0, 'queries': 0}},
+            {'grade list': {'p50_ms': 3.0, 'queries': 0}, 'new': {}}
+        )
+
+        self.assertIn(('grade list', 'p50_ms', 2.0, 3.0, 50.0), rows)
+        self.assertIn(('grade list', 'queries', 0, 0, 0.0), rows)
+
+
+@override_settings(
+    MIDDLEWARE=['core.middleware.RequestTimingMiddleware'] +
+    settings.MIDDLEWARE
+)
+class RequestTimingMiddlewareTests(TestCase):
+    """Test the request timing middleware"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        sample_student()
+        sample_student()
+
+    def _parse_server_timing(self, header):
+        """Return the Server-Timing metrics as a dict by name"""
+        metrics = {}
+        for metric in header.split(', '):
+            name, *params = metric.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_server_timing_header(self):
+        """Test the timings are added to the response headers"""
+        with self.assertLogs('core.timing', 'INFO'):
+            res = self.client.get(reverse('member:student-list'))
+        metrics = self._parse_server_timing(res['Server-Timing'])
+
+        self.assertEqual(
+            set(metrics),
+            {'db', 'serialize', 'view', 'render', 'total'}
+        )
+        self.assertEqual(metrics['db']['desc'], '"1 queries"')
+        self.assertGreater(float(metrics['serialize']['dur']), 0)
+        self.assertGreater(float(metrics['total']['dur']), 0)
+
+    def test_serializer_data_timed(self):
+        """Test the serialize time is the time spent in serializer.data"""
+        with patch(
+            'rest_framework.serializers.ListSerializer.to_representation',
+            side_effect=lambda data: time.sleep(0.05) or []
+        ), self.assertLogs('core.timing', 'INFO') as logs:
+            self.client.get(reverse('member:student-list'))
+        line = json.loads(logs.records[0].getMessage())
+
+        self.assertGreaterEqual(line['serialize_ms'], 50)
+        self.assertLess(line['view_ms'], 50)
+
+    def test_streaming_response_queries(self):
+        """Test the queries run while streaming are logged at its end"""
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            res = self.client.get(reverse('member:student-export'))
+            self.assertEqual(logs.records, [])
+            b''.join(res.streaming_content)
+        metrics = self._parse_server_timing(res['Server-Timing'])
+        line = json.loads(logs.records[0].getMessage())
+
+        self.assertEqual(line['action'], 'export')
+        self.assertEqual(metrics['db']['desc'], '"0 queries"')
+        self.assertGreater(line['queries'], 0)
+
+    def test_request_log_line(self):
+        """Test a structured log line is written for every request"""
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            self.client.get(reverse('member:student-list'))
+        line = json.loads(logs.records[0].getMessage())
+
+        self.assertEqual(line['event'], 'request')
+        self.assertEqual(line['view'], 'StudentViewSet')
+        self.assertEqual(line['action'], 'list')
+        self.assertEqual(line['status'], 200)
+        self.assertEqual(line['queries'], 1)
+        self.assertIn('db_ms', line)
+        self.assertIn('serialize_ms', line)
+
+    @override_settings(REQUEST_TIMING_SLOW_QUERY_MS=0)
+    def test_slow_queries_logged(self):
+        """Test the queries over the threshold are logged with the view"""
+        with self.assertLogs('core.timing', 'WARNING') as logs:
+            self.client.get(reverse('member:student-list'))
+        line = json.loads(logs.records[0].getMessage())
+
+        self.assertEqual(line['event'], 'slow_query')
+        self.assertEqual(line['view'], 'StudentViewSet')
+        self.assertEqual(line['action'], 'list')
+        self.assertIn('member_student', line['sql'])
+
+
+class LoadTestTests(TransactionTestCase):
+    """Test the load tests of the read endpoints
+
+    The requests are handled in other threads, so the data must be
+    committed for them to see it.
+    """
+
+    def setUp(self):
+        self.user = sample_user()
+        grade = sample_grade()
+        sample_classroom(grade=grade)
+        sample_student(grade=grade)
+
+    def test_load_tests(self):
+        """Test the load tests send every request"""
+        urls = [url for _, url in get_read_endpoints()]
+        for result in [
+            load_test_wsgi(self.user, urls, 8, concurrency=4, threads=2),
+            load_test_asgi(self.user, urls, 8, concurrency=4),
+        ]:
+            self.assertEqual(result['requests'], 8)
+            self.assertEqual(result['errors'], 0)
+            self.assertGreater(result['requests_per_second'], 0)
+
+
+class PersistentConnectionTests(TransactionTestCase):
+    """Test the persistent database connections"""
+
+    def setUp(self):
+        self.user = sample_user()
+        sample_grade()
+
+    def test_connection_reused(self):
+        """Test a single connection serves every request when persistent"""
+        url = reverse('grade:grade-list')
+        closing = measure_connection_reuse(self.user, url, 5, conn_max_age=0)
+        persistent = measure_connection_reuse(
+            self.user, url, 5, conn_max_age=60, health_checks=True
+        )
+
+        self.assertEqual(closing['connections'], 5)
+        self.assertEqual(persistent['connections'], 1)
+
+    def test_broken_connection_closed(self):
+        """Test the health check closes the connections no longer usable"""
+        broken = Mock(in_atomic_block=False, **{'is_usable.return_value': 0})
+        working = Mock(in_atomic_block=False, **{'is_usable.return_value': 1})
+
+        with patch('core.signals.connections') as connections:
+            connections.all.return_value = [broken, working]
+            with override_settings(DB_CONN_HEALTH_CHECKS=True):
+                check_persistent_connections(sender=None)
+
+        broken.close.assert_called_once()
+        working.close.assert_not_called()
+
+    def test_health_checks_disabled(self):
+        """Test the connections are not checked unless enabled"""
+        broken = Mock(in_atomic_block=False, **{'is_usable.return_value': 0})
+
+        with patch('core.signals.connections') as connections:
+            connections.all.return_value = [broken]
+            check_persistent_connections(sender=None)
+
+        broken.is_usable.assert_not_called()
+        broken.close.assert_not_called()
+
+
+CHANGES_URL = reverse('core:changes')
+
+
+class ChangesViewTests(TestCase):
+    """Test the delta endpoint of the synced objects"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.classroom = sample_classroom()
+        self.grade = self.classroom.grade
+        self.student = sample_student(grade=self.grade)
+        self.student.classes.add(self.classroom)
+        self.teacher = sample_teacher()
+
+    def get_changes(self, since=0):
+        """Return the changes after the sequence number"""
+        res = self.client.get(CHANGES_URL, {'changed_since': since})
+        self.assertEqual(res.status_code, 200)
+        return res.data
+
+    def updated_ids(self, changes, name):
+        return [obj['id'] for obj in changes[name]['updated']]
+
+    def test_unauthenticated_negative(self):
+        """Test the changes can't be read without authentication"""
+        res = APIClient().get(CHANGES_URL)
+
+        self.assertEqual(res.status_code, 403)
+
+    def test_invalid_sequence_negative(self):
+        """Test the sequence number must be a positive integer"""
+        res = self.client.get(CHANGES_URL, {'changed_since': '-1'})
+
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('changed_since', res.data)
+
+    def test_initial_sync(self):
+        """Test every object is returned when syncing from the start"""
+        changes = self.get_changes()
+
+        self.assertFalse(changes['more'])
+        self.assertGreater(changes['sequence'], 0)
+        self.assertEqual(self.updated_ids(changes, 'grades'), [self.grade.id])
+        self.assertEqual(
+            self.updated_ids(changes, 'classrooms'),
+            [self.classroom.id]
+        )
+        self.assertEqual(
+            changes['students']['updated'][0]['classes'],
+            [self.classroom.id]
+        )
+        self.assertEqual(
+            self.updated_ids(changes, 'teachers'),
+            [self.teacher.id]
+        )
+
+    def test_only_changes_returned(self):
+        """Test only the objects changed after the sequence are returned"""
+        sequence = self.get_changes()['sequence']
+        self.assertEqual(
+            self.get_changes(sequence)['sequence'],
+            sequence
+        )
+
+        self.teacher.fullname = 'Changed Name'
+        self.teacher.save()
+        changes = self.get_changes(sequence)
+
+        self.assertGreater(changes['sequence'], sequence)
+        self.assertEqual(self.updated_ids(changes, 'teachers'),
+                         [self.teacher.id])
+        self.assertEqual(changes['students']['updated'], [])
+        self.assertEqual(changes['grades']['updated'], [])
+
+    def test_deleted_objects(self):
+        """Test deleted objects are returned as tombstones"""
+        sequence = self.get_changes()['sequence']
+        student_id = self.student.id
+        self.student.delete()
+
+        changes = self.get_changes(sequence)
+
+        self.assertEqual(changes['students']['updated'], [])
+        self.assertEqual(changes['students']['deleted'], [student_id])
+
+    def test_grade_delete(self):
+        """Test the objects losing a deleted grade are returned"""
+        sequence = self.get_changes()['sequence']
+        grade_id = self.grade.id
+        self.grade.delete()
+
+        changes = self.get_changes(sequence)
+
+        self.assertEqual(changes['grades']['deleted'], [grade_id])
+        self.assertIsNone(changes['students']['updated'][0]['grade'])
+        self.assertIsNone(changes['classrooms']['updated'][0]['grade'])
+
+    def test_classes_change(self):
+        """Test members whose classes changed are returned"""
+        sequence = self.get_changes()['sequence']
+        self.classroom.teachers.add(self.teacher)
+
+        changes = self.get_changes(sequence)
+
+        self.assertEqual(
+            changes['teachers']['updated'][0]['classes'],
+            [self.classroom.id]
+        )
+        self.assertEqual(changes['classrooms']['updated'], [])
+
+    def test_bulk_changes(self):
+        """Test members created and updated in bulk are returned"""
+        sequence = self.get_changes()['sequence']
+        created = Student.objects.bulk_create([
+            Student(**sample_student_payload())
+        ])
+        self.student.fullname = 'Bulk Name'
+        Student.objects.bulk_update([self.student], ['fullname'])
+
+        changes = self.get_changes(sequence)
+
+        self.assertEqual(
+            self.updated_ids(changes, 'students'),
+            sorted([self.student.id, created[0].id])
+        )
+
+    @override_settings(SYNC_MAX_CHANGES=2)
+    def test_changes_in_pages(self):
+        """Test the changes are returned a page at a time"""
+        sample_grade(name='Second', rank=2)
+        sample_grade(name='Third', rank=3)
+        sequence, more, count = 0, True, 0
+        while more:
+            changes = self.get_changes(sequence)
+            sequence, more = changes['sequence'], changes['more']
+            count += sum(
+                len(changes[name]['updated'])
+                for name in ['grades', 'classrooms', 'students', 'teachers']
+            )
+
+        self.assertEqual(count, 6)
+
+    def test_late_changes_numbered_after(self):
+        """Test changes numbered later get higher sequence numbers"""
+        assign_sequences()
+        first = Change.objects.get(object_id=self.grade.id,
+                                   content_type__model='grade')
+
+        record_changes(Grade, [self.grade.id])
+        self.assertIsNone(Change.objects.get(pk=first.pk).sequence)
+        assign_sequences()
+
+        self.assertGreater(
+            Change.objects.get(pk=first.pk).sequence,
+            Change.objects.exclude(pk=first.pk)
+            .order_by('-sequence')
+            .values_list('sequence', flat=True)
+            .first()
+        )
+
+
+@override_settings(JOB_KINDS=TEST_JOB_KINDS)
+class JobTests(TestCase):
+    """Test queueing and running the background jobs"""
+
+    def test_enqueue_unknown_kind(self):
+        """Test only the configured kinds of jobs can be queued"""
+        with self.assertRaises(ValueError):
+            enqueue('unknown')
+
+    def test_dequeue(self):
+        """Test the oldest queued job is taken and marked running"""
+        first = enqueue('sample')
+        second = enqueue('sample')
+
+        self.assertEqual(dequeue(), first)
+        job = dequeue()
+        self.assertEqual(job, second)
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertIsNotNone(job.started)
+        self.assertIsNone(dequeue())
+
+    def test_run_job(self):
+        """Test the handler is called and its result and progress saved"""
+        enqueue('sample', {'count': 5})
+        job = run_job(dequeue())
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.result, {'counted': 5})
+        self.assertEqual((job.progress, job.total), (5, 5))
+        self.assertIsNotNone(job.finished)
+
+    def test_run_failing_job(self):
+        """Test the error of a failing job is saved"""
+        enqueue('failing')
+        job = run_job(dequeue())
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn('Job failed', job.error)
+        self.assertIsNone(job.result)
+
+    def test_reclaim_job_of_dead_worker(self):
+        """Test a running job whose lease ended is taken again"""
+        job = enqueue('sample')
+        dequeue()
+        self.assertIsNone(dequeue())
+
+        Job.objects.filter(pk=job.pk).update(
+            locked_until=timezone.now() - datetime.timedelta(seconds=1)
+        )
+        job = dequeue()
+
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertEqual(job.attempts, 2)
+        self.assertGreater(job.locked_until, timezone.now())
+
+    @override_settings(JOB_MAX_ATTEMPTS=2)
+    def test_fail_job_after_max_attempts(self):
+        """Test a job whose worker keeps dying is failed"""
+        job = enqueue('sample')
+        for _ in range(2):
+            dequeue()
+            Job.objects.filter(pk=job.pk).update(
+                locked_until=timezone.now() - datetime.timedelta(seconds=1)
+            )
+
+        self.assertIsNone(dequeue())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIn('stopped responding', job.error)
+
+
+class JobApiTests(TestCase):
+    """Test the endpoints following the background jobs"""
+
+    def setUp(self):
+        self.user = sample_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.other_user = get_user_model().objects.create(username='Other')
+
+    def test_retrieve_own_jobs(self):
+        """Test users only see the jobs they started"""
+        job = Job.objects.create(kind='sample', created_by=self.user)
+        other = Job.objects.create(kind='sample', created_by=self.other_user)
+        res = self.client.get(reverse('core:job-list'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([row['id'] for row in res.data], [job.id])
+
+        res = self.client.get(reverse('core:job-detail', args=[job.id]))
+        self.assertEqual(res.data['status'], Job.QUEUED)
+        res = self.client.get(reverse('core:job-detail', args=[other.id]))
+        self.assertEqual(res.status_code, 404)
+
+    def test_staff_retrieve_every_job(self):
+        """Test staff users see every job, the latest first"""
+        jobs = [
+            Job.objects.create(kind='sample', created_by=user)
+            for user in [self.user, self.other_user, None]
+        ]
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.get(reverse('core:job-list'))
+
+        self.assertEqual(
+            [row['id'] for row in res.data],
+            [job.id for job in reversed(jobs)]
+        )
+
+    def test_jobs_need_authentication(self):
+        """Test the jobs can't be retrieved without authentication"""
+        res = APIClient().get(reverse('core:job-list'))
+        self.assertEqual(res.status_code, 403)
+
+
+@override_settings(JOB_KINDS=TEST_JOB_KINDS)
+class JobWorkerTests(TransactionTestCase):
+    """Test the workers running the queued jobs
+
+    The workers take the jobs from other threads and processes, so the
+    jobs must be committed for them to see them.
+    """
+
+    def assertJobsDone(self, jobs):
+        """Assert every job was run once"""
+        for job in jobs:
+            job.refresh_from_db()
+            self.assertEqual(job.status, Job.DONE)
+            self.assertEqual(job.result, {'counted': 3})
+
+    def test_dequeue_skips_locked_jobs(self):
+        """Test a job being taken by a worker is skipped by the others"""
+        first = enqueue('sample')
+        second = enqueue('sample')
+        locked, release = threading.Event(), threading.Event()
+
+        def lock_first_job():
+            with transaction.atomic():
+                Job.objects.select_for_update().get(pk=first.pk)
+                locked.set()
+                release.wait(5)
+
+        worker = threading.Thread(target=lock_first_job)
+        worker.start()
+        locked.wait(5)
+        try:
+            self.assertEqual(dequeue(), second)
+        finally:
+            release.set()
+            worker.join()
+        self.assertEqual(dequeue(), first)
+
+    @override_settings(JOB_LEASE=0.3)
+    def test_heartbeat_keeps_running_job(self):
+        """Test the lease of a job is moved forward while it runs"""
+        enqueue('slow', {'seconds': 0.5})
+        job = dequeue()
+        taken_until = job.locked_until
+        job = run_job(job)
+
+        self.assertEqual(job.status, Job.DONE)
+        self.assertGreater(
+            datetime.datetime.fromisoformat(job.result),
+            taken_until
+        )
+        job.refresh_from_db()
+        self.assertIsNone(job.locked_until)
+
+    def test_run_jobs_threads(self):
+        """Test the worker threads run every queued job once"""
+        jobs = [enqueue('sample') for _ in range(6)]
+        out = io.StringIO()
+        call_command('run_jobs', '--once', '--threads=3', stdout=out)
+
+        self.assertIn('Ran 6 jobs', out.getvalue())
+        self.assertJobsDone(jobs)
+
+    def test_run_jobs_processes(self):
+        """Test the worker processes run every queued job once"""
+        jobs = [enqueue('sample') for _ in range(4)]
+        call_command(
+            'run_jobs',
+            '--once',
+            '--processes=2',
+            '--threads=2',
+            stdout=io.StringIO()
+        )
+
+        self.assertJobsDone(jobs)
@@ -0,0 +1,14 @@
+from django.urls import path
+
+from rest_framework.routers import SimpleRouter
+
+from core.views import ChangesView, JobViewSet
+
+
+app_name = 'core'
+router = SimpleRouter()
+router.register(r'jobs', JobViewSet)
+
+urlpatterns = [
+    path('changes/', ChangesView.as_view(), name='changes'),
+] + router.urls
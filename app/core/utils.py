@@ -13,6 +13,17 @@ def str_to_date(date_str):
     return datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
 
 
+def get_int_from_param(param_str):
+    """Return a integer from the parameter string"""
+    if not param_str:
+        return None
+
+    try:
+        return int(param_str)
+    except ValueError:
+        return None
+
+
 def sample_member_payload(**options):
     """Return a dict with the required fields of a member object"""
     payload = {
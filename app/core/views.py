@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import permissions, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.changes import get_changes
+from core.middleware import SerializerTimingMixin
+from core.models import Job
+from core.serializers import JobSerializer
+
+
+class ChangesView(APIView):
+    """Grades, classrooms and members changed since a sequence number
+
+    Clients keep the `sequence` of the last response and send it back as
+    `changed_since`, asking again while `more` is true. Deleted objects
+    are listed by id under `deleted`.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """Return the changes after the `changed_since` sequence number"""
+        since = request.query_params.get('changed_since') or '0'
+        if not since.isdigit():
+            raise ValidationError({'changed_since': [
+                _('A valid sequence number is required.')
+            ]})
+
+        return Response(get_changes(int(since), settings.SYNC_MAX_CHANGES))
+
+
+class JobViewSet(SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
+    """Progress and results of the background jobs
+
+    Users see the jobs they started, staff users every job.
+    """
+
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """Return the jobs of the user, the latest first"""
+        queryset = self.queryset
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset.order_by('-pk')
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class GradeConfig(AppConfig):
     name = 'grade'
+
+    def ready(self):
+        import grade.signals  # noqa
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from grade.promotion import PromotionRefused, get_promotion_plan, \
+    start_promotion, promote_students
+
+
+class Command(BaseCommand):
+    """Move every active student to the grade of the next rank
+
+    An interrupted promotion is carried on by running the command again.
+    """
+    help = "Promote the active students to the next grade"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only show how many students each grade would move"
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help="Promote again even if a promotion finished recently"
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            help="Students moved by each update"
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            for row in get_promotion_plan():
+                self.stdout.write(
+                    f"{row['name']}: {row['students']} students to "
+                    f"{row['next_name'] or 'no grade, left as they are'}"
+                )
+            return
+
+        try:
+            run = start_promotion(options['force'])
+        except PromotionRefused as error:
+            raise CommandError(error)
+        if run.promoted:
+            self.stdout.write(
+                f"Carrying on from {run.promoted} of {run.total} students"
+            )
+
+        def report(run):
+            self.stdout.write(f"Promoted {run.promoted} of {run.total}")
+
+        run = promote_students(run, options['chunk_size'], report)
+        self.stdout.write(self.style.SUCCESS(
+            f"Promotion finished, {run.promoted} students promoted"
+        ))
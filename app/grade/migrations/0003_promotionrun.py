@@ -0,0 +1,25 @@
+# Generated by Django 3.1.14 on 2026-10-17 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grade', '0002_grade_last_modified'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromotionRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started', models.DateTimeField(auto_now_add=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('mapping', models.JSONField(default=list)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('promoted', models.PositiveIntegerField(default=0)),
+                ('last_student_id', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
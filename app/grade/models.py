@@ -6,7 +6,28 @@ class Grade(models.Model):
 
     name = models.CharField(max_length=100)
     rank = models.PositiveSmallIntegerField()
+    last_modified = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         """Return a string representation of the Grade model"""
         return self.name
+
+
+class PromotionRun(models.Model):
+    """A promotion of the students to their next grade
+
+    The grade each grade moves to is fixed when the run starts, and the
+    students are promoted in id order, so an interrupted run carries on
+    after `last_student_id` without promoting anyone twice.
+    """
+
+    started = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    mapping = models.JSONField(default=list)
+    total = models.PositiveIntegerField(default=0)
+    promoted = models.PositiveIntegerField(default=0)
+    last_student_id = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        """Return a string representation of the PromotionRun model"""
+        return f'Promotion of {self.started:%Y-%m-%d}'
@@ -0,0 +1,193 @@
+import datetime
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models import Case, Count, F, Value, When
+from django.utils import timezone
+
+from grade.models import Grade, PromotionRun
+from member.models import Student
+from member.summary import refresh_summary
+from core.changes import touch_objects
+
+
+# Key of the advisory lock taken while a promotion run is started
+PROMOTION_LOCK = 4419
+
+
+class PromotionRefused(Exception):
+    """A promotion finished recently, so a new one wasn't started"""
+
+
+def get_promotion_mapping():
+    """Return the [grade id, next grade id] pairs, by rank
+
+    Every grade moves to the first grade of a higher rank. The highest
+    grades have nowhere to go and are left out.
+    """
+    grades = list(
+        Grade.objects.order_by('rank', 'pk').values_list('pk', 'rank')
+    )
+
+    mapping = []
+    for pk, rank in grades:
+        next_grade = next(
+            (other for other, other_rank in grades if other_rank > rank),
+            None
+        )
+        if next_grade is not None:
+            mapping.append([pk, next_grade])
+    return mapping
+
+
+def get_promoted_students(mapping):
+    """Return the students a promotion with the mapping moves"""
+    return Student.objects.filter(
+        active=True,
+        grade__in=[grade for grade, _ in mapping]
+    )
+
+
+def get_promotion_plan():
+    """Return what a promotion would do, without changing anything
+
+    Every grade with active students is listed with the grade they would
+    move to, or None for the highest grades.
+    """
+    next_grades = dict(get_promotion_mapping())
+    grades = Grade.objects.order_by('rank', 'pk').values_list('pk', 'name')
+    names = dict(grades)
+    counts = dict(
+        Student.objects
+        .filter(active=True, grade__isnull=False)
+        .order_by()
+        .values_list('grade')
+        .annotate(Count('pk'))
+    )
+
+    return [
+        {
+            'grade': grade,
+            'name': names[grade],
+            'next_grade': next_grades.get(grade),
+            'next_name': names.get(next_grades.get(grade)),
+            'students': counts[grade],
+        }
+        for grade in names
+        if grade in counts
+    ]
+
+
+def get_recent_promotion():
+    """Return the promotion finished in the last promotion interval, if any
+
+    The interval is `GRADE_PROMOTION_INTERVAL_DAYS`, so a retried request
+    or a second queued job doesn't promote the students twice in a year.
+    """
+    since = timezone.now() - datetime.timedelta(
+        days=settings.GRADE_PROMOTION_INTERVAL_DAYS
+    )
+    return PromotionRun.objects \
+        .filter(finished__gte=since) \
+        .order_by('-finished') \
+        .first()
+
+
+def check_promotion_allowed(force=False):
+    """Raise PromotionRefused if a new promotion can't start, unless forced
+
+    Unfinished promotions can always be carried on.
+    """
+    if force or PromotionRun.objects.filter(finished__isnull=True).exists():
+        return
+
+    recent = get_recent_promotion()
+    if recent is not None:
+        raise PromotionRefused(
+            f'The students were already promoted on '
+            f'{recent.finished:%Y-%m-%d}. Force the promotion to run it again.'
+        )
+
+
+def start_promotion(force=False):
+    """Return the unfinished promotion run, or start a new one
+
+    PromotionRefused is raised instead of starting a new run when one
+    finished recently, unless `force` is set.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [PROMOTION_LOCK])
+
+        run = PromotionRun.objects.filter(finished__isnull=True).first()
+        if run is None:
+            check_promotion_allowed(force)
+            mapping = get_promotion_mapping()
+            run = PromotionRun.objects.create(
+                mapping=mapping,
+                total=get_promoted_students(mapping).count()
+            )
+
+    return run
+
+
+def promote_students(run, chunk_size=None, progress=None):
+    """Move the students of the run to their next grade, a chunk at a time
+
+    Every chunk is moved with a single UPDATE ... CASE on the students
+    and saved as the run's progress in the same transaction, so the run
+    can be carried on from where it stopped. `progress` is called with
+    the run after every chunk.
+
+    The queryset update skips the model signals, so the students are
+    marked modified and the member summary rebuilt here.
+    """
+    chunk_size = chunk_size or settings.GRADE_PROMOTION_CHUNK_SIZE
+    students = get_promoted_students(run.mapping).order_by('pk')
+    next_grade = Case(
+        *[When(grade=grade, then=Value(to)) for grade, to in run.mapping],
+        default=F('grade'),
+        output_field=models.IntegerField()
+    )
+
+    while True:
+        with transaction.atomic():
+            run = PromotionRun.objects.select_for_update().get(pk=run.pk)
+            if run.finished is not None:
+                break
+
+            ids = list(
+                students
+                .filter(pk__gt=run.last_student_id)
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not ids:
+                run.finished = timezone.now()
+                run.save(update_fields=['finished'])
+                break
+
+            Student.objects.filter(pk__in=ids).update(grade=next_grade)
+            touch_objects(Student, ids)
+
+            run.promoted += len(ids)
+            run.last_student_id = ids[-1]
+            run.save(update_fields=['promoted', 'last_student_id'])
+
+        if progress is not None:
+            progress(run)
+
+    if settings.MEMBER_STATS_SUMMARY:
+        refresh_summary()
+
+    return run
+
+
+def run_promotion_job(job, force=False):
+    """Promote the students for a background job, reporting the progress"""
+    run = start_promotion(force)
+    job.report_progress(run.promoted, run.total)
+    run = promote_students(
+        run,
+        progress=lambda run: job.report_progress(run.promoted)
+    )
+
+    return {'run': run.pk, 'total': run.total, 'promoted': run.promoted}
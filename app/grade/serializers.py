@@ -1,12 +1,31 @@
 from rest_framework import serializers
 
-from .models import Grade
+from .models import Grade, PromotionRun
+from core.sparse import SparseFieldsSerializerMixin
 
 
-class GradeSerializer(serializers.ModelSerializer):
+class GradeSerializer(SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
     """Serializer for the Grade model"""
 
     class Meta():
         model = Grade
         fields = ['id', 'name', 'rank']
         read_only_fields = ['id']
+
+
+class PromotionRunSerializer(serializers.ModelSerializer):
+    """Serializer for the PromotionRun model"""
+
+    class Meta():
+        model = PromotionRun
+        fields = ['id', 'started', 'finished', 'mapping', 'total', 'promoted']
+        read_only_fields = fields
+
+
+class PromotionRequestSerializer(serializers.Serializer):
+    """Serializer for the options of a promotion request"""
+
+    dry_run = serializers.BooleanField(default=False)
+    force = serializers.BooleanField(default=False)
+    background = serializers.BooleanField(default=False)
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from grade.models import Grade
+from core.cache import invalidate_responses
+from core.changes import record_changes
+
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+def invalidate_grade_responses(sender, **kwargs):
+    """Discard the cached grade responses when a grade changes"""
+    invalidate_responses('grade')
+
+
+@receiver(post_save, sender=Grade)
+def record_change_on_save(sender, instance, **kwargs):
+    """Record a saved grade for the delta endpoint"""
+    record_changes(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=Grade)
+def record_change_on_delete(sender, instance, **kwargs):
+    """Record a deleted grade for the delta endpoint"""
+    record_changes(sender, [instance.pk], deleted=True)
@@ -98,3 +98,11 @@ class PrivateGradeApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(grade.name, payload['name'])
+
+    def test_retrieve_grade_list_fields(self):
+        """Test only the fields asked for are returned"""
+        sample_grade(name='Test Grade', rank=1)
+        res = self.client.get(GRADE_LIST_URL, {'fields': 'name'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data[0]), {'id', 'name'})
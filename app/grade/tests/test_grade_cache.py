@@ -0,0 +1,108 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.utils import sample_grade, sample_user
+
+
+GRADE_LIST_URL = reverse('grade:grade-list')
+
+
+def grade_detail_url(grade_id):
+    return reverse('grade:grade-detail', args=[grade_id])
+
+
+class GradeResponseCacheTests(TestCase):
+    """Test the cache of the grade api responses"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.grade = sample_grade(name='First', rank=1)
+
+    def test_list_served_from_cache(self):
+        """Test a repeated list request does not query the database"""
+        res = self.client.get(GRADE_LIST_URL)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(GRADE_LIST_URL)
+
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached.data, res.data)
+        self.assertEqual(cached['ETag'], res['ETag'])
+
+    def test_detail_served_from_cache(self):
+        """Test a repeated detail request does not query the database"""
+        res = self.client.get(grade_detail_url(self.grade.id))
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(grade_detail_url(self.grade.id))
+
+        self.assertEqual(cached.data, res.data)
+
+    def test_cache_invalidated_on_save(self):
+        """Test saving a grade discards the cached responses"""
+        res = self.client.get(GRADE_LIST_URL)
+        self.grade.name = 'Renamed'
+        self.grade.save()
+        sample_grade(name='Second', rank=2)
+        updated = self.client.get(GRADE_LIST_URL)
+
+        self.assertNotEqual(updated['ETag'], res['ETag'])
+        self.assertEqual(
+            [grade['name'] for grade in updated.data],
+            ['Renamed', 'Second']
+        )
+
+    def test_cache_invalidated_on_delete(self):
+        """Test deleting a grade discards the cached responses"""
+        self.client.get(GRADE_LIST_URL)
+        self.grade.delete()
+        res = self.client.get(GRADE_LIST_URL)
+
+        self.assertEqual(res.data, [])
+
+    def test_cache_invalidated_by_api_update(self):
+        """Test updating a grade through the api discards the cache"""
+        self.client.get(grade_detail_url(self.grade.id))
+        self.client.patch(grade_detail_url(self.grade.id), {'rank': 5})
+        res = self.client.get(grade_detail_url(self.grade.id))
+
+        self.assertEqual(res.data['rank'], 5)
+
+    def test_if_none_match_not_modified(self):
+        """Test a request with the current ETag gets a 304 response"""
+        res = self.client.get(GRADE_LIST_URL)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(
+                GRADE_LIST_URL,
+                HTTP_IF_NONE_MATCH=res['ETag']
+            )
+
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached['ETag'], res['ETag'])
+        self.assertEqual(cached.content, b'')
+
+    def test_if_none_match_stale_etag(self):
+        """Test a request with an outdated ETag gets the new response"""
+        res = self.client.get(GRADE_LIST_URL)
+        sample_grade(name='Second', rank=2)
+        updated = self.client.get(
+            GRADE_LIST_URL,
+            HTTP_IF_NONE_MATCH=res['ETag']
+        )
+
+        self.assertEqual(updated.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(updated.data), 2)
+
+    def test_not_found_is_not_cached(self):
+        """Test error responses are not stored in the cache"""
+        res = self.client.get(grade_detail_url(9999))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', res)
@@ -0,0 +1,264 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+from django.test import TestCase, override_settings
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from grade.models import PromotionRun
+from grade.promotion import PromotionRefused, get_promotion_mapping, \
+    get_promotion_plan, start_promotion, promote_students
+from member.models import Student
+from member.summary import get_stats
+from core.jobs import dequeue, run_job
+from core.models import Change, Job
+from core.utils import sample_grade, sample_student, sample_user
+
+
+PROMOTE_URL = reverse('grade:grade-promote')
+
+
+class GradePromotionTests(TestCase):
+    """Test promoting the students to their next grade"""
+
+    def setUp(self):
+        self.grades = [
+            sample_grade(name=f'Grade {rank}', rank=rank)
+            for rank in [3, 1, 2]
+        ]
+        self.first, self.second, self.third = \
+            sorted(self.grades, key=lambda grade: grade.rank)
+        self.students = [
+            sample_student(grade=grade)
+            for grade in [self.first, self.first, self.second, self.third]
+        ]
+
+    def get_grades(self):
+        """Return the grade ids of the sample students"""
+        return [
+            Student.objects.get(pk=student.pk).grade_id
+            for student in self.students
+        ]
+
+    def test_promotion_mapping(self):
+        """Test every grade moves to the next rank, the highest nowhere"""
+        self.assertEqual(get_promotion_mapping(), [
+            [self.first.id, self.second.id],
+            [self.second.id, self.third.id],
+        ])
+
+    def test_promotion_plan(self):
+        """Test the plan counts the students without moving them"""
+        plan = get_promotion_plan()
+
+        self.assertEqual(
+            [(row['grade'], row['next_grade'], row['students'])
+             for row in plan],
+            [
+                (self.first.id, self.second.id, 2),
+                (self.second.id, self.third.id, 1),
+                (self.third.id, None, 1),
+            ]
+        )
+        self.assertEqual(self.get_grades(), [
+            self.first.id, self.first.id, self.second.id, self.third.id
+        ])
+
+    def test_promote_students(self):
+        """Test the students move once, a chunk at a time"""
+        inactive = sample_student(grade=self.first, active=False)
+        chunks = []
+
+        run = promote_students(
+            start_promotion(),
+            chunk_size=2,
+            progress=lambda run: chunks.append(run.promoted)
+        )
+
+        self.assertEqual(self.get_grades(), [
+            self.second.id, self.second.id, self.third.id, self.third.id
+        ])
+        self.assertEqual(chunks, [2, 3])
+        self.assertEqual((run.total, run.promoted), (3, 3))
+        self.assertIsNotNone(run.finished)
+        inactive.refresh_from_db()
+        self.assertEqual(inactive.grade, self.first)
+
+    def test_promotion_restart(self):
+        """Test an interrupted promotion carries on where it stopped"""
+        def interrupt(run):
+            raise KeyboardInterrupt
+
+        run = start_promotion()
+        with self.assertRaises(KeyboardInterrupt):
+            promote_students(run, chunk_size=2, progress=interrupt)
+
+        self.assertEqual(start_promotion(), run)
+        promote_students(start_promotion(), chunk_size=2)
+
+        self.assertEqual(self.get_grades(), [
+            self.second.id, self.second.id, self.third.id, self.third.id
+        ])
+        self.assertNotEqual(start_promotion(force=True), run)
+
+    def test_promotion_refused_after_recent_one(self):
+        """Test a new promotion is refused after one finished, unless forced"""
+        promote_students(start_promotion())
+
+        with self.assertRaises(PromotionRefused):
+            start_promotion()
+        self.assertEqual(self.get_grades()[0], self.second.id)
+
+        with override_settings(GRADE_PROMOTION_INTERVAL_DAYS=0):
+            promote_students(start_promotion())
+        self.assertEqual(self.get_grades()[0], self.third.id)
+
+    def test_promotion_marks_students_modified(self):
+        """Test the promoted students are modified and recorded"""
+        student = self.students[0]
+        Change.objects.all().delete()
+        promote_students(start_promotion())
+
+        self.assertGreater(
+            Student.objects.get(pk=student.pk).last_modified,
+            student.last_modified
+        )
+        self.assertEqual(Change.objects.count(), 3)
+
+    @override_settings(MEMBER_STATS_SUMMARY=True)
+    def test_promotion_refreshes_summary(self):
+        """Test the member summary follows the promotion"""
+        call_command('refresh_member_summary', stdout=StringIO())
+        promote_students(start_promotion())
+
+        from_summary = get_stats()
+        with override_settings(MEMBER_STATS_SUMMARY=False):
+            self.assertEqual(from_summary, get_stats())
+
+    def test_promote_command(self):
+        """Test the command promotes the students, or shows the plan"""
+        out = StringIO()
+        call_command('promote_students', '--dry-run', stdout=out)
+        self.assertIn('Grade 1: 2 students to Grade 2', out.getvalue())
+        self.assertFalse(PromotionRun.objects.exists())
+
+        out = StringIO()
+        call_command('promote_students', '--chunk-size=2', stdout=out)
+        self.assertIn('Promoted 2 of 3', out.getvalue())
+        self.assertEqual(self.get_grades()[0], self.second.id)
+
+        with self.assertRaises(CommandError):
+            call_command('promote_students', stdout=StringIO())
+        call_command('promote_students', '--force', stdout=StringIO())
+        self.assertEqual(self.get_grades()[0], self.third.id)
+
+
+class GradePromotionApiTests(TestCase):
+    """Test the promotion endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.first = sample_grade(name='First', rank=1)
+        self.second = sample_grade(name='Second', rank=2)
+        self.student = sample_student(grade=self.first)
+
+    def authenticate_staff(self):
+        """Authenticate the client as a staff user"""
+        self.client.force_authenticate(
+            get_user_model().objects.create(username='admin', is_staff=True)
+        )
+
+    def test_promote_admin_only(self):
+        """Test only staff users can promote the students"""
+        self.client.force_authenticate(sample_user())
+        res = self.client.post(PROMOTE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.grade, self.first)
+
+    def test_promote(self):
+        """Test promoting the students, or only showing the plan"""
+        self.authenticate_staff()
+        res = self.client.post(PROMOTE_URL, {'dry_run': True})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['grades'][0]['students'], 1)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.grade, self.first)
+
+        res = self.client.post(PROMOTE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['promoted'], 1)
+        self.assertIsNotNone(res.data['finished'])
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.grade, self.second)
+
+    def test_promote_invalid_body(self):
+        """Test a body that isn't an object of options is refused"""
+        self.authenticate_staff()
+        for payload in [[], ['dry_run'], 'dry_run', 1, {'force': 'maybe'}]:
+            res = self.client.post(PROMOTE_URL, payload, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.grade, self.first)
+
+    def test_promote_in_background(self):
+        """Test the promotion can be queued as a job"""
+        self.authenticate_staff()
+        res = self.client.post(PROMOTE_URL, {'background': True})
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data['status'], Job.QUEUED)
+        self.assertEqual(
+            res['Location'],
+            reverse('core:job-detail', args=[res.data['id']])
+        )
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.grade, self.first)
+
+        job = run_job(dequeue())
+
+        self.assertEqual(job.status, Job.DONE, job.error)
+        self.assertEqual(job.result['promoted'], 1)
+        self.assertEqual((job.progress, job.total), (1, 1))
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.grade, self.second)
+
+    def test_promote_twice_negative(self):
+        """Test a second promotion is refused unless forced"""
+        third = sample_grade(name='Third', rank=3)
+        self.authenticate_staff()
+        self.client.post(PROMOTE_URL)
+
+        for payload in [{}, {'background': True}]:
+            res = self.client.post(PROMOTE_URL, payload)
+
+            self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Job.objects.exists())
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.grade, self.second)
+
+        res = self.client.post(PROMOTE_URL, {'force': True})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.grade, third)
+
+    def test_second_queued_promotion_fails(self):
+        """Test a second queued promotion job doesn't promote again"""
+        self.authenticate_staff()
+        for _ in range(2):
+            self.client.post(PROMOTE_URL, {'background': True})
+
+        first, second = run_job(dequeue()), run_job(dequeue())
+
+        self.assertEqual(first.status, Job.DONE)
+        self.assertEqual(second.status, Job.FAILED)
+        self.assertIn('already promoted', second.error)
+        self.assertEqual(PromotionRun.objects.count(), 1)
@@ -1,16 +1,79 @@
-from rest_framework import viewsets, permissions
+from django.urls import reverse
 
-from .serializers import GradeSerializer
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .serializers import GradeSerializer, PromotionRequestSerializer, \
+    PromotionRunSerializer
 from .models import Grade
+from .promotion import PromotionRefused, check_promotion_allowed, \
+    get_promotion_plan, start_promotion, promote_students
+from core.cache import CachedResponseMixin
+from core.jobs import enqueue
+from core.middleware import SerializerTimingMixin
+from core.serializers import JobSerializer
+from core.sparse import SparseFieldsMixin
 
 
-class GradeApiViewSet(viewsets.ModelViewSet):
+class GradeApiViewSet(
+    SerializerTimingMixin,
+    CachedResponseMixin,
+    SparseFieldsMixin,
+    viewsets.ModelViewSet
+):
     """Views for managing the grade model"""
 
+    cache_namespace = 'grade'
     queryset = Grade.objects.all()
     serializer_class = GradeSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         """Return queryset ordered by rank"""
-        return self.queryset.order_by('rank')
+        return self.get_sparse_queryset(self.queryset).order_by('rank')
+
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[permissions.IsAdminUser]
+    )
+    def promote(self, request):
+        """Move every active student to the grade of the next rank
+
+        With `dry_run` only the students each grade would move are
+        returned. With `background` the promotion is queued as a job and
+        the job returned, to follow its progress. An unfinished promotion
+        is carried on instead of starting a new one, and a new one is only
+        started within the promotion interval of the last one with `force`.
+        """
+        options = PromotionRequestSerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        if options.validated_data['dry_run']:
+            return Response({'dry_run': True, 'grades': get_promotion_plan()})
+
+        force = options.validated_data['force']
+        try:
+            if options.validated_data['background']:
+                check_promotion_allowed(force)
+                job = enqueue(
+                    'promote_students',
+                    {'force': force},
+                    user=request.user
+                )
+                return Response(
+                    JobSerializer(job).data,
+                    status=status.HTTP_202_ACCEPTED,
+                    headers={
+                        'Location': reverse('core:job-detail', args=[job.pk])
+                    }
+                )
+
+            run = promote_students(start_promotion(force))
+        except PromotionRefused as error:
+            return Response(
+                {'detail': str(error)},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return Response(PromotionRunSerializer(run).data)
@@ -0,0 +1,36 @@
+"""
+Gunicorn configuration, sized from the number of cores.
+
+Serves app.wsgi with threaded workers. With SERVER_MODE=asgi it serves
+app.asgi with uvicorn workers instead. Every worker thread keeps its own
+database connection open, so workers * threads must fit in the database or
+pooler connection limit.
+"""
+
+import multiprocessing
+import os
+
+
+cores = multiprocessing.cpu_count()
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+
+if os.environ.get('SERVER_MODE') == 'asgi':
+    wsgi_app = 'app.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    workers = int(os.environ.get('WEB_CONCURRENCY', cores))
+else:
+    wsgi_app = 'app.wsgi:application'
+    worker_class = 'gthread'
+    workers = int(os.environ.get('WEB_CONCURRENCY', cores * 2 + 1))
+    threads = int(os.environ.get('WEB_THREADS', 4))
+
+# Restart the workers now and then, so leaks can't build up
+max_requests = 2000
+max_requests_jitter = 200
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
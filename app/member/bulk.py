@@ -0,0 +1,54 @@
+from rest_framework.exceptions import ValidationError
+
+from member.serializers import StudentCreateSerializer, \
+    TeacherCreateSerializer
+from core.jobs import JobError
+from core.utils import get_int_from_param
+
+
+# The serializer saving the rows of each kind of member
+BULK_SERIALIZERS = {
+    'student': StudentCreateSerializer,
+    'teacher': TeacherCreateSerializer,
+}
+
+
+def save_members(serializer_class, rows, partial=False, context=None):
+    """Create, or update when `partial`, the members of the rows
+
+    Rows being updated must include their id. Nothing is saved unless every
+    row is valid, otherwise a ValidationError with the errors of each row
+    is raised.
+    """
+    instances = None
+    if partial:
+        ids = [
+            get_int_from_param(str(row.get('id')))
+            if isinstance(row, dict) else None
+            for row in rows
+        ]
+        found = serializer_class.Meta.model.objects \
+            .in_bulk([pk for pk in ids if pk])
+        instances = [found.get(pk) for pk in ids]
+
+    serializer = serializer_class(
+        instances,
+        data=rows,
+        many=True,
+        partial=partial,
+        context=context or {}
+    )
+    serializer.is_valid(raise_exception=True)
+    return serializer.save()
+
+
+def run_import_job(job, model, rows, partial=False):
+    """Save the rows of a bulk request for a background job"""
+    job.report_progress(0, len(rows))
+    try:
+        members = save_members(BULK_SERIALIZERS[model], rows, partial)
+    except ValidationError as error:
+        raise JobError('Some rows are invalid.', {'errors': error.detail})
+    job.report_progress(len(members))
+
+    return {'ids': [member.pk for member in members]}
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from member.models import MemberSearch
+from member.search import refresh_search_index
+
+
+class Command(BaseCommand):
+    """Rebuild the searched text of every student and teacher"""
+    help = "Rebuild the member search index"
+
+    def handle(self, *args, **kwargs):
+        refresh_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Member search refreshed, {MemberSearch.objects.count()} members"
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from member.models import MemberSummary
+from member.summary import refresh_summary
+
+
+class Command(BaseCommand):
+    """Rebuild the member summary table from the member tables"""
+    help = "Rebuild the member summary used by the stats endpoint"
+
+    def handle(self, *args, **kwargs):
+        refresh_summary()
+        self.stdout.write(self.style.SUCCESS(
+            f"Member summary refreshed, {MemberSummary.objects.count()} rows"
+        ))
@@ -0,0 +1,25 @@
+# Generated by Django 3.1.14 on 2026-10-17 11:32
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0005_auto_20201016_2217'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX member_student_classes_classroom_student_idx '
+                'ON member_student_classes (classroom_id, student_id);',
+            reverse_sql='DROP INDEX '
+                        'member_student_classes_classroom_student_idx;',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX member_teacher_classes_classroom_teacher_idx '
+                'ON member_teacher_classes (classroom_id, teacher_id);',
+            reverse_sql='DROP INDEX '
+                        'member_teacher_classes_classroom_teacher_idx;',
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.1.14 on 2026-10-17 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0006_classes_enrollment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(active=True), fields=['fullname', 'id'], name='member_active_fullname_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['fullname', 'id'], name='member_fullname_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['grade', 'member_ptr'], name='member_student_grade_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['academic_level', 'member_ptr'], name='member_teacher_level_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.1.14 on 2026-10-17 11:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grade', '0001_initial'),
+        ('member', '0007_member_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('S', 'Student'), ('T', 'Teacher')], max_length=1)),
+                ('academic_level', models.CharField(blank=True, max_length=2)),
+                ('sex', models.CharField(max_length=1)),
+                ('active', models.BooleanField()),
+                ('members', models.IntegerField(default=0)),
+                ('monthly_payment', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('grade', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='grade.grade')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='membersummary',
+            constraint=models.UniqueConstraint(fields=('kind', 'grade', 'academic_level', 'sex', 'active'), name='member_summary_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='membersummary',
+            constraint=models.UniqueConstraint(condition=models.Q(grade=None), fields=('kind', 'academic_level', 'sex', 'active'), name='member_summary_no_grade_key'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+from itertools import islice
+import re
+import unicodedata
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Frozen copy of member.search as of this migration
+SEARCH_FIELDS = {
+    'Student': [
+        'fullname', 'id_doc', 'email', 'phone_number', 'guardian1',
+        'guardian2',
+    ],
+    'Teacher': ['fullname', 'id_doc', 'email', 'phone_number'],
+}
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(
+        char for char in text if not unicodedata.combining(char)
+    ).lower()
+
+
+def build_search_text(fullname, id_doc, email, phone_number, *others):
+    values = [fullname, id_doc, email, phone_number,
+              re.sub(r'\D', '', phone_number or ''), *others]
+    return ' '.join(normalize(value) for value in values if value)
+
+
+def index_members(apps, schema_editor):
+    MemberSearch = apps.get_model('member', 'MemberSearch')
+    for model_name, fields in SEARCH_FIELDS.items():
+        model = apps.get_model('member', model_name)
+        rows = model.objects.values_list('pk', *fields).iterator()
+        while True:
+            batch = [
+                MemberSearch(
+                    member_id=pk,
+                    text=build_search_text(*values)
+                )
+                for pk, *values in islice(rows, 2000)
+            ]
+            if not batch:
+                break
+            MemberSearch.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0008_member_summary'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='MemberSearch',
+            fields=[
+                ('member', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search', serialize=False, to='member.member')),
+                ('text', models.TextField()),
+            ],
+        ),
+        migrations.RunPython(index_members, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='membersearch',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['text'], name='member_search_text_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.1.14 on 2026-10-17 12:56
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member', '0010_member_last_modified'),
+    ]
+
+    operations = [
+        # On an expression, so the LIKE filters keep using the GIN index
+        migrations.RunSQL(
+            sql='CREATE INDEX member_search_text_knn_idx '
+                'ON member_membersearch USING gist '
+                '((lower(text)) gist_trgm_ops);',
+            reverse_sql='DROP INDEX member_search_text_knn_idx;',
+        ),
+    ]
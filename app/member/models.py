@@ -1,10 +1,179 @@
-from django.db import models
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from grade.models import Grade
 from classroom.models import Classroom
 
 
+def get_firstname(fullname):
+    """Return the first name from the full name of a member"""
+    return fullname.split(' ')[0]
+
+
+class MemberQuerySet(models.QuerySet):
+    """Queryset for the member models"""
+
+    def bulk_create(self, objs, batch_size=None, ignore_conflicts=False):
+        """Insert the given objects, also for the Member subclasses
+
+        Django refuses to bulk create multi-table inherited models, so the
+        Member rows are inserted first, getting their ids back from
+        PostgreSQL, and the child rows are inserted afterwards.
+        """
+        parent_link = self.model._meta.get_ancestor_link(Member)
+        if parent_link is None:
+            return super().bulk_create(objs, batch_size, ignore_conflicts)
+        if ignore_conflicts:
+            raise ValueError(
+                "Can't ignore conflicts when bulk creating a member subclass"
+            )
+
+        objs = list(objs)
+        if not objs:
+            return objs
+
+        parent_fields = [
+            field for field in Member._meta.concrete_fields
+            if not field.primary_key
+        ]
+        child_fields = self.model._meta.local_concrete_fields
+        batch_size = batch_size or len(objs)
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            members = Member.objects.using(self.db).bulk_create([
+                Member(**{
+                    field.attname: getattr(obj, field.attname)
+                    for field in parent_fields
+                })
+                for obj in objs
+            ], batch_size)
+
+            for obj, member in zip(objs, members):
+                for field in parent_fields:
+                    setattr(obj, field.attname, getattr(member, field.attname))
+                obj.id = member.id
+                setattr(obj, parent_link.attname, member.id)
+
+            for start in range(0, len(objs), batch_size):
+                self._insert(
+                    objs[start:start + batch_size],
+                    fields=child_fields,
+                    using=self.db,
+                )
+
+            from member.search import index_members
+            index_members(objs, created=True, using=self.db)
+
+            from core.changes import record_changes
+            record_changes(
+                self.model,
+                [obj.pk for obj in objs],
+                using=self.db
+            )
+
+            if settings.MEMBER_STATS_SUMMARY:
+                from member.summary import add_to_summary
+                add_to_summary(objs, using=self.db)
+
+        for obj in objs:
+            obj._state.adding = False
+            obj._state.db = self.db
+
+        return objs
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        """Update the given objects, keeping the search and summary current
+
+        The objects are marked as modified and recorded as changed.
+        """
+        from member.search import get_search_fields, index_members
+        from core.changes import record_changes
+        from member.summary import get_summary_fields, add_to_summary, \
+            remove_from_summary
+
+        objs = list(objs)
+        # auto_now fields are only set by save()
+        now = timezone.now()
+        for obj in objs:
+            obj.last_modified = now
+        fields = [*fields, 'last_modified']
+        summary_fields = get_summary_fields(self.model)
+        update_summary = settings.MEMBER_STATS_SUMMARY and \
+            summary_fields.intersection(fields)
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            if update_summary:
+                previous = self.model.objects.using(self.db) \
+                    .filter(pk__in=[obj.pk for obj in objs]) \
+                    .only(*summary_fields)
+                remove_from_summary(list(previous), using=self.db)
+
+            super().bulk_update(objs, fields, batch_size)
+
+            if update_summary:
+                add_to_summary(objs, using=self.db)
+            if get_search_fields(self.model).intersection(fields):
+                index_members(objs, using=self.db)
+            record_changes(
+                self.model,
+                [obj.pk for obj in objs],
+                using=self.db
+            )
+
+    def deactivate(self, departure_date=None, unenroll=True,
+                   chunk_size=None):
+        """Deactivate the active members of the queryset, a chunk at a time
+
+        Every chunk is one UPDATE of the members and, with `unenroll`, one
+        DELETE of their enrollments, in its own transaction. The members
+        are never loaded, the summary, change log and cached classrooms
+        are kept current here instead of by the signals. Returns the
+        number of members deactivated and of enrollments removed.
+        """
+        from core.cache import invalidate_responses
+        from core.changes import record_changes
+        from member.summary import move_to_inactive
+
+        departure_date = departure_date or timezone.localdate()
+        chunk_size = chunk_size or settings.MEMBER_DEACTIVATE_CHUNK_SIZE
+        pks = self.filter(active=True).order_by('pk') \
+            .values_list('pk', flat=True)
+        classes = getattr(self.model, 'classes', None)
+        deactivated = unenrolled = last_pk = 0
+
+        while True:
+            with transaction.atomic(using=self.db):
+                chunk = list(pks.filter(pk__gt=last_pk)[:chunk_size])
+                if not chunk:
+                    break
+
+                if settings.MEMBER_STATS_SUMMARY:
+                    move_to_inactive(self.model, chunk, using=self.db)
+                deactivated += Member.objects.using(self.db) \
+                    .filter(pk__in=chunk) \
+                    .update(
+                        active=False,
+                        departure_date=departure_date,
+                        last_modified=timezone.now()
+                    )
+                if unenroll and classes is not None:
+                    field = classes.field
+                    unenrolled += field.remote_field.through.objects \
+                        .using(self.db) \
+                        .filter(**{f'{field.m2m_field_name()}__in': chunk}) \
+                        .delete()[0]
+                record_changes(self.model, chunk, using=self.db)
+                last_pk = chunk[-1]
+
+        if unenrolled:
+            invalidate_responses('classroom')
+
+        return deactivated, unenrolled
+
+
 class Member(models.Model):
     """A generic member of the school"""
     _sex_choices = [
@@ -24,10 +193,26 @@ class Member(models.Model):
     email = models.EmailField()
     phone_number = models.CharField(max_length=50)
     address = models.CharField(max_length=255)
+    last_modified = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = MemberQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['fullname', 'id'],
+                condition=models.Q(active=True),
+                name='member_active_fullname_idx',
+            ),
+            models.Index(
+                fields=['fullname', 'id'],
+                name='member_fullname_idx',
+            ),
+        ]
 
     @property
     def firstname(self):
-        return self.fullname.split(' ')[0]
+        return get_firstname(self.fullname)
 
     def __str__(self):
         return self.fullname
@@ -52,6 +237,14 @@ class Student(Member):
     guardian2 = models.CharField(max_length=100, blank=True)
     classes = models.ManyToManyField(Classroom, related_name='students')
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['grade', 'member_ptr'],
+                name='member_student_grade_idx',
+            ),
+        ]
+
 
 class Teacher(Member):
     """A teacher of the school"""
@@ -68,3 +261,87 @@ class Teacher(Member):
     bank_agency = models.PositiveIntegerField()
     bank_account = models.PositiveIntegerField()
     classes = models.ManyToManyField(Classroom, related_name='teachers')
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['academic_level', 'member_ptr'],
+                name='member_teacher_level_idx',
+            ),
+        ]
+
+
+class MemberSummary(models.Model):
+    """Member counts and monthly payments by grade, level, sex and status
+
+    Kept current by the member signals when the `MEMBER_STATS_SUMMARY`
+    setting is on, so the stats are read from a handful of rows instead of
+    aggregating the member tables.
+    """
+    STUDENT = 'S'
+    TEACHER = 'T'
+    _kind_choices = [
+        (STUDENT, _('Student')),
+        (TEACHER, _('Teacher')),
+    ]
+
+    kind = models.CharField(max_length=1, choices=_kind_choices)
+    grade = models.ForeignKey(
+        Grade,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    academic_level = models.CharField(max_length=2, blank=True)
+    sex = models.CharField(max_length=1)
+    active = models.BooleanField()
+    members = models.IntegerField(default=0)
+    monthly_payment = models.DecimalField(
+        decimal_places=2,
+        max_digits=14,
+        default=0
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'grade', 'academic_level', 'sex', 'active'],
+                name='member_summary_key',
+            ),
+            # NULLs are distinct in unique constraints
+            models.UniqueConstraint(
+                fields=['kind', 'academic_level', 'sex', 'active'],
+                condition=models.Q(grade=None),
+                name='member_summary_no_grade_key',
+            ),
+        ]
+
+
+class MemberSearch(models.Model):
+    """The text searched for a student or teacher
+
+    Joins the normalized values of every searched field in a single column
+    with a trigram index, so a search is one index scan whatever the field
+    matched. A GiST trigram index on `lower(text)`, created by migration
+    as Django can't declare it, returns the rows by distance to the search.
+    The lower() is a no-op on the normalized text, it keeps the planner
+    from also answering the LIKE filters with the GiST index, which the GIN
+    one serves much faster. Kept current by the member signals and bulk
+    operations.
+    """
+    member = models.OneToOneField(
+        Member,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='search'
+    )
+    text = models.TextField()
+
+    class Meta:
+        indexes = [
+            GinIndex(
+                fields=['text'],
+                opclasses=['gin_trgm_ops'],
+                name='member_search_text_trgm_idx',
+            ),
+        ]
@@ -0,0 +1,189 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import BooleanField, F, Func, Q, Value
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, \
+    remove_query_param
+
+
+class Row(Func):
+    """A row constructor, compared element by element with another row"""
+    function = 'ROW'
+
+
+class RowComparison(Func):
+    """Compare two rows, e.g. `ROW(fullname, id) > ROW('Ann', 4)`
+
+    Unlike the equivalent chain of OR conditions, a row comparison is
+    served by a seek on a multicolumn index over the same columns.
+    """
+    template = '%(expressions)s'
+    output_field = BooleanField()
+
+    def __init__(self, left, operator, right):
+        self.arg_joiner = f' {operator} '
+        super().__init__(left, right)
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination keyed on a unique tuple of ordering fields
+
+    Pages are fetched with a `WHERE (fullname, id) > (...)` style filter
+    instead of an OFFSET, so every page costs the same no matter how deep
+    the client goes. Pagination only kicks in when a page size is given,
+    either by the `page_size` query parameter or the
+    `MEMBER_LIST_PAGE_SIZE` setting.
+    """
+    ordering = ('fullname', 'id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return a single page of the queryset, or None if not paginated"""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.position, self.reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple('-' + field for field in ordering)
+        queryset = queryset.order_by(*ordering)
+
+        if self.position is not None:
+            queryset = queryset.filter(self._keyset_filter(self.position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        """Return the requested page size, capped by the maximum"""
+        max_page_size = getattr(settings, 'MEMBER_LIST_MAX_PAGE_SIZE', 1000)
+        page_size = request.query_params.get(self.page_size_query_param)
+
+        try:
+            page_size = int(page_size)
+        except (TypeError, ValueError):
+            page_size = getattr(settings, 'MEMBER_LIST_PAGE_SIZE', None)
+
+        if not page_size or page_size < 0:
+            return None
+        return min(page_size, max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self._get_position(self.page[-1])
+        else:
+            position = self.position
+        return self.encode_cursor(position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        position = self._get_position(self.page[0])
+        return self.encode_cursor(position, reverse=True)
+
+    def decode_cursor(self, request):
+        """Return the (position, reverse) pair encoded in the request
+
+        Each value of the position is converted by its ordering field, so
+        a tampered cursor is refused instead of failing in the query.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            values = cursor['p']
+            reverse = bool(cursor.get('r', False))
+            if len(values) != len(self.ordering):
+                raise ValueError('Wrong number of values')
+            position = tuple(
+                self._to_python(field, value)
+                for field, value in zip(self.ordering, values)
+            )
+        except (TypeError, ValueError, KeyError, UnicodeError,
+                ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        """Return the url for the page starting after the given position"""
+        cursor = {'p': list(position)}
+        if reverse:
+            cursor['r'] = 1
+        encoded = urlsafe_b64encode(
+            json.dumps(cursor, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii')
+
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            encoded
+        )
+
+    def _keyset_filter(self, position):
+        """Return the condition selecting the rows past the given position
+
+        The row comparison alone isn't an index condition when the ordering
+        columns span tables, as the child table's id stands in for the
+        member's one. The bound on the leading column keeps the scan a seek
+        in the ordering index either way.
+        """
+        lookup = 'lte' if self.reverse else 'gte'
+        return Q(**{f'{self.ordering[0]}__{lookup}': position[0]}) & Q(
+            RowComparison(
+                Row(*[F(field) for field in self.ordering]),
+                '<' if self.reverse else '>',
+                Row(*[Value(value) for value in position]),
+            )
+        )
+
+    def _to_python(self, field, value):
+        """Return the cursor value converted by the given ordering field"""
+        if value is None or isinstance(value, (list, dict)):
+            raise ValueError(f'Invalid value for {field}')
+        return self.model._meta.get_field(field).to_python(value)
+
+    def _get_position(self, item):
+        """Return the values of the ordering fields for the given row"""
+        if isinstance(item, dict):
+            return tuple(item[field] for field in self.ordering)
+        return tuple(getattr(item, field) for field in self.ordering)
@@ -0,0 +1,131 @@
+import re
+import unicodedata
+
+from django.db import transaction
+from django.db.models import FloatField, Func, Value
+from django.db.models.functions import Lower
+
+from member.models import Student, Teacher, MemberSearch
+
+
+# Trigram indexes can't serve shorter words
+MIN_WORD_LENGTH = 3
+
+SEARCH_FIELDS = {
+    Student: [
+        'fullname', 'id_doc', 'email', 'phone_number', 'guardian1',
+        'guardian2',
+    ],
+    Teacher: ['fullname', 'id_doc', 'email', 'phone_number'],
+}
+
+
+def normalize(text):
+    """Return the text in lower case and without accents"""
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(
+        char for char in text if not unicodedata.combining(char)
+    ).lower()
+
+
+def build_search_text(fullname, id_doc, email, phone_number, *others):
+    """Return the searched text for the given field values
+
+    The phone number is also added with its digits only, so it's found
+    whatever the formatting of the search.
+    """
+    values = [fullname, id_doc, email, phone_number,
+              re.sub(r'\D', '', phone_number or ''), *others]
+    return ' '.join(normalize(value) for value in values if value)
+
+
+def get_search_words(term):
+    """Return the normalized words of a search"""
+    return normalize(term).split()
+
+
+def get_search_fields(model):
+    """Return the fields of the model that change its searched text"""
+    return set(SEARCH_FIELDS.get(model, []))
+
+
+def index_members(members, created=False, using=None):
+    """Write the searched text of the given students or teachers
+
+    Members just created have no text to replace yet.
+    """
+    rows = [
+        MemberSearch(
+            member_id=member.pk,
+            text=build_search_text(*[
+                getattr(member, field) for field in SEARCH_FIELDS[type(member)]
+            ])
+        )
+        for member in members
+        if type(member) in SEARCH_FIELDS
+    ]
+    if not rows:
+        return
+
+    with transaction.atomic(using=using, savepoint=False):
+        if not created:
+            MemberSearch.objects.using(using) \
+                .filter(member_id__in=[row.member_id for row in rows]) \
+                .delete()
+        MemberSearch.objects.using(using).bulk_create(rows)
+
+
+def refresh_search_index(chunk_size=2000):
+    """Rebuild the searched text of every student and teacher
+
+    Needed after changes the signals don't see, like queryset updates.
+    """
+    with transaction.atomic():
+        MemberSearch.objects.all().delete()
+        for model, fields in SEARCH_FIELDS.items():
+            rows = model.objects \
+                .values_list('pk', *fields) \
+                .iterator(chunk_size=chunk_size)
+            batch = []
+            for pk, *values in rows:
+                batch.append(MemberSearch(
+                    member_id=pk,
+                    text=build_search_text(*values)
+                ))
+                if len(batch) >= chunk_size:
+                    MemberSearch.objects.bulk_create(batch)
+                    batch = []
+            MemberSearch.objects.bulk_create(batch)
+
+
+class WordDistance(Func):
+    """How far a text's closest words are from the search, `text <->> search`
+
+    One minus their word similarity. Ordering by it with the indexed text
+    first is a nearest neighbour scan of a GiST trigram index.
+    """
+    template = '%(expressions)s'
+    arg_joiner = ' <->> '
+    output_field = FloatField()
+
+
+def search_members(queryset, words):
+    """Return the members matching every word, the best matches first
+
+    Every word must be contained in the searched text of the member, which
+    the trigram indexes answer. Matches are ranked by the trigram distance
+    of the search to the closest words in the text. The GiST index on
+    `lower(text)` returns them in that order, so the best matches are read
+    first instead of sorting every match. Members as close to the search
+    come in no particular order, as a tie breaker would need that sort
+    again.
+    """
+    for word in words:
+        queryset = queryset.filter(search__text__contains=word)
+
+    return queryset \
+        .annotate(search_distance=WordDistance(
+            Lower('search__text'),
+            Value(' '.join(words))
+        )) \
+        .order_by('search_distance')
@@ -1,40 +1,341 @@
 import datetime
+from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
 
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
-from member.models import Student, Teacher
+from member.models import Student, Teacher, get_firstname
 from grade.models import Grade
 from grade.serializers import GradeSerializer
 from classroom.models import Classroom
 from classroom.serializers import ClassroomListSerializer
+from core.cache import invalidate_responses
+from core.sparse import SparseFieldsSerializerMixin
 
 
-class StudentListSerializer(serializers.ModelSerializer):
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field using the objects preloaded by a bulk serializer"""
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('related_objects', {})
+        objects = preloaded.get(self.get_queryset().model)
+        if objects is None:
+            return super().to_internal_value(data)
+
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (DjangoValidationError, TypeError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        if isinstance(data, bool) or pk not in objects:
+            self.fail('does_not_exist', pk_value=data)
+        return objects[pk]
+
+
+class MemberBulkSerializer(serializers.ListSerializer):
+    """Serializer for creating or updating many members at once
+
+    The related objects of all rows are fetched with one query per relation
+    and the unique fields are checked with one query per field. The rows
+    are then saved with bulk queries inside a single transaction.
+    """
+    batch_size = 1000
+
+    def to_internal_value(self, data):
+        """Validate every row, raising a list with the errors of each row"""
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+
+        self._preload_related_objects(data)
+        errors = self._find_unique_conflicts(data)
+        instances = self.instance if self.instance is not None \
+            else [None] * len(data)
+
+        validated = []
+        for index, (item, instance) in enumerate(zip(data, instances)):
+            if self.instance is not None and instance is None:
+                errors[index]['id'] = [_('Member not found.')]
+            try:
+                validated.append(self.child.run_validation(item))
+            except serializers.ValidationError as exc:
+                for field, detail in exc.detail.items():
+                    errors[index].setdefault(field, [])
+                    errors[index][field] = detail + errors[index][field]
+
+        if errors:
+            raise serializers.ValidationError([
+                errors.get(index, {}) for index in range(len(data))
+            ])
+        return validated
+
+    def create(self, validated_data):
+        """Insert all the rows and their relations with bulk queries"""
+        model = self.child.Meta.model
+        instances, relations = [], []
+
+        for attrs in validated_data:
+            attrs = dict(attrs)
+            relations.append(self._pop_many_to_many(model, attrs))
+            instances.append(model(**attrs))
+
+        with transaction.atomic():
+            model.objects.bulk_create(instances, self.batch_size)
+            self._set_many_to_many(model, instances, relations, replace=False)
+
+        return instances
+
+    def update(self, instances, validated_data):
+        """Update all the rows and replace their relations in bulk"""
+        model = self.child.Meta.model
+        relations = []
+        fields = set()
+
+        for instance, attrs in zip(instances, validated_data):
+            attrs = dict(attrs)
+            relations.append(self._pop_many_to_many(model, attrs))
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+            fields.update(attrs)
+
+        with transaction.atomic():
+            # Also run without fields, to mark the members as modified
+            model.objects.bulk_update(
+                instances,
+                sorted(fields),
+                self.batch_size
+            )
+            self._set_many_to_many(model, instances, relations)
+
+        return instances
+
+    def _preload_related_objects(self, data):
+        """Fetch the related objects of every row, one query per model"""
+        pks = defaultdict(set)
+        querysets = {}
+
+        for name, field in self.child.fields.items():
+            relation = getattr(field, 'child_relation', field)
+            if field.read_only or \
+                    not isinstance(relation, BulkPrimaryKeyRelatedField):
+                continue
+
+            model = relation.get_queryset().model
+            querysets[model] = relation.get_queryset()
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                values = item.get(name)
+                if not isinstance(values, list):
+                    values = [values]
+                for value in values:
+                    try:
+                        pks[model].add(model._meta.pk.to_python(value))
+                    except (DjangoValidationError, TypeError):
+                        pass
+
+        self._context['related_objects'] = {
+            model: queryset.in_bulk(pks[model] - {None})
+            for model, queryset in querysets.items()
+        }
+
+    def _find_unique_conflicts(self, data):
+        """Return the unique constraint errors of the rows by row index
+
+        Unique fields are checked for all the rows with a single query per
+        field, instead of the one query per row the field validators run.
+        """
+        errors = defaultdict(dict)
+        own_pks = [
+            instance.pk if instance is not None else None
+            for instance in (self.instance or [None] * len(data))
+        ]
+
+        for name, field in self.child.fields.items():
+            unique_validators = [
+                validator for validator in field.validators
+                if isinstance(validator, UniqueValidator)
+            ]
+            if not unique_validators:
+                continue
+            field.validators = [
+                validator for validator in field.validators
+                if validator not in unique_validators
+            ]
+
+            values = [
+                item.get(name) if isinstance(item, dict) else None
+                for item in data
+            ]
+            values = [
+                value if isinstance(value, (str, int)) else None
+                for value in values
+            ]
+            queryset = unique_validators[0].queryset
+            existing = dict(queryset.filter(**{
+                f'{field.source}__in': [v for v in values if v is not None]
+            }).values_list(field.source, 'pk'))
+
+            seen = set()
+            for index, value in enumerate(values):
+                if value is None:
+                    continue
+                taken = value in existing and existing[value] != own_pks[index]
+                if taken or value in seen:
+                    errors[index][name] = [unique_validators[0].message]
+                seen.add(value)
+
+        return errors
+
+    def _pop_many_to_many(self, model, attrs):
+        """Remove the many to many values from the attributes"""
+        return {
+            field.name: attrs.pop(field.name)
+            for field in model._meta.many_to_many
+            if field.name in attrs
+        }
+
+    def _set_many_to_many(self, model, instances, relations, replace=True):
+        """Set the many to many relations given for each instance
+
+        The through rows are written without m2m_changed, so the cached
+        classroom responses, which count the enrollments, are discarded
+        here.
+        """
+        written = False
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            source = field.m2m_field_name() + '_id'
+            target = field.m2m_reverse_field_name() + '_id'
+
+            changed = [
+                (instance, related[field.name])
+                for instance, related in zip(instances, relations)
+                if field.name in related
+            ]
+            if not changed:
+                continue
+
+            if replace:
+                pks = [instance.pk for instance, objs in changed]
+                through.objects.filter(**{f'{source}__in': pks}).delete()
+            through.objects.bulk_create([
+                through(**{source: instance.pk, target: obj.pk})
+                for instance, objs in changed
+                for obj in set(objs)
+            ], self.batch_size)
+            written = True
+
+        if written:
+            invalidate_responses('classroom')
+
+
+class RowEncoder:
+    """Builds the representation of a serializer from `values()` rows
+
+    The conversion of every field is worked out once, when the encoder is
+    built, so encoding a row is a single pass over precomputed getters.
+    Fields computed from model properties are given in `computed`, mapping
+    the field name to the column it is computed from and the function.
+    """
+    plain_fields = (
+        serializers.CharField,
+        serializers.ChoiceField,
+        serializers.IntegerField,
+        serializers.BooleanField,
+    )
+
+    def __init__(self, serializer_class, computed=None):
+        computed = computed or {}
+        serializer = serializer_class()
+        model = serializer.Meta.model
+        self.columns = []
+        self.steps = []
+
+        for name, field in serializer.fields.items():
+            if name in computed:
+                column, function = computed[name]
+                self._add_step(name, column, function)
+            elif isinstance(field, serializers.RelatedField):
+                column = model._meta.get_field(field.source).attname
+                self._add_step(name, column, None)
+            elif isinstance(field, self.plain_fields):
+                self._add_step(name, field.source, None)
+            else:
+                self._add_step(name, field.source, field.to_representation)
+
+    def _add_step(self, name, column, convert):
+        if column not in self.columns:
+            self.columns.append(column)
+        self.steps.append((name, itemgetter(column), convert))
+
+    def encode(self, row):
+        """Return the representation of a single row"""
+        data = {}
+        for name, get, convert in self.steps:
+            value = get(row)
+            if convert is not None and value is not None:
+                value = convert(value)
+            data[name] = value
+        return data
+
+    def encode_many(self, rows):
+        """Return the representations of all the rows"""
+        return [self.encode(row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def get_row_encoder(serializer_class):
+    """Return the row encoder of a member list serializer"""
+    return RowEncoder(
+        serializer_class,
+        computed={'firstname': ('fullname', get_firstname)},
+    )
+
+
+class StudentListSerializer(SparseFieldsSerializerMixin,
+                            serializers.ModelSerializer):
     """Serializer for the list view of the Student model"""
     firstname = serializers.ReadOnlyField()
     grade = serializers.PrimaryKeyRelatedField(queryset=Grade.objects.all())
 
+    default_exclude = [
+        'monthly_payment',
+        'register_date',
+        'departure_date',
+        'classes',
+        'guardian1',
+        'guardian2',
+        'last_modified',
+    ]
+    expandable_fields = {
+        'grade': (GradeSerializer, {}),
+        'classes': (ClassroomListSerializer, {'many': True}),
+    }
+    field_columns = {'firstname': ['fullname']}
+
     class Meta:
         model = Student
-        exclude = [
-            'monthly_payment',
-            'register_date',
-            'departure_date',
-            'classes',
-            'guardian1',
-            'guardian2',
-        ]
+        fields = '__all__'
         read_only_fields = ['id', 'firstname']
 
 
-class StudentDetailSerializer(serializers.ModelSerializer):
+class StudentDetailSerializer(SparseFieldsSerializerMixin,
+                              serializers.ModelSerializer):
     """Serializer for the detail view of the Student model"""
     firstname = serializers.ReadOnlyField()
     grade = GradeSerializer()
     classes = ClassroomListSerializer(many=True)
 
+    default_expand = ['grade', 'classes']
+    expandable_fields = StudentListSerializer.expandable_fields
+    field_columns = StudentListSerializer.field_columns
+
     class Meta:
         model = Student
         fields = '__all__'
@@ -48,11 +349,11 @@ class StudentCreateSerializer(serializers.ModelSerializer):
     register_date = serializers.DateField(format='iso-8601', required=False)
     departure_date = serializers.DateField(format='iso-8601', required=False)
     active = serializers.BooleanField(default=True)
-    grade = serializers.PrimaryKeyRelatedField(
+    grade = BulkPrimaryKeyRelatedField(
         queryset=Grade.objects.all(),
         required=False
     )
-    classes = serializers.PrimaryKeyRelatedField(
+    classes = BulkPrimaryKeyRelatedField(
         queryset=Classroom.objects.all(),
         many=True,
         required=False
@@ -62,6 +363,7 @@ class StudentCreateSerializer(serializers.ModelSerializer):
         model = Student
         fields = '__all__'
         read_only_fields = ['id', 'firstname']
+        list_serializer_class = MemberBulkSerializer
 
     def validate_birthdate(self, value):
         """Assures birth date is in the past"""
@@ -72,28 +374,41 @@ class StudentCreateSerializer(serializers.ModelSerializer):
         return value
 
 
-class TeacherListSerializer(serializers.ModelSerializer):
+class TeacherListSerializer(SparseFieldsSerializerMixin,
+                            serializers.ModelSerializer):
     """Serializer for the list view of the Teacher model"""
     firstname = serializers.ReadOnlyField()
 
+    default_exclude = [
+        'monthly_payment',
+        'register_date',
+        'departure_date',
+        'classes',
+        'bank_agency',
+        'bank_account',
+        'last_modified',
+    ]
+    expandable_fields = {
+        'classes': (ClassroomListSerializer, {'many': True}),
+    }
+    field_columns = {'firstname': ['fullname']}
+
     class Meta():
         model = Teacher
-        exclude = [
-            'monthly_payment',
-            'register_date',
-            'departure_date',
-            'classes',
-            'bank_agency',
-            'bank_account',
-        ]
+        fields = '__all__'
         read_only_fields = ['id', 'firstname']
 
 
-class TeacherDetailSerializer(serializers.ModelSerializer):
+class TeacherDetailSerializer(SparseFieldsSerializerMixin,
+                              serializers.ModelSerializer):
     """Serializer for the list view of the Teacher model"""
     firstname = serializers.ReadOnlyField()
     classes = ClassroomListSerializer(many=True)
 
+    default_expand = ['classes']
+    expandable_fields = TeacherListSerializer.expandable_fields
+    field_columns = TeacherListSerializer.field_columns
+
     class Meta():
         model = Teacher
         fields = '__all__'
@@ -103,7 +418,7 @@ class TeacherDetailSerializer(serializers.ModelSerializer):
 class TeacherCreateSerializer(serializers.ModelSerializer):
     """Serializer for the create view of the Teacher model"""
     firstname = serializers.ReadOnlyField()
-    classes = serializers.PrimaryKeyRelatedField(
+    classes = BulkPrimaryKeyRelatedField(
         queryset=Classroom.objects.all(),
         many=True
     )
@@ -113,6 +428,7 @@ class TeacherCreateSerializer(serializers.ModelSerializer):
         model = Teacher
         fields = '__all__'
         read_only_fields = ['id', 'firstname']
+        list_serializer_class = MemberBulkSerializer
 
     def validate_birthdate(self, value):
         """Assures the birth date is in the past"""
@@ -121,3 +437,53 @@ class TeacherCreateSerializer(serializers.ModelSerializer):
                 "Birth date must be on the past"
             ))
         return value
+
+
+class MemberDeactivateSerializer(serializers.Serializer):
+    """Serializer for the members to deactivate, by id or by list filters
+
+    `filter_lookups` maps the filters to the queryset lookups they apply.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False
+    )
+    classes = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False
+    )
+    departure_date = serializers.DateField(required=False)
+    unenroll = serializers.BooleanField(default=True)
+
+    filter_lookups = {'ids': 'pk__in'}
+
+    def validate(self, attrs):
+        """Check the members are chosen, so not every member is deactivated"""
+        filters = [*self.filter_lookups, 'classes']
+        if not any(name in attrs for name in filters):
+            raise serializers.ValidationError(
+                _('The ids or the filters of the members are required.')
+            )
+        return attrs
+
+
+class StudentDeactivateSerializer(MemberDeactivateSerializer):
+    """Serializer for the students to deactivate"""
+    grades = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False
+    )
+
+    filter_lookups = {'ids': 'pk__in', 'grades': 'grade__in'}
+
+
+class TeacherDeactivateSerializer(MemberDeactivateSerializer):
+    """Serializer for the teachers to deactivate"""
+    academic_level = serializers.ListField(
+        child=serializers.ChoiceField(
+            choices=Teacher._academic_level_choices
+        ),
+        required=False
+    )
+
+    filter_lookups = {'ids': 'pk__in', 'academic_level': 'academic_level__in'}
@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.db.models.signals import pre_save, post_save, post_delete, \
+    pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from member.models import Student, Teacher
+from member.search import get_search_fields, index_members
+from member.summary import get_summary_fields, add_to_summary, \
+    remove_from_summary, move_grade_to_no_grade
+from grade.models import Grade
+from classroom.models import Classroom
+from core.changes import record_changes, touch_objects
+
+
+@receiver(pre_save, sender=Student)
+@receiver(pre_save, sender=Teacher)
+def load_previous_summary_row(sender, instance, raw=False, **kwargs):
+    """Keep the stored values of a member about to change"""
+    instance._summary_previous = None
+    if not settings.MEMBER_STATS_SUMMARY or raw or instance.pk is None:
+        return
+
+    instance._summary_previous = sender.objects \
+        .filter(pk=instance.pk) \
+        .only(*get_summary_fields(sender)) \
+        .first()
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Teacher)
+def update_summary_on_save(sender, instance, raw=False, **kwargs):
+    """Move a saved member to its current summary row"""
+    if not settings.MEMBER_STATS_SUMMARY or raw:
+        return
+
+    previous = getattr(instance, '_summary_previous', None)
+    if previous is not None:
+        remove_from_summary([previous])
+    add_to_summary([instance])
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Teacher)
+def update_search_on_save(sender, instance, created=False, raw=False,
+                          update_fields=None, **kwargs):
+    """Write the searched text of a saved member"""
+    if raw or (update_fields is not None and
+               not get_search_fields(sender).intersection(update_fields)):
+        return
+    index_members([instance], created=created)
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Teacher)
+def update_summary_on_delete(sender, instance, **kwargs):
+    """Remove a deleted member from the summary"""
+    if settings.MEMBER_STATS_SUMMARY:
+        remove_from_summary([instance])
+
+
+@receiver(pre_delete, sender=Grade)
+def update_summary_on_grade_delete(sender, instance, **kwargs):
+    """Move the students of a deleted grade to the no grade summary rows"""
+    if settings.MEMBER_STATS_SUMMARY:
+        move_grade_to_no_grade(instance)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Teacher)
+def record_change_on_save(sender, instance, **kwargs):
+    """Record a saved member for the delta endpoint"""
+    record_changes(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Teacher)
+def record_change_on_delete(sender, instance, **kwargs):
+    """Record a deleted member for the delta endpoint"""
+    record_changes(sender, [instance.pk], deleted=True)
+
+
+@receiver(m2m_changed, sender=Student.classes.through)
+@receiver(m2m_changed, sender=Teacher.classes.through)
+def touch_on_classes_change(sender, instance, action, reverse, model,
+                            pk_set, **kwargs):
+    """Mark the members whose classes changed as modified
+
+    The members of a classroom being cleared are only known before.
+    """
+    if action not in ['post_add', 'post_remove', 'pre_clear']:
+        return
+
+    if not reverse:
+        instance.last_modified = touch_objects(type(instance), [instance.pk])
+        return
+
+    if pk_set is None:
+        pk_set = sender.objects \
+            .filter(classroom_id=instance.pk) \
+            .values_list(model.classes.field.m2m_field_name() + '_id',
+                         flat=True)
+    touch_objects(model, pk_set)
+
+
+@receiver(pre_delete, sender=Grade)
+def touch_students_on_grade_delete(sender, instance, **kwargs):
+    """Mark the students losing their grade as modified"""
+    touch_objects(
+        Student,
+        Student.objects.filter(grade=instance).values_list('pk', flat=True)
+    )
+
+
+@receiver(pre_delete, sender=Classroom)
+def touch_members_on_classroom_delete(sender, instance, **kwargs):
+    """Mark the members losing their enrollment in the class as modified"""
+    for model in [Student, Teacher]:
+        through = model.classes.through
+        source = model.classes.field.m2m_field_name() + '_id'
+        touch_objects(
+            model,
+            through.objects
+            .filter(classroom=instance)
+            .values_list(source, flat=True)
+        )
@@ -0,0 +1,273 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from member.models import Student, Teacher, MemberSummary
+from grade.models import Grade
+
+
+# The member fields the summary rows are grouped by or add up
+KEY_FIELDS = {
+    Student: ['grade', 'sex', 'active'],
+    Teacher: ['academic_level', 'sex', 'active'],
+}
+KINDS = {
+    Student: MemberSummary.STUDENT,
+    Teacher: MemberSummary.TEACHER,
+}
+# The values of a summary row read by the stats
+ROW_FIELDS = [
+    'kind', 'grade', 'academic_level', 'sex', 'active', 'members',
+    'monthly_payment',
+]
+
+
+def get_summary_fields(model):
+    """Return the fields of the model that change its summary row"""
+    if model not in KEY_FIELDS:
+        return set()
+    return {*KEY_FIELDS[model], 'monthly_payment'}
+
+
+def get_summary_key(member):
+    """Return the (kind, grade id, academic level, sex, active) of a member"""
+    return (
+        KINDS[type(member)],
+        getattr(member, 'grade_id', None),
+        getattr(member, 'academic_level', ''),
+        member.sex,
+        member.active,
+    )
+
+
+def add_to_summary(members, sign=1, using=None):
+    """Add the members to their summary rows, or remove them if sign is -1
+
+    The changes are added up by row first, so a bulk operation updates
+    each summary row once.
+    """
+    changes = defaultdict(lambda: [0, Decimal(0)])
+    for member in members:
+        if type(member) not in KINDS:
+            continue
+        change = changes[get_summary_key(member)]
+        change[0] += sign
+        change[1] += sign * Decimal(str(member.monthly_payment))
+
+    for key, (count, payment) in changes.items():
+        _change_summary_row(key, count, payment, using)
+
+
+def remove_from_summary(members, using=None):
+    """Remove the members from their summary rows"""
+    add_to_summary(members, sign=-1, using=using)
+
+
+def _change_summary_row(key, count, payment, using=None):
+    """Add the count and payment to a summary row, creating it if needed"""
+    kind, grade_id, academic_level, sex, active = key
+    lookup = {
+        'kind': kind,
+        'grade_id': grade_id,
+        'academic_level': academic_level,
+        'sex': sex,
+        'active': active,
+    }
+    rows = MemberSummary.objects.using(using).filter(**lookup)
+
+    if rows.update(
+        members=F('members') + count,
+        monthly_payment=F('monthly_payment') + payment
+    ):
+        return
+
+    try:
+        with transaction.atomic(using=using):
+            rows.create(**lookup, members=count, monthly_payment=payment)
+    except IntegrityError:
+        # Created by a concurrent transaction in the meantime
+        rows.update(
+            members=F('members') + count,
+            monthly_payment=F('monthly_payment') + payment
+        )
+
+
+def move_grade_to_no_grade(grade, using=None):
+    """Move the summary rows of a grade being deleted to the no grade rows
+
+    The students of a deleted grade are set to no grade with a single
+    update, which sends no signals.
+    """
+    rows = MemberSummary.objects.using(using).filter(grade=grade)
+    for row in rows:
+        _change_summary_row(
+            (row.kind, None, row.academic_level, row.sex, row.active),
+            row.members,
+            row.monthly_payment,
+            using
+        )
+    rows.delete()
+
+
+def move_to_inactive(model, pks, using=None):
+    """Move the active members with the ids to the inactive summary rows
+
+    The members are added up by summary row with one query instead of
+    being loaded, for deactivations done with a queryset update.
+    """
+    groups = model.objects.using(using) \
+        .filter(pk__in=pks, active=True) \
+        .order_by() \
+        .values(*[field for field in KEY_FIELDS[model] if field != 'active']) \
+        .annotate(members=Count('pk'), monthly_payment=Sum('monthly_payment'))
+
+    for group in groups:
+        key = (
+            KINDS[model],
+            group.get('grade'),
+            group.get('academic_level', ''),
+            group['sex'],
+        )
+        count, payment = group['members'], group['monthly_payment']
+        _change_summary_row((*key, True), -count, -payment, using)
+        _change_summary_row((*key, False), count, payment, using)
+
+
+def aggregate_summary_rows():
+    """Return the summary rows computed from the member tables
+
+    Each member table is grouped by its summary fields in a single query.
+    """
+    rows = []
+    for model, fields in KEY_FIELDS.items():
+        groups = model.objects \
+            .values(*fields) \
+            .annotate(
+                members=Count('pk'),
+                monthly_payment=Sum('monthly_payment')
+            ) \
+            .order_by()
+        for group in groups:
+            rows.append({
+                'kind': KINDS[model],
+                'grade': group.get('grade'),
+                'academic_level': group.get('academic_level', ''),
+                'sex': group['sex'],
+                'active': group['active'],
+                'members': group['members'],
+                'monthly_payment': group['monthly_payment'] or Decimal(0),
+            })
+
+    return rows
+
+
+def refresh_summary():
+    """Rebuild the summary rows from the member tables
+
+    Needed after changes the signals don't see, like queryset updates.
+    """
+    with transaction.atomic():
+        MemberSummary.objects.all().delete()
+        MemberSummary.objects.bulk_create([
+            MemberSummary(
+                kind=row['kind'],
+                grade_id=row['grade'],
+                academic_level=row['academic_level'],
+                sex=row['sex'],
+                active=row['active'],
+                members=row['members'],
+                monthly_payment=row['monthly_payment'],
+            )
+            for row in aggregate_summary_rows()
+        ])
+
+
+def get_stats():
+    """Return the member counts and monthly payments
+
+    Totals are given for the students and the teachers, broken down by
+    sex and by grade or academic level. Payments are strings, as in the
+    member api. They are rolled up from the summary rows, read from the
+    summary table when `MEMBER_STATS_SUMMARY` is on, or aggregated from
+    the member tables otherwise.
+    """
+    if settings.MEMBER_STATS_SUMMARY:
+        rows = MemberSummary.objects \
+            .filter(members__gt=0) \
+            .values(*ROW_FIELDS)
+    else:
+        rows = aggregate_summary_rows()
+
+    stats = {
+        'students': _get_totals(),
+        'teachers': _get_totals(),
+    }
+    stats['students'].update(by_grade={}, by_sex={})
+    stats['teachers'].update(by_academic_level={}, by_sex={})
+
+    for row in rows:
+        if row['kind'] == MemberSummary.STUDENT:
+            totals = stats['students']
+            group = 'by_grade', 'grade', row['grade']
+        else:
+            totals = stats['teachers']
+            group = 'by_academic_level', 'academic_level', \
+                row['academic_level']
+
+        _add_row(totals, row)
+        for breakdown, field, value in [group, ('by_sex', 'sex', row['sex'])]:
+            if value not in totals[breakdown]:
+                totals[breakdown][value] = _get_totals(**{field: value})
+            _add_row(totals[breakdown][value], row)
+
+    grades = dict(Grade.objects.filter(
+        id__in=stats['students']['by_grade']
+    ).values_list('id', 'name'))
+    for grade_id, totals in stats['students']['by_grade'].items():
+        totals['grade_name'] = grades.get(grade_id)
+
+    for totals in stats.values():
+        _format_payments(totals)
+        for breakdown in ['by_grade', 'by_academic_level', 'by_sex']:
+            if breakdown not in totals:
+                continue
+            groups = totals[breakdown]
+            totals[breakdown] = [
+                _format_payments(groups[key])
+                for key in sorted(groups, key=lambda key: (key is None, key))
+            ]
+
+    return stats
+
+
+def _get_totals(**group):
+    """Return empty totals for the given group"""
+    return {
+        **group,
+        'members': 0,
+        'active': 0,
+        'inactive': 0,
+        'monthly_payment': Decimal(0),
+        'active_monthly_payment': Decimal(0),
+    }
+
+
+def _add_row(totals, row):
+    """Add the counts and payments of a summary row to the totals"""
+    totals['members'] += row['members']
+    totals['monthly_payment'] += row['monthly_payment']
+    if row['active']:
+        totals['active'] += row['members']
+        totals['active_monthly_payment'] += row['monthly_payment']
+    else:
+        totals['inactive'] += row['members']
+
+
+def _format_payments(totals):
+    """Turn the payments of the totals into strings with two decimals"""
+    for field in ['monthly_payment', 'active_monthly_payment']:
+        totals[field] = str(totals[field].quantize(Decimal('0.01')))
+    return totals
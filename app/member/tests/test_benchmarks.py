@@ -0,0 +1,139 @@
+import os
+import time
+import statistics
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, tag
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from member.models import Student, Teacher
+from classroom.models import Classroom
+from core.utils import \
+    sample_student_payload, \
+    sample_teacher_payload, \
+    sample_classroom_payload, \
+    sample_grade, \
+    sample_user
+
+
+STUDENT_LIST_URL = reverse('member:student-list')
+TEACHER_LIST_URL = reverse('member:teacher-list')
+
+RUN_BENCHMARKS = bool(os.environ.get('RUN_BENCHMARKS'))
+
+
+def time_request(client, url, params, repeat=10):
+    """Return the median time in milliseconds to run the given request"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        res = client.get(url, params)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert res.status_code == status.HTTP_200_OK
+
+    return statistics.median(timings)
+
+
+@tag('benchmark')
+@skipUnless(RUN_BENCHMARKS, "Set RUN_BENCHMARKS=1 to run the benchmarks")
+class ClassesFilterBenchmark(TestCase):
+    """Benchmark the classes filter of the student list"""
+
+    students = 20000
+    classrooms = 200
+    classes_per_student = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        classrooms = Classroom.objects.bulk_create([
+            Classroom(**sample_classroom_payload())
+            for _ in range(cls.classrooms)
+        ])
+        students = Student.objects.bulk_create([
+            Student(**sample_student_payload(fullname=f'Student {i:06}'))
+            for i in range(cls.students)
+        ], batch_size=2000)
+
+        Enrollment = Student.classes.through
+        Enrollment.objects.bulk_create([
+            Enrollment(
+                student_id=student.id,
+                classroom_id=classrooms[(i + j) % cls.classrooms].id,
+            )
+            for i, student in enumerate(students)
+            for j in range(cls.classes_per_student)
+        ], batch_size=5000)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        cls.classroom_ids = [classroom.id for classroom in classrooms]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+
+    def test_classes_filter_on_100k_enrollments(self):
+        """Benchmark filtering the student list by three classes"""
+        params = {
+            'classes': ','.join(map(str, self.classroom_ids[:3])),
+            'page_size': 50,
+        }
+        res = self.client.get(STUDENT_LIST_URL, params)
+        ids = [student['id'] for student in res.data['results']]
+        self.assertEqual(len(ids), len(set(ids)))
+
+        median = time_request(self.client, STUDENT_LIST_URL, params)
+        self.assertLess(
+            median, 100,
+            f'classes filter, 100k enrollments: {median:.1f} ms'
+        )
+
+
+@tag('benchmark')
+@skipUnless(RUN_BENCHMARKS, "Set RUN_BENCHMARKS=1 to run the benchmarks")
+class FastListBenchmark(TestCase):
+    """Benchmark the fast list mode against the serializers"""
+
+    members = 5000
+
+    @classmethod
+    def setUpTestData(cls):
+        grade = sample_grade()
+        Student.objects.bulk_create([
+            Student(**sample_student_payload(
+                fullname=f'Student {i:06}',
+                grade=grade
+            ))
+            for i in range(cls.members)
+        ])
+        Teacher.objects.bulk_create([
+            Teacher(**sample_teacher_payload(fullname=f'Teacher {i:06}'))
+            for i in range(cls.members)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+
+    def assertFaster(self, url, label):
+        """Assert the fast mode builds the list at least twice as fast"""
+        serialized = time_request(self.client, url, {}, repeat=5)
+        fast = time_request(self.client, url, {'fast': 1}, repeat=5)
+        self.assertLess(
+            fast * 2, serialized,
+            f'{label}, {self.members} rows: serializer {serialized:.1f} ms,'
+            f' fast {fast:.1f} ms ({serialized / fast:.1f}x)'
+        )
+
+    def test_student_fast_list(self):
+        """Benchmark the student list in both modes"""
+        self.assertFaster(STUDENT_LIST_URL, 'student list')
+
+    def test_teacher_fast_list(self):
+        """Benchmark the teacher list in both modes"""
+        self.assertFaster(TEACHER_LIST_URL, 'teacher list')
@@ -0,0 +1,143 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from member.models import Student, Teacher
+from member.pagination import KeysetPagination
+from member.views import StudentViewSet, TeacherViewSet
+from grade.models import Grade
+from core.utils import sample_student_payload, sample_teacher_payload
+
+
+def list_queryset(viewset_class, params=None):
+    """Return the queryset the list action runs for the given parameters"""
+    request = APIRequestFactory().get('/', params or {})
+    view = viewset_class(action='list', request=Request(request))
+    return view.get_queryset()
+
+
+def cursor_page_queryset(queryset, position, page_size=50):
+    """Return the query of the keyset page after the given position"""
+    paginator = KeysetPagination()
+    paginator.reverse = False
+    return queryset \
+        .order_by(*paginator.ordering) \
+        .filter(paginator._keyset_filter(position))[:page_size + 1]
+
+
+@skipUnless(
+    connection.vendor == 'postgresql',
+    "Query plans are only checked on PostgreSQL"
+)
+class MemberListQueryPlanTests(TestCase):
+    """Test the member list queries are served by indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.grades = Grade.objects.bulk_create([
+            Grade(name=f'Grade {i}', rank=i) for i in range(10)
+        ])
+        Student.objects.bulk_create([
+            Student(**sample_student_payload(
+                fullname=f'Student {i:05}',
+                active=i % 10 != 0,
+                grade=cls.grades[i % 10],
+            ))
+            for i in range(2000)
+        ])
+        Teacher.objects.bulk_create([
+            Teacher(**sample_teacher_payload(
+                fullname=f'Teacher {i:05}',
+                academic_level=['Gr', 'Ms', 'Dr'][i % 3],
+            ))
+            for i in range(600)
+        ])
+
+        with connection.cursor() as cursor:
+            # Rows inserted in the trigram index wait in its pending list
+            # until a vacuum, which can't run in the test transaction
+            cursor.execute(
+                "SELECT gin_clean_pending_list('member_search_text_trgm_idx')"
+            )
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        # Sequential scans are made prohibitively expensive, so the planner
+        # only picks one when no index can serve the query
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertNoSeqScan(self, queryset):
+        """Assert the query plan of the queryset has no sequential scans"""
+        plan = queryset.explain()
+        self.assertNotIn('Seq Scan', plan, plan)
+
+    def test_student_list_plan(self):
+        """Test the default student list uses the indexes"""
+        self.assertNoSeqScan(list_queryset(StudentViewSet))
+
+    def test_student_list_page_plan(self):
+        """Test a page of the student list uses the active fullname index"""
+        queryset = list_queryset(StudentViewSet)[:50]
+        self.assertNoSeqScan(queryset)
+        self.assertIn('member_active_fullname_idx', queryset.explain())
+
+    def test_student_list_cursor_page_plan(self):
+        """Test a deep page of the student list seeks the fullname index"""
+        queryset = cursor_page_queryset(
+            list_queryset(StudentViewSet),
+            ('Student 01500', 1)
+        )
+        plan = queryset.explain()
+        self.assertNoSeqScan(queryset)
+        self.assertIn('member_active_fullname_idx', plan)
+        self.assertIn(
+            "Index Cond: ((fullname)::text >= 'Student 01500'::text)", plan
+        )
+
+    def test_student_list_show_inactive_plan(self):
+        """Test the student list including inactives uses the indexes"""
+        self.assertNoSeqScan(
+            list_queryset(StudentViewSet, {'show_inactive': 1})
+        )
+
+    def test_student_list_grades_filter_plan(self):
+        """Test the grades filter of the student list uses the indexes"""
+        grades = f'{self.grades[1].id},{self.grades[2].id}'
+        self.assertNoSeqScan(
+            list_queryset(StudentViewSet, {'grades': grades})
+        )
+
+    def test_teacher_list_plan(self):
+        """Test the default teacher list uses the indexes"""
+        self.assertNoSeqScan(list_queryset(TeacherViewSet))
+
+    def test_teacher_list_academic_level_filter_plan(self):
+        """Test the academic level filter of the teacher list uses indexes"""
+        self.assertNoSeqScan(
+            list_queryset(TeacherViewSet, {'academic_level': 'Ms,Dr'})
+        )
+
+    def test_student_search_plan(self):
+        """Test the student search uses the trigram index"""
+        queryset = list_queryset(StudentViewSet, {'search': '00042'})[:50]
+        self.assertNoSeqScan(queryset)
+        self.assertIn('member_search_text_trgm_idx', queryset.explain())
+
+    def test_student_common_search_plan(self):
+        """Test a search matching every student reads the closest first"""
+        queryset = list_queryset(StudentViewSet, {'search': 'student'})[:50]
+        plan = queryset.explain()
+        self.assertNoSeqScan(queryset)
+        self.assertIn('member_search_text_knn_idx', plan)
+        self.assertIn('Order By: (lower(text) <->>', plan)
+
+    def test_teacher_search_plan(self):
+        """Test the teacher search uses the trigram index"""
+        queryset = list_queryset(TeacherViewSet, {'search': 'teacher 0042'})
+        self.assertNoSeqScan(queryset[:50])
+        self.assertIn('member_search_text_trgm_idx', queryset[:50].explain())
@@ -0,0 +1,111 @@
+from django.test import TestCase, override_settings
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from member.serializers import \
+    StudentDetailSerializer, \
+    TeacherDetailSerializer
+from core.utils import \
+    sample_student, \
+    sample_teacher, \
+    sample_classroom, \
+    sample_grade, \
+    sample_user
+
+
+STUDENT_BATCH_URL = reverse('member:student-batch')
+TEACHER_BATCH_URL = reverse('member:teacher-batch')
+
+
+class MemberBatchApiTests(TestCase):
+    """Test retrieving many members by id at once"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.classroom = sample_classroom()
+
+    def get_batch(self, url, ids):
+        """Return the response of a batch request for the ids"""
+        return self.client.get(url, {'ids': ','.join(map(str, ids))})
+
+    def test_batch_retrieve_students(self):
+        """Test the students are returned as the detail, in the order asked"""
+        students = [sample_student(grade=sample_grade()) for _ in range(3)]
+        for student in students:
+            student.classes.add(self.classroom)
+        ids = [students[1].id, students[0].id, students[2].id]
+
+        with self.assertNumQueries(2):
+            res = self.get_batch(STUDENT_BATCH_URL, ids)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'],
+            StudentDetailSerializer(
+                [students[1], students[0], students[2]],
+                many=True
+            ).data
+        )
+        self.assertEqual(res.data['missing'], [])
+
+    def test_batch_retrieve_teachers(self):
+        """Test the teachers are returned as the detail"""
+        teacher = sample_teacher()
+        teacher.classes.add(self.classroom)
+
+        res = self.get_batch(TEACHER_BATCH_URL, [teacher.id])
+
+        self.assertEqual(
+            res.data['results'],
+            [TeacherDetailSerializer(teacher).data]
+        )
+
+    def test_batch_missing_ids(self):
+        """Test missing, inactive and repeated ids are reported once"""
+        student = sample_student()
+        inactive = sample_student(active=False)
+        teacher = sample_teacher()
+
+        res = self.get_batch(
+            STUDENT_BATCH_URL,
+            [teacher.id, student.id, inactive.id, student.id]
+        )
+
+        self.assertEqual(
+            [row['id'] for row in res.data['results']],
+            [student.id]
+        )
+        self.assertEqual(res.data['missing'], [teacher.id, inactive.id])
+
+    def test_batch_sparse_fields(self):
+        """Test the fields returned can be chosen as on the detail"""
+        student = sample_student()
+
+        res = self.client.get(
+            STUDENT_BATCH_URL,
+            {'ids': student.id, 'fields': 'fullname', 'expand': ''}
+        )
+
+        self.assertEqual(
+            res.data['results'],
+            [{'id': student.id, 'fullname': student.fullname}]
+        )
+
+    def test_batch_invalid_ids(self):
+        """Test the ids are required to be a list of integers"""
+        for params in [{}, {'ids': ''}, {'ids': '1,a'}]:
+            res = self.client.get(STUDENT_BATCH_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('ids', res.data)
+
+    @override_settings(BATCH_RETRIEVE_MAX_IDS=2)
+    def test_batch_max_ids(self):
+        """Test asking for more ids than allowed is rejected"""
+        res = self.get_batch(TEACHER_BATCH_URL, [1, 2, 3])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ids', res.data)
@@ -0,0 +1,320 @@
+import json
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from member.models import Student, Teacher
+from core.jobs import dequeue, run_job
+from core.models import Job
+from core.utils import \
+    sample_student_payload, \
+    sample_teacher_payload, \
+    sample_student, \
+    sample_teacher, \
+    sample_grade, \
+    sample_classroom, \
+    sample_user
+
+
+STUDENT_BULK_URL = reverse('member:student-bulk')
+TEACHER_BULK_URL = reverse('member:teacher-bulk')
+CLASSROOM_LIST_URL = reverse('classroom:classroom-list')
+
+
+class MemberBulkApiPublicTests(TestCase):
+    """Test the member bulk api for public requests"""
+
+    def test_unauthenticated_bulk_create_negative(self):
+        """Test an unauthenticated request cannot bulk create students"""
+        res = APIClient().post(
+            STUDENT_BULK_URL,
+            [sample_student_payload()],
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Student.objects.exists())
+
+
+class StudentBulkApiTests(TestCase):
+    """Test the student bulk api"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+
+        self.grade1 = sample_grade()
+        self.grade2 = sample_grade()
+        self.classroom1 = sample_classroom()
+        self.classroom2 = sample_classroom()
+
+    def test_bulk_create_students_positive(self):
+        """Test creating many students from a JSON array"""
+        payload = [
+            sample_student_payload(
+                fullname=f'Student {i}',
+                grade=self.grade1.id if i % 2 else self.grade2.id,
+                classes=[self.classroom1.id, self.classroom2.id][:i % 3],
+            )
+            for i in range(6)
+        ]
+        res = self.client.post(STUDENT_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 6)
+        self.assertEqual(Student.objects.count(), 6)
+        for row, created in zip(payload, res.data):
+            student = Student.objects.get(id=created['id'])
+            self.assertEqual(student.fullname, row['fullname'])
+            self.assertEqual(student.grade.id, row['grade'])
+            self.assertCountEqual(
+                student.classes.values_list('id', flat=True),
+                row['classes']
+            )
+
+    def test_bulk_create_updates_classroom_counts(self):
+        """Test the cached classroom counts follow the bulk enrollments"""
+        def get_counts():
+            res = self.client.get(CLASSROOM_LIST_URL, {'counts': 1})
+            return {row['id']: row['student_count'] for row in res.data}
+
+        self.assertEqual(get_counts()[self.classroom1.id], 0)
+        payload = [
+            sample_student_payload(classes=[self.classroom1.id])
+            for _ in range(2)
+        ]
+        self.client.post(STUDENT_BULK_URL, payload, format='json')
+
+        self.assertEqual(get_counts()[self.classroom1.id], 2)
+
+    def test_bulk_create_fixed_number_of_queries(self):
+        """Test the related objects are validated with one query each"""
+        def payload(count):
+            return [
+                sample_student_payload(
+                    grade=self.grade1.id,
+                    classes=[self.classroom1.id, self.classroom2.id],
+                )
+                for _ in range(count)
+            ]
+
+        # The content type recorded in the change log is cached afterwards
+        ContentType.objects.get_for_model(Student)
+        for count in [2, 50]:
+            with self.assertNumQueries(10):
+                res = self.client.post(
+                    STUDENT_BULK_URL,
+                    payload(count),
+                    format='json'
+                )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_bulk_create_students_ndjson(self):
+        """Test creating students from a newline delimited JSON body"""
+        body = '\n'.join(
+            json.dumps(sample_student_payload(fullname=f'Student {i}'))
+            for i in range(3)
+        )
+        res = self.client.post(
+            STUDENT_BULK_URL,
+            body + '\n',
+            content_type='application/x-ndjson'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Student.objects.count(), 3)
+
+    def test_bulk_create_invalid_ndjson(self):
+        """Test a malformed NDJSON line is reported"""
+        res = self.client.post(
+            STUDENT_BULK_URL,
+            json.dumps(sample_student_payload()) + '\n{invalid\n',
+            content_type='application/x-ndjson'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('line 2', res.data['detail'])
+
+    def test_bulk_create_reports_row_errors(self):
+        """Test the errors of each row are returned and nothing is saved"""
+        existing = sample_student()
+        payload = [
+            sample_student_payload(),
+            sample_student_payload(grade=9999),
+            sample_student_payload(classes=[self.classroom1.id, 'abc']),
+            sample_student_payload(id_doc=existing.id_doc),
+            sample_student_payload(id_doc='repeated'),
+            sample_student_payload(id_doc='repeated', birthdate='2100-01-01'),
+        ]
+        del payload[0]['fullname']
+        res = self.client.post(STUDENT_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data), 6)
+        self.assertIn('fullname', res.data[0])
+        self.assertIn('grade', res.data[1])
+        self.assertIn('classes', res.data[2])
+        self.assertIn('id_doc', res.data[3])
+        self.assertEqual(res.data[4], {})
+        self.assertIn('id_doc', res.data[5])
+        self.assertIn('birthdate', res.data[5])
+        self.assertEqual(Student.objects.count(), 1)
+
+    def test_bulk_create_requires_a_list(self):
+        """Test the body must be a list of members"""
+        res = self.client.post(
+            STUDENT_BULK_URL,
+            sample_student_payload(),
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_max_rows(self):
+        """Test the number of rows sent at once is limited"""
+        payload = [sample_student_payload() for _ in range(3)]
+        with self.settings(MEMBER_BULK_MAX_ROWS=2):
+            res = self.client.post(STUDENT_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Student.objects.exists())
+
+    def test_bulk_update_students_positive(self):
+        """Test updating many students at once"""
+        student1 = sample_student(grade=self.grade1)
+        student2 = sample_student(grade=self.grade1)
+        student2.classes.add(self.classroom1)
+        payload = [
+            {'id': student1.id, 'fullname': 'New Name', 'active': False},
+            {
+                'id': student2.id,
+                'grade': self.grade2.id,
+                'id_doc': student2.id_doc,
+                'classes': [self.classroom2.id],
+            },
+        ]
+        res = self.client.patch(STUDENT_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        student1.refresh_from_db()
+        student2.refresh_from_db()
+        self.assertEqual(student1.fullname, 'New Name')
+        self.assertFalse(student1.active)
+        self.assertEqual(student1.grade, self.grade1)
+        self.assertEqual(student2.grade, self.grade2)
+        self.assertEqual(list(student2.classes.all()), [self.classroom2])
+
+    def test_bulk_update_unknown_id(self):
+        """Test updating a student that does not exist fails"""
+        student = sample_student()
+        payload = [
+            {'id': student.id, 'fullname': 'New Name'},
+            {'id': 9999, 'fullname': 'Nobody'},
+            {'fullname': 'No id'},
+        ]
+        res = self.client.patch(STUDENT_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('id', res.data[1])
+        self.assertIn('id', res.data[2])
+        student.refresh_from_db()
+        self.assertNotEqual(student.fullname, 'New Name')
+
+    def test_bulk_create_in_background(self):
+        """Test the students can be created by a job"""
+        payload = [sample_student_payload() for _ in range(3)]
+        res = self.client.post(
+            STUDENT_BULK_URL + '?background=1', payload, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data['status'], Job.QUEUED)
+        self.assertEqual(
+            res['Location'],
+            reverse('core:job-detail', args=[res.data['id']])
+        )
+        self.assertEqual(Student.objects.count(), 0)
+
+        job = run_job(dequeue())
+
+        self.assertEqual(job.status, Job.DONE, job.error)
+        self.assertEqual((job.progress, job.total), (3, 3))
+        self.assertEqual(
+            sorted(job.result['ids']),
+            sorted(Student.objects.values_list('id', flat=True))
+        )
+
+    def test_bulk_update_in_background(self):
+        """Test the students can be updated by a job"""
+        student = sample_student(grade=self.grade1)
+        payload = [{'id': student.id, 'fullname': 'New Name'}]
+        res = self.client.patch(
+            STUDENT_BULK_URL + '?background=1', payload, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        job = run_job(dequeue())
+
+        self.assertEqual(job.status, Job.DONE, job.error)
+        self.assertEqual(job.result['ids'], [student.id])
+        student.refresh_from_db()
+        self.assertEqual(student.fullname, 'New Name')
+
+    def test_bulk_create_in_background_invalid_rows(self):
+        """Test the job fails with the row errors and saves nothing"""
+        payload = [
+            sample_student_payload(),
+            sample_student_payload(fullname=''),
+        ]
+        self.client.post(
+            STUDENT_BULK_URL + '?background=1', payload, format='json'
+        )
+
+        job = run_job(dequeue())
+
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.error, 'Some rows are invalid.')
+        self.assertEqual(job.result['errors'][0], {})
+        self.assertIn('fullname', job.result['errors'][1])
+        self.assertEqual(Student.objects.count(), 0)
+
+
+class TeacherBulkApiTests(TestCase):
+    """Test the teacher bulk api"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.classroom = sample_classroom()
+
+    def test_bulk_create_teachers_positive(self):
+        """Test creating many teachers at once"""
+        payload = [
+            sample_teacher_payload(classes=[self.classroom.id])
+            for _ in range(4)
+        ]
+        res = self.client.post(TEACHER_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Teacher.objects.count(), 4)
+        self.assertEqual(self.classroom.teachers.count(), 4)
+
+    def test_bulk_update_teachers_positive(self):
+        """Test updating many teachers at once"""
+        teachers = [sample_teacher() for _ in range(3)]
+        payload = [
+            {'id': teacher.id, 'academic_level': 'Dr'}
+            for teacher in teachers
+        ]
+        res = self.client.patch(TEACHER_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            Teacher.objects.filter(academic_level='Dr').count(),
+            3
+        )
@@ -0,0 +1,257 @@
+import datetime
+
+from django.test import TestCase
+from django.shortcuts import reverse
+from django.utils.http import http_date
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from member.models import Member, Student
+from classroom.models import Classroom
+from core.utils import \
+    sample_student_payload, \
+    sample_student, \
+    sample_teacher, \
+    sample_classroom, \
+    sample_grade, \
+    sample_user
+
+
+STUDENT_LIST_URL = reverse('member:student-list')
+TEACHER_LIST_URL = reverse('member:teacher-list')
+
+
+def student_detail_url(student_id):
+    return reverse('member:student-detail', args=[student_id])
+
+
+def teacher_detail_url(teacher_id):
+    return reverse('member:teacher-detail', args=[teacher_id])
+
+
+class MemberConditionalGetTests(TestCase):
+    """Test the member endpoints answer conditional requests"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.grade = sample_grade()
+        self.classroom = sample_classroom()
+        self.student = sample_student(grade=self.grade)
+        self.student.classes.add(self.classroom)
+
+    def assertNotModified(self, url, queries=1, **headers):
+        """Assert the request is answered with a 304 from the given queries"""
+        with self.assertNumQueries(queries):
+            res = self.client.get(url, **headers)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(res.content)
+        return res
+
+    def assertModified(self, url, etag):
+        """Assert the ETag sent no longer matches the response"""
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        return res
+
+    def test_detail_validators(self):
+        """Test the detail sends an ETag and when the member last changed"""
+        res = self.client.get(student_detail_url(self.student.id))
+        self.student.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', res)
+        self.assertEqual(
+            res['Last-Modified'],
+            http_date(self.student.last_modified.timestamp())
+        )
+
+    def test_detail_if_none_match(self):
+        """Test the detail is not sent again while the member is unchanged"""
+        url = student_detail_url(self.student.id)
+        etag = self.client.get(url)['ETag']
+
+        res = self.assertNotModified(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res['ETag'], etag)
+
+        self.student.fullname = 'Changed Name'
+        self.student.save()
+        self.assertModified(url, etag)
+
+    def test_detail_if_modified_since(self):
+        """Test If-Modified-Since is answered from the last modification"""
+        url = student_detail_url(self.student.id)
+        last_modified = self.client.get(url)['Last-Modified']
+
+        self.assertNotModified(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        before = self.student.last_modified - datetime.timedelta(seconds=1)
+        res = self.client.get(
+            url,
+            HTTP_IF_MODIFIED_SINCE=http_date(before.timestamp())
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_detail_related_changes(self):
+        """Test the detail changes with its grade, classes and enrollments"""
+        url = student_detail_url(self.student.id)
+
+        etag = self.client.get(url)['ETag']
+        self.grade.name = 'Renamed Grade'
+        self.grade.save()
+        etag = self.assertModified(url, etag)['ETag']
+
+        self.classroom.room = 'Another room'
+        self.classroom.save()
+        etag = self.assertModified(url, etag)['ETag']
+
+        self.classroom.students.remove(self.student)
+        self.assertModified(url, etag)
+
+    def test_detail_not_found(self):
+        """Test a missing member is still answered with a 404"""
+        res = self.client.get(
+            teacher_detail_url(self.student.id),
+            HTTP_IF_NONE_MATCH='*'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_if_none_match(self):
+        """Test the list is not sent again while no member changed"""
+        etag = self.client.get(STUDENT_LIST_URL)['ETag']
+
+        self.assertNotModified(
+            STUDENT_LIST_URL,
+            queries=0,
+            HTTP_IF_NONE_MATCH=etag
+        )
+
+        student = sample_student()
+        etag = self.assertModified(STUDENT_LIST_URL, etag)['ETag']
+
+        Member.objects.filter(pk=student.pk).delete()
+        self.assertModified(STUDENT_LIST_URL, etag)
+
+    def test_list_etag_by_filters(self):
+        """Test every filter and page of the list has its own ETag"""
+        etag = self.client.get(STUDENT_LIST_URL)['ETag']
+        res = self.client.get(
+            STUDENT_LIST_URL,
+            {'grades': self.grade.id},
+            HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('Last-Modified', res)
+
+    def test_list_expanded_relations_changes(self):
+        """Test the list changes with the relations it embeds"""
+        params = {'expand': 'grade,classes'}
+        etag = self.client.get(STUDENT_LIST_URL, params)['ETag']
+
+        self.grade.name = 'Renamed Grade'
+        self.grade.save()
+        res = self.client.get(
+            STUDENT_LIST_URL,
+            params,
+            HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]['grade']['name'], 'Renamed Grade')
+
+        self.classroom.room = 'Another room'
+        self.classroom.save()
+        res = self.client.get(
+            STUDENT_LIST_URL,
+            params,
+            HTTP_IF_NONE_MATCH=res['ETag']
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]['classes'][0]['room'], 'Another room')
+
+    def test_teacher_list_if_none_match(self):
+        """Test the teacher list answers conditional requests too"""
+        sample_teacher()
+        etag = self.client.get(TEACHER_LIST_URL)['ETag']
+
+        self.assertNotModified(
+            TEACHER_LIST_URL,
+            queries=0,
+            HTTP_IF_NONE_MATCH=etag
+        )
+
+    def test_list_queryset_changes(self):
+        """Test the list changes with members updated without save()"""
+        etag = self.client.get(STUDENT_LIST_URL)['ETag']
+
+        Student.objects.filter(pk=self.student.pk).deactivate()
+        etag = self.assertModified(STUDENT_LIST_URL, etag)['ETag']
+
+        self.student.fullname = 'Bulk Name'
+        Student.objects.bulk_update([self.student], ['fullname'])
+        self.assertModified(STUDENT_LIST_URL, etag)
+
+
+class LastModifiedTests(TestCase):
+    """Test the last modification times are kept current"""
+
+    def setUp(self):
+        self.grade = sample_grade()
+        self.classroom = sample_classroom(grade=self.grade)
+        self.student = sample_student(grade=self.grade)
+        self.teacher = sample_teacher()
+        self.student.classes.add(self.classroom)
+        self.teacher.classes.add(self.classroom)
+
+    def assertTouched(self, obj):
+        """Assert the stored last modification time of the object moved"""
+        previous = obj.last_modified
+        obj.refresh_from_db()
+        self.assertGreater(obj.last_modified, previous)
+
+    def test_classes_change(self):
+        """Test changing the classes of a member marks it as modified"""
+        previous = self.teacher.last_modified
+        self.teacher.classes.clear()
+        self.assertGreater(self.teacher.last_modified, previous)
+        self.assertEqual(
+            Member.objects.get(pk=self.teacher.pk).last_modified,
+            self.teacher.last_modified
+        )
+
+        self.classroom.students.clear()
+        self.assertTouched(self.student)
+
+    def test_bulk_update(self):
+        """Test bulk updated members are marked as modified"""
+        previous = self.student.last_modified
+        self.student.fullname = 'Bulk Name'
+        Student.objects.bulk_update([self.student], ['fullname'])
+
+        self.student.refresh_from_db()
+        self.assertGreater(self.student.last_modified, previous)
+
+    def test_bulk_create(self):
+        """Test bulk created members get a last modification time"""
+        students = Student.objects.bulk_create([
+            Student(**sample_student_payload())
+        ])
+
+        self.assertIsNotNone(students[0].last_modified)
+
+    def test_grade_delete(self):
+        """Test the students and classrooms losing a grade are modified"""
+        self.grade.delete()
+
+        self.assertTouched(self.student)
+        self.assertTouched(self.classroom)
+
+    def test_classroom_delete(self):
+        """Test the members losing an enrollment are modified"""
+        Classroom.objects.filter(pk=self.classroom.pk).delete()
+
+        self.assertTouched(self.student)
+        self.assertTouched(self.teacher)
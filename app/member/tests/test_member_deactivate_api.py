@@ -0,0 +1,161 @@
+import datetime
+
+from django.test import TestCase, override_settings
+from django.shortcuts import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from member.models import Member, Student, Teacher
+from member.summary import get_stats, refresh_summary
+from core.models import Change
+from core.utils import \
+    sample_student, \
+    sample_teacher, \
+    sample_classroom, \
+    sample_grade, \
+    sample_user
+
+
+STUDENT_DEACTIVATE_URL = reverse('member:student-deactivate')
+TEACHER_DEACTIVATE_URL = reverse('member:teacher-deactivate')
+CLASSROOM_LIST_URL = reverse('classroom:classroom-list')
+
+
+class MemberDeactivateApiTests(TestCase):
+    """Test deactivating many members at once"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.grade = sample_grade()
+        self.classroom = sample_classroom()
+        self.students = [sample_student(grade=self.grade) for _ in range(3)]
+        self.classroom.students.add(*self.students)
+
+    def deactivate(self, payload, url=STUDENT_DEACTIVATE_URL):
+        """Post the deactivation and return the response"""
+        return self.client.post(url, payload, format='json')
+
+    def get_active_ids(self, model=Student):
+        """Return the ids of the active members of the model"""
+        return set(
+            model.objects.filter(active=True).values_list('pk', flat=True)
+        )
+
+    def test_deactivate_by_ids(self):
+        """Test the members with the ids are deactivated and unenrolled"""
+        teacher = sample_teacher()
+        res = self.deactivate({
+            'ids': [self.students[0].id, self.students[1].id, teacher.id],
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            'deactivated': 2,
+            'enrollments_removed': 2,
+        })
+        self.assertEqual(self.get_active_ids(), {self.students[2].id})
+        self.assertEqual(
+            set(self.classroom.students.values_list('pk', flat=True)),
+            {self.students[2].id}
+        )
+        self.assertEqual(
+            Student.objects.get(pk=self.students[0].pk).departure_date,
+            timezone.localdate()
+        )
+        self.assertTrue(Teacher.objects.get(pk=teacher.pk).active)
+
+    def test_deactivate_again(self):
+        """Test deactivating inactive members changes nothing"""
+        payload = {'ids': [self.students[0].id]}
+        self.deactivate(payload)
+        res = self.deactivate(payload)
+
+        self.assertEqual(res.data, {
+            'deactivated': 0,
+            'enrollments_removed': 0,
+        })
+
+    def test_deactivate_keep_enrollments(self):
+        """Test the enrollments are kept when asked"""
+        res = self.deactivate({
+            'ids': [self.students[0].id],
+            'departure_date': '2026-06-30',
+            'unenroll': False,
+        })
+
+        self.assertEqual(res.data['enrollments_removed'], 0)
+        self.assertEqual(self.classroom.students.count(), 3)
+        self.assertEqual(
+            Student.objects.get(pk=self.students[0].pk).departure_date,
+            datetime.date(2026, 6, 30)
+        )
+
+    def test_deactivate_by_filters(self):
+        """Test the members matching the list filters are deactivated"""
+        other = sample_student(grade=sample_grade())
+        unenrolled = sample_student(grade=self.grade)
+        res = self.deactivate({
+            'grades': [self.grade.id],
+            'classes': [self.classroom.id],
+        })
+
+        self.assertEqual(res.data['deactivated'], 3)
+        self.assertEqual(self.get_active_ids(), {other.id, unenrolled.id})
+
+    def test_deactivate_teachers_by_level(self):
+        """Test the teachers can be deactivated by academic level"""
+        doctor = sample_teacher(academic_level='Dr')
+        master = sample_teacher(academic_level='Ms')
+        res = self.deactivate(
+            {'academic_level': ['Dr']},
+            TEACHER_DEACTIVATE_URL
+        )
+
+        self.assertEqual(res.data['deactivated'], 1)
+        self.assertEqual(self.get_active_ids(Teacher), {master.id})
+        self.assertFalse(Teacher.objects.get(pk=doctor.pk).active)
+
+    def test_deactivate_without_filters_negative(self):
+        """Test a deactivation without ids or filters is rejected"""
+        for payload in [{}, {'departure_date': '2026-06-30'}]:
+            res = self.deactivate(payload)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(self.get_active_ids()), 3)
+
+    @override_settings(MEMBER_DEACTIVATE_CHUNK_SIZE=2)
+    def test_deactivate_in_chunks(self):
+        """Test every member is deactivated, modified and recorded"""
+        previous = Member.objects.get(pk=self.students[0].pk).last_modified
+        Change.objects.all().delete()
+        res = self.deactivate({'grades': [self.grade.id]})
+
+        self.assertEqual(res.data['deactivated'], 3)
+        self.assertFalse(self.get_active_ids())
+        self.assertGreater(
+            Member.objects.get(pk=self.students[0].pk).last_modified,
+            previous
+        )
+        self.assertEqual(Change.objects.count(), 3)
+
+    def test_deactivate_updates_classroom_counts(self):
+        """Test the cached classroom counts follow the removed enrollments"""
+        self.client.get(CLASSROOM_LIST_URL, {'counts': 1})
+        self.deactivate({'ids': [self.students[0].id]})
+        res = self.client.get(CLASSROOM_LIST_URL, {'counts': 1})
+
+        self.assertEqual(res.data[0]['student_count'], 2)
+
+    @override_settings(MEMBER_STATS_SUMMARY=True)
+    def test_deactivate_updates_summary(self):
+        """Test the member summary follows the deactivation"""
+        refresh_summary()
+        student = sample_student(grade=self.grade, sex='F')
+        self.deactivate({'ids': [self.students[0].id, student.id]})
+
+        from_summary = get_stats()
+        with override_settings(MEMBER_STATS_SUMMARY=False):
+            self.assertEqual(from_summary, get_stats())
@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+
+from django.test import TestCase
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.utils import \
+    sample_student, sample_teacher, sample_grade, sample_user
+
+
+STUDENT_EXPORT_URL = reverse('member:student-export')
+TEACHER_EXPORT_URL = reverse('member:teacher-export')
+
+
+def streamed_text(response):
+    """Return the whole content of a streaming response as text"""
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+class MemberExportApiPublicTests(TestCase):
+    """Test the member export api for public requests"""
+
+    def test_unauthenticated_export_negative(self):
+        """Test an unauthenticated request cannot export the students"""
+        res = APIClient().get(STUDENT_EXPORT_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class MemberExportApiTests(TestCase):
+    """Test the member export api for authenticated requests"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+
+        self.grade = sample_grade()
+        self.student1 = sample_student(
+            fullname='Bob Builder',
+            grade=self.grade,
+            monthly_payment=150.5
+        )
+        self.student2 = sample_student(fullname='Ann Archer')
+        self.student3 = sample_student(fullname='Carl Inactive', active=False)
+
+    def test_export_students_ndjson(self):
+        """Test exporting the students as newline delimited JSON"""
+        res = self.client.get(STUDENT_EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertTrue(res['Content-Type'].startswith('application/x-ndjson'))
+        rows = [json.loads(line) for line in streamed_text(res).splitlines()]
+        self.assertEqual(
+            [row['id'] for row in rows],
+            [self.student2.id, self.student1.id]
+        )
+        self.assertEqual(rows[1]['monthly_payment'], '150.50')
+        self.assertEqual(rows[1]['grade'], self.grade.id)
+        self.assertEqual(rows[1]['birthdate'], '2000-05-13')
+        self.assertIn('guardian1', rows[1])
+        self.assertNotIn('member_ptr', rows[1])
+
+    def test_export_students_csv(self):
+        """Test exporting the students as CSV"""
+        res = self.client.get(STUDENT_EXPORT_URL, {'format': 'csv'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/csv'))
+        self.assertIn('students.csv', res['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(streamed_text(res))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1]['fullname'], 'Bob Builder')
+        self.assertEqual(rows[1]['monthly_payment'], '150.50')
+        self.assertEqual(rows[0]['grade'], '')
+
+    def test_export_csv_from_accept_header(self):
+        """Test the format can be chosen with the Accept header"""
+        res = self.client.get(STUDENT_EXPORT_URL, HTTP_ACCEPT='text/csv')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/csv'))
+
+    def test_export_honors_filters(self):
+        """Test the export applies the same filters as the list"""
+        res = self.client.get(STUDENT_EXPORT_URL, {
+            'show_inactive': 1,
+            'grades': f'{self.grade.id}',
+        })
+        rows = [json.loads(line) for line in streamed_text(res).splitlines()]
+
+        self.assertEqual([row['id'] for row in rows], [self.student1.id])
+
+        res = self.client.get(STUDENT_EXPORT_URL, {'show_inactive': 1})
+        self.assertEqual(len(streamed_text(res).splitlines()), 3)
+
+    def test_export_teachers(self):
+        """Test exporting the teachers includes their payment details"""
+        teacher = sample_teacher(academic_level='Dr')
+        sample_teacher(academic_level='Ms')
+        res = self.client.get(TEACHER_EXPORT_URL, {'academic_level': 'Dr'})
+        rows = [json.loads(line) for line in streamed_text(res).splitlines()]
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], teacher.id)
+        self.assertIn('bank_account', rows[0])
+        self.assertIn('monthly_payment', rows[0])
@@ -0,0 +1,97 @@
+from django.test import TestCase, override_settings
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from member.serializers import \
+    StudentListSerializer, TeacherListSerializer, get_row_encoder
+from core.utils import \
+    sample_student, sample_teacher, sample_grade, sample_classroom, \
+    sample_user
+
+
+STUDENT_LIST_URL = reverse('member:student-list')
+TEACHER_LIST_URL = reverse('member:teacher-list')
+
+
+class MemberFastListParityTests(TestCase):
+    """Test the fast list mode returns the same data as the serializers"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+
+        self.grade = sample_grade()
+        self.classroom = sample_classroom()
+        sample_student(fullname='Mary Jane Watson', grade=self.grade)
+        sample_student(fullname='Peter', sex='F', birthdate='1999-12-31')
+        sample_student(fullname='Old Student', active=False)
+        student = sample_student(fullname='Anna Class', grade=self.grade)
+        student.classes.add(self.classroom)
+
+        sample_teacher(fullname='Teacher One', academic_level='Dr')
+        sample_teacher(fullname='Teacher Two', academic_level='Gr')
+        sample_teacher(fullname='Teacher Gone', active=False)
+
+    def assertParity(self, url, params=None):
+        """Assert the fast and serializer responses have the same content"""
+        params = params or {}
+        res = self.client.get(url, params)
+        fast = self.client.get(url, {**params, 'fast': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        if 'results' in res.data:
+            self.assertEqual(fast.data['results'], res.data['results'])
+            self.assertEqual(
+                bool(fast.data['next']),
+                bool(res.data['next'])
+            )
+        else:
+            self.assertEqual(fast.content, res.content)
+
+    def test_student_list_parity(self):
+        """Test the fast student list matches the serializer output"""
+        self.assertParity(STUDENT_LIST_URL)
+        self.assertParity(STUDENT_LIST_URL, {'show_inactive': 1})
+
+    def test_student_list_parity_with_filters(self):
+        """Test the fast student list applies the same filters"""
+        self.assertParity(STUDENT_LIST_URL, {'grades': f'{self.grade.id}'})
+        self.assertParity(
+            STUDENT_LIST_URL,
+            {'classes': f'{self.classroom.id}'}
+        )
+
+    def test_student_list_parity_paginated(self):
+        """Test the fast student list pages are the same"""
+        self.assertParity(STUDENT_LIST_URL, {'page_size': 2})
+        first = self.client.get(STUDENT_LIST_URL, {'page_size': 2})
+        fast = self.client.get(first.data['next'] + '&fast=1')
+        second = self.client.get(first.data['next'])
+
+        self.assertEqual(fast.data['results'], second.data['results'])
+
+    def test_teacher_list_parity(self):
+        """Test the fast teacher list matches the serializer output"""
+        self.assertParity(TEACHER_LIST_URL, {'show_inactive': 1})
+        self.assertParity(TEACHER_LIST_URL, {'academic_level': 'Dr'})
+
+    @override_settings(MEMBER_FAST_LIST=True)
+    def test_fast_list_setting(self):
+        """Test the fast mode can be turned on by the setting"""
+        res = self.client.get(STUDENT_LIST_URL, {'fast': 0})
+        fast = self.client.get(STUDENT_LIST_URL)
+
+        self.assertEqual(fast.content, res.content)
+
+    def test_row_encoder_columns(self):
+        """Test the encoders read the columns the serializers need"""
+        student_encoder = get_row_encoder(StudentListSerializer)
+        teacher_encoder = get_row_encoder(TeacherListSerializer)
+
+        self.assertIn('grade_id', student_encoder.columns)
+        self.assertIn('fullname', student_encoder.columns)
+        self.assertNotIn('firstname', student_encoder.columns)
+        self.assertIn('academic_level', teacher_encoder.columns)
@@ -0,0 +1,178 @@
+import json
+from base64 import urlsafe_b64encode
+
+from django.test import TestCase, override_settings
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from member.models import Student, Teacher
+from core.utils import \
+    sample_student, sample_teacher, sample_grade, sample_classroom, \
+    sample_user
+
+
+STUDENT_LIST_URL = reverse('member:student-list')
+TEACHER_LIST_URL = reverse('member:teacher-list')
+
+
+class MemberListPaginationTests(TestCase):
+    """Test the keyset pagination of the member list apis"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+
+        self.grade1 = sample_grade()
+        self.grade2 = sample_grade()
+        self.classroom = sample_classroom()
+
+        names = ['Eve', 'Bob', 'Carl', 'Ann', 'Bob', 'Dan', 'Fred']
+        for i, name in enumerate(names):
+            student = sample_student(
+                fullname=name,
+                grade=self.grade1 if i % 2 else self.grade2
+            )
+            if i < 4:
+                student.classes.add(self.classroom)
+
+        sample_student(fullname='Zed', active=False)
+
+    def _get_all_pages(self, url, params):
+        """Follow the next links and return the ids and number of pages"""
+        ids = []
+        pages = 0
+        res = self.client.get(url, params)
+
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids += [member['id'] for member in res.data['results']]
+            pages += 1
+            if not res.data['next']:
+                break
+            res = self.client.get(res.data['next'])
+
+        return ids, pages
+
+    def test_list_not_paginated_by_default(self):
+        """Test the list is a plain list when no page size is requested"""
+        res = self.client.get(STUDENT_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(res.data, list)
+        self.assertEqual(len(res.data), 7)
+
+    def test_paginate_student_list(self):
+        """Test paging through the whole student list in order"""
+        expected = list(
+            Student.get_active()
+            .order_by('fullname', 'id')
+            .values_list('id', flat=True)
+        )
+        ids, pages = self._get_all_pages(STUDENT_LIST_URL, {'page_size': 3})
+
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_first_page_has_no_previous_link(self):
+        """Test the first page links to the next one only"""
+        res = self.client.get(STUDENT_LIST_URL, {'page_size': 3})
+
+        self.assertEqual(len(res.data['results']), 3)
+        self.assertIsNone(res.data['previous'])
+        self.assertIsNotNone(res.data['next'])
+
+    def test_previous_link_returns_previous_page(self):
+        """Test following the previous link goes back one page"""
+        first = self.client.get(STUDENT_LIST_URL, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+        third = self.client.get(second.data['next'])
+        back = self.client.get(third.data['previous'])
+
+        self.assertEqual(back.status_code, status.HTTP_200_OK)
+        self.assertEqual(back.data['results'], second.data['results'])
+        self.assertIsNotNone(back.data['next'])
+        self.assertIsNotNone(back.data['previous'])
+
+    def test_paginate_with_filters(self):
+        """Test the filters are kept while paging"""
+        expected = list(
+            Student.objects
+            .filter(grade=self.grade1, classes=self.classroom)
+            .order_by('fullname', 'id')
+            .values_list('id', flat=True)
+        )
+        ids, pages = self._get_all_pages(STUDENT_LIST_URL, {
+            'page_size': 1,
+            'grades': f'{self.grade1.id}',
+            'classes': f'{self.classroom.id}',
+        })
+
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, len(expected))
+
+    def test_paginate_show_inactive(self):
+        """Test paging includes inactive members when requested"""
+        ids, _ = self._get_all_pages(
+            STUDENT_LIST_URL,
+            {'page_size': 5, 'show_inactive': 1}
+        )
+
+        self.assertEqual(len(ids), Student.objects.count())
+
+    def test_page_size_is_capped(self):
+        """Test the page size cannot go over the configured maximum"""
+        with self.settings(MEMBER_LIST_MAX_PAGE_SIZE=2):
+            res = self.client.get(STUDENT_LIST_URL, {'page_size': 100})
+
+        self.assertEqual(len(res.data['results']), 2)
+
+    @override_settings(MEMBER_LIST_PAGE_SIZE=4)
+    def test_default_page_size_setting(self):
+        """Test the list is paginated when a default page size is set"""
+        res = self.client.get(STUDENT_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 4)
+
+    def test_invalid_cursor(self):
+        """Test an invalid cursor returns not found"""
+        res = self.client.get(
+            STUDENT_LIST_URL,
+            {'page_size': 2, 'cursor': 'invalid'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_invalid_values(self):
+        """Test a cursor with values of the wrong type returns not found"""
+        for position in [['Ann', 'abc'], ['Ann', None], [['Ann'], 1],
+                         ['Ann'], 'Ann']:
+            cursor = urlsafe_b64encode(
+                json.dumps({'p': position}).encode('utf-8')
+            ).decode('ascii')
+            res = self.client.get(
+                STUDENT_LIST_URL,
+                {'page_size': 2, 'cursor': cursor}
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_paginate_teacher_list(self):
+        """Test paging through the teacher list with filters"""
+        for level in ['Gr', 'Ms', 'Dr', 'Ms', 'Ms']:
+            sample_teacher(fullname=f'Teacher {level}', academic_level=level)
+        expected = list(
+            Teacher.objects
+            .filter(academic_level='Ms')
+            .order_by('fullname', 'id')
+            .values_list('id', flat=True)
+        )
+        ids, pages = self._get_all_pages(
+            TEACHER_LIST_URL,
+            {'page_size': 2, 'academic_level': 'Ms'}
+        )
+
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 2)
@@ -0,0 +1,170 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from member.models import Student, Teacher, MemberSearch
+from member.search import build_search_text, search_members
+from core.utils import \
+    sample_student_payload, \
+    sample_student, \
+    sample_teacher, \
+    sample_user
+
+
+STUDENT_LIST_URL = reverse('member:student-list')
+TEACHER_LIST_URL = reverse('member:teacher-list')
+
+
+def search_ids(res):
+    """Return the ids of the members in a search response"""
+    return [member['id'] for member in res.data]
+
+
+class MemberSearchTests(TestCase):
+    """Test searching the member lists"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+
+    def test_build_search_text(self):
+        """Test the searched text is normalized and has the phone digits"""
+        text = build_search_text(
+            'José Álvares', 'AB-123', 'Jose@Mail.com', '+55 (41) 9999',
+            '', None
+        )
+
+        self.assertEqual(
+            text,
+            'jose alvares ab-123 jose@mail.com +55 (41) 9999 55419999'
+        )
+
+    def test_search_students_by_name(self):
+        """Test students are found by part of their name, without accents"""
+        student = sample_student(fullname='Amélia Rodrigues')
+        sample_student(fullname='Bruno Costa')
+
+        res = self.client.get(STUDENT_LIST_URL, {'search': 'amelia rodri'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(search_ids(res), [student.id])
+
+    def test_search_every_field(self):
+        """Test students are found by document, email, phone or guardian"""
+        student = sample_student(
+            id_doc='XK-7781',
+            email='amelia@school.org',
+            phone_number='+55 (41) 98765-4321',
+            guardian2='Carla Mendes',
+        )
+        sample_student()
+
+        for term in ['xk-7781', 'amelia@school', '987654321', 'mendes']:
+            res = self.client.get(STUDENT_LIST_URL, {'search': term})
+            self.assertEqual(search_ids(res), [student.id], term)
+
+    def test_search_best_matches_first(self):
+        """Test the closest matches are returned first"""
+        partial = sample_student(fullname='Marianne Souza')
+        exact = sample_student(fullname='Maria Souza')
+
+        res = self.client.get(STUDENT_LIST_URL, {'search': 'maria'})
+
+        self.assertEqual(search_ids(res), [exact.id, partial.id])
+
+    def test_search_keeps_filters(self):
+        """Test the search only returns members matching the list filters"""
+        active = sample_student(fullname='Paulo Lima')
+        inactive = sample_student(fullname='Paulo Lima', active=False)
+
+        res = self.client.get(STUDENT_LIST_URL, {'search': 'paulo'})
+        self.assertEqual(search_ids(res), [active.id])
+
+        res = self.client.get(
+            STUDENT_LIST_URL,
+            {'search': 'paulo', 'show_inactive': 1}
+        )
+        self.assertEqual(set(search_ids(res)), {active.id, inactive.id})
+
+    def test_search_teachers(self):
+        """Test teachers are searched apart from the students"""
+        teacher = sample_teacher(fullname='Helena Prado')
+        sample_student(fullname='Helena Prado')
+
+        res = self.client.get(TEACHER_LIST_URL, {'search': 'helena'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(search_ids(res), [teacher.id])
+
+    def test_search_too_short(self):
+        """Test searching for less than the minimum characters fails"""
+        res = self.client.get(STUDENT_LIST_URL, {'search': 'ab c'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('search', res.data)
+
+    @override_settings(MEMBER_SEARCH_MAX_RESULTS=3)
+    def test_search_results_limit(self):
+        """Test only the best page size matches are returned"""
+        Student.objects.bulk_create([
+            Student(**sample_student_payload(fullname=f'Student {i}'))
+            for i in range(5)
+        ])
+
+        res = self.client.get(STUDENT_LIST_URL, {'search': 'student'})
+        self.assertEqual(len(res.data), 3)
+
+        res = self.client.get(
+            STUDENT_LIST_URL,
+            {'search': 'student', 'page_size': 2}
+        )
+        self.assertEqual(len(res.data), 2)
+
+    def test_index_kept_current(self):
+        """Test the searched text follows saves and bulk operations"""
+        student = sample_student(fullname='Old Name')
+        student.fullname = 'New Name'
+        student.save()
+        created = Student.objects.bulk_create([
+            Student(**sample_student_payload(fullname='Bulk Name'))
+        ])
+        created[0].fullname = 'Renamed'
+        Student.objects.bulk_update(created, ['fullname'])
+
+        queryset = Student.objects.all()
+        self.assertEqual(
+            list(search_members(queryset, ['new'])), [student]
+        )
+        self.assertFalse(search_members(queryset, ['old']).exists())
+        self.assertEqual(
+            list(search_members(queryset, ['renamed'])), created
+        )
+        self.assertFalse(search_members(queryset, ['bulk']).exists())
+
+    def test_index_removed_with_member(self):
+        """Test the searched text is deleted with its member"""
+        student = sample_student()
+        student.delete()
+
+        self.assertFalse(MemberSearch.objects.exists())
+
+    def test_refresh_search_command(self):
+        """Test the command rebuilds the searched text of every member"""
+        student = sample_student(fullname='Ana Reis')
+        teacher = sample_teacher(fullname='Ana Reis')
+        Student.objects.filter(pk=student.pk).update(fullname='Bia Reis')
+        MemberSearch.objects.filter(pk=teacher.pk).delete()
+
+        call_command('refresh_member_search', stdout=StringIO())
+
+        self.assertEqual(
+            list(search_members(Student.objects.all(), ['bia'])), [student]
+        )
+        self.assertEqual(
+            list(search_members(Teacher.objects.all(), ['ana'])), [teacher]
+        )
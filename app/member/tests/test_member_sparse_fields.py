@@ -0,0 +1,144 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from grade.serializers import GradeSerializer
+from classroom.serializers import ClassroomListSerializer
+from core.utils import \
+    sample_student, \
+    sample_teacher, \
+    sample_classroom, \
+    sample_grade, \
+    sample_user
+
+
+STUDENT_LIST_URL = reverse('member:student-list')
+TEACHER_LIST_URL = reverse('member:teacher-list')
+
+
+def student_detail_url(student_id):
+    return reverse('member:student-detail', args=[student_id])
+
+
+def teacher_detail_url(teacher_id):
+    return reverse('member:teacher-detail', args=[teacher_id])
+
+
+class MemberSparseFieldsTests(TestCase):
+    """Test choosing the fields and relations of the member views"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+        self.grade = sample_grade()
+        self.classroom = sample_classroom()
+        self.student = sample_student(grade=self.grade)
+        self.student.classes.add(self.classroom)
+        self.teacher = sample_teacher()
+        self.teacher.classes.add(self.classroom)
+
+    def get_queries(self, url, params):
+        """Return the response and the queries run for the request"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res, [query['sql'] for query in queries]
+
+    def test_list_fields(self):
+        """Test the list only returns and loads the fields asked for"""
+        res, queries = self.get_queries(
+            STUDENT_LIST_URL,
+            {'fields': 'firstname,email'}
+        )
+
+        self.assertEqual(res.data, [{
+            'id': self.student.id,
+            'firstname': self.student.firstname,
+            'email': self.student.email,
+        }])
+        self.assertIn('"member_member"."fullname"', queries[-1])
+        self.assertNotIn('"member_member"."address"', queries[-1])
+
+    def test_list_fields_outside_defaults(self):
+        """Test the list can return fields it leaves out by default"""
+        res = self.client.get(
+            STUDENT_LIST_URL,
+            {'fields': 'monthly_payment,classes'}
+        )
+
+        self.assertEqual(res.data[0]['classes'], [self.classroom.id])
+        self.assertIn('monthly_payment', res.data[0])
+
+    def test_list_expand(self):
+        """Test the relations of the list can be nested"""
+        res, queries = self.get_queries(
+            STUDENT_LIST_URL,
+            {'fields': 'fullname', 'expand': 'grade,classes'}
+        )
+
+        self.assertEqual(
+            res.data[0]['grade'],
+            GradeSerializer(self.grade).data
+        )
+        self.assertEqual(
+            res.data[0]['classes'],
+            [ClassroomListSerializer(self.classroom).data]
+        )
+        self.assertIn('"grade_grade"', queries[-2])
+
+    def test_list_expand_query_count(self):
+        """Test nesting the classes takes a single query for every row"""
+        for _ in range(3):
+            sample_student().classes.add(sample_classroom())
+
+        with self.assertNumQueries(2):
+            res = self.client.get(TEACHER_LIST_URL, {'expand': 'classes'})
+
+        self.assertEqual(len(res.data[0]['classes']), 1)
+
+    def test_detail_without_expansion(self):
+        """Test the detail returns ids for the relations not expanded"""
+        res, queries = self.get_queries(
+            student_detail_url(self.student.id),
+            {'expand': 'classes'}
+        )
+
+        self.assertEqual(res.data['grade'], self.grade.id)
+        self.assertEqual(
+            res.data['classes'],
+            [ClassroomListSerializer(self.classroom).data]
+        )
+        self.assertNotIn('"grade_grade"."name"', queries[-2])
+
+    def test_detail_fields(self):
+        """Test the detail only returns the fields asked for, still nested"""
+        res = self.client.get(
+            teacher_detail_url(self.teacher.id),
+            {'fields': 'bank_account,classes'}
+        )
+
+        self.assertEqual(set(res.data), {'id', 'bank_account', 'classes'})
+        self.assertEqual(
+            res.data['classes'],
+            [ClassroomListSerializer(self.classroom).data]
+        )
+
+    def test_fast_list_with_fields(self):
+        """Test the fast list also returns only the fields asked for"""
+        res = self.client.get(
+            STUDENT_LIST_URL,
+            {'fast': 1, 'fields': 'fullname'}
+        )
+
+        self.assertEqual(set(res.data[0]), {'id', 'fullname'})
+
+    def test_unknown_field_negative(self):
+        """Test asking for an unknown field is rejected"""
+        res = self.client.get(STUDENT_LIST_URL, {'fields': 'password'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
@@ -0,0 +1,197 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.shortcuts import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from member.models import Student, Teacher, MemberSummary
+from member.summary import get_stats, refresh_summary
+from core.utils import \
+    sample_student_payload, \
+    sample_teacher_payload, \
+    sample_student, \
+    sample_teacher, \
+    sample_grade, \
+    sample_user
+
+
+STATS_URL = reverse('member:stats')
+
+
+class MemberStatsTestMixin:
+    """Sample members shared by the stats tests"""
+
+    def create_members(self):
+        self.grade = sample_grade(name='First')
+        sample_student(grade=self.grade, sex='F', monthly_payment=100)
+        sample_student(grade=self.grade, sex='M', monthly_payment=150.5)
+        sample_student(sex='F', monthly_payment=200, active=False)
+        sample_teacher(academic_level='Dr', sex='M', monthly_payment=3000)
+        sample_teacher(academic_level='Ms', sex='F', monthly_payment=2000)
+
+
+class MemberStatsTests(MemberStatsTestMixin, TestCase):
+    """Test the stats aggregated from the member tables"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(sample_user())
+
+    def test_empty_stats(self):
+        """Test the stats with no members"""
+        stats = get_stats()
+
+        self.assertEqual(stats['students']['members'], 0)
+        self.assertEqual(stats['students']['monthly_payment'], '0.00')
+        self.assertEqual(stats['students']['by_grade'], [])
+        self.assertEqual(stats['teachers']['by_academic_level'], [])
+
+    def test_student_stats(self):
+        """Test the student totals and their breakdowns"""
+        self.create_members()
+        students = get_stats()['students']
+
+        self.assertEqual(students['members'], 3)
+        self.assertEqual(students['active'], 2)
+        self.assertEqual(students['inactive'], 1)
+        self.assertEqual(students['monthly_payment'], '450.50')
+        self.assertEqual(students['active_monthly_payment'], '250.50')
+        self.assertEqual(students['by_grade'], [
+            {
+                'grade': self.grade.id,
+                'grade_name': 'First',
+                'members': 2,
+                'active': 2,
+                'inactive': 0,
+                'monthly_payment': '250.50',
+                'active_monthly_payment': '250.50',
+            },
+            {
+                'grade': None,
+                'grade_name': None,
+                'members': 1,
+                'active': 0,
+                'inactive': 1,
+                'monthly_payment': '200.00',
+                'active_monthly_payment': '0.00',
+            },
+        ])
+        self.assertEqual(
+            [(group['sex'], group['members']) for group in students['by_sex']],
+            [('F', 2), ('M', 1)]
+        )
+
+    def test_teacher_stats(self):
+        """Test the teacher totals by academic level"""
+        self.create_members()
+        teachers = get_stats()['teachers']
+
+        self.assertEqual(teachers['members'], 2)
+        self.assertEqual(teachers['monthly_payment'], '5000.00')
+        self.assertEqual(
+            [
+                (group['academic_level'], group['monthly_payment'])
+                for group in teachers['by_academic_level']
+            ],
+            [('Dr', '3000.00'), ('Ms', '2000.00')]
+        )
+
+    def test_stats_queries(self):
+        """Test the stats take one query per member table and the grades"""
+        self.create_members()
+        with self.assertNumQueries(3):
+            get_stats()
+
+    def test_retrieve_stats(self):
+        """Test retrieving the stats"""
+        self.create_members()
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, get_stats())
+
+    def test_stats_need_authentication(self):
+        """Test the stats can't be retrieved without authentication"""
+        res = APIClient().get(STATS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(MEMBER_STATS_SUMMARY=True)
+class MemberSummaryTests(MemberStatsTestMixin, TestCase):
+    """Test the stats read from the summary table"""
+
+    def assertSummaryCurrent(self):
+        """Assert the summary gives the same stats as the member tables"""
+        from_summary = get_stats()
+        with override_settings(MEMBER_STATS_SUMMARY=False):
+            self.assertEqual(from_summary, get_stats())
+
+    def test_summary_follows_saves(self):
+        """Test the summary follows created and updated members"""
+        self.create_members()
+        self.assertSummaryCurrent()
+
+        student = Student.objects.filter(grade=self.grade).first()
+        student.grade = None
+        student.active = False
+        student.monthly_payment = 80
+        student.save()
+        self.assertSummaryCurrent()
+
+        teacher = Teacher.objects.get(academic_level='Dr')
+        teacher.academic_level = 'Ms'
+        teacher.save()
+        self.assertSummaryCurrent()
+
+    def test_summary_follows_deletes(self):
+        """Test the summary follows deleted members and grades"""
+        self.create_members()
+        Teacher.objects.get(academic_level='Dr').delete()
+        self.grade.delete()
+
+        self.assertSummaryCurrent()
+        self.assertFalse(MemberSummary.objects.filter(
+            grade__isnull=False
+        ).exists())
+
+    def test_summary_follows_bulk_operations(self):
+        """Test the summary follows bulk creates and updates"""
+        self.create_members()
+        students = Student.objects.bulk_create([
+            Student(**sample_student_payload(grade=self.grade))
+            for _ in range(3)
+        ] + [Student(**sample_student_payload(sex='F'))])
+        Teacher.objects.bulk_create([
+            Teacher(**sample_teacher_payload(academic_level='Gr'))
+        ])
+        self.assertSummaryCurrent()
+
+        for student in students:
+            student.active = False
+            student.monthly_payment = 10
+        Student.objects.bulk_update(students, ['active', 'monthly_payment'])
+        self.assertSummaryCurrent()
+
+    def test_summary_read_in_one_query(self):
+        """Test the stats take two queries with the summary"""
+        self.create_members()
+        with self.assertNumQueries(2):
+            get_stats()
+
+    def test_refresh_summary(self):
+        """Test the summary is rebuilt after changes the signals miss"""
+        self.create_members()
+        Student.objects.update(monthly_payment=1)
+        refresh_summary()
+        self.assertSummaryCurrent()
+
+    def test_refresh_command(self):
+        """Test the command rebuilding the summary"""
+        self.create_members()
+        MemberSummary.objects.all().delete()
+        call_command('refresh_member_summary', stdout=StringIO())
+
+        self.assertSummaryCurrent()
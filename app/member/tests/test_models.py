@@ -1,7 +1,11 @@
 from django.test import TestCase
 
-from member.models import Member
-from core.utils import sample_member
+from member.models import Member, Student, Teacher
+from core.utils import \
+    sample_member, \
+    sample_student_payload, \
+    sample_teacher_payload, \
+    sample_grade
 
 
 class MemberTests(TestCase):
@@ -27,3 +31,40 @@ class MemberTests(TestCase):
         self.assertIn(member1, actives)
         self.assertIn(member2, actives)
         self.assertNotIn(member3, actives)
+
+
+class MemberBulkCreateTests(TestCase):
+    """Test bulk creating the member subclasses"""
+
+    def test_bulk_create_students(self):
+        """Test bulk creating students inserts the member and student rows"""
+        grade = sample_grade()
+        students = Student.objects.bulk_create([
+            Student(**sample_student_payload(fullname=f'Student {i}'))
+            for i in range(5)
+        ] + [Student(**sample_student_payload(grade=grade))])
+
+        self.assertEqual(Student.objects.count(), 6)
+        self.assertEqual(Member.objects.count(), 6)
+        for student in students:
+            self.assertIsNotNone(student.pk)
+            self.assertEqual(student.pk, student.id)
+            self.assertIsNotNone(student.register_date)
+        self.assertEqual(Student.objects.get(pk=students[-1].pk).grade, grade)
+        self.assertEqual(
+            Student.objects.get(pk=students[0].pk).fullname,
+            'Student 0'
+        )
+
+    def test_bulk_create_teachers_in_batches(self):
+        """Test bulk creating teachers split in several batches"""
+        teachers = Teacher.objects.bulk_create(
+            [Teacher(**sample_teacher_payload()) for _ in range(7)],
+            batch_size=3
+        )
+
+        self.assertEqual(Teacher.objects.count(), 7)
+        self.assertCountEqual(
+            Teacher.objects.values_list('id', flat=True),
+            [teacher.id for teacher in teachers]
+        )
@@ -36,6 +36,18 @@ class StudentDetailApiPositiveTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, self.serializer.data)
 
+    def test_detail_view_fixed_number_of_queries(self):
+        """Test the grade and classes are fetched with a fixed query count"""
+        for _ in range(5):
+            self.student.classes.add(sample_classroom())
+
+        with self.assertNumQueries(3):
+            res = self.client.get(student_detail_url(self.student.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['classes']), 6)
+        self.assertEqual(res.data['grade']['id'], self.grade.id)
+
 
 class StudentDetailApiNegativeTests(TestCase):
     """Test the student detail api for unsuccessful requests"""
@@ -122,6 +122,19 @@ class StudentListApiPositiveTests(TestCase):
         self.assertNotIn(self.student4_serializer.data, res.data)
         self.assertNotIn(self.student5_serializer.data, res.data)
 
+    def test_student_list_filter_classroom_no_duplicates(self):
+        """Test a student in many of the filtered classes is listed once"""
+        self.student1.classes.add(self.classroom1, self.classroom3)
+        res = self.client.get(
+            STUDENT_LIST_URL,
+            {'classes': f'{self.classroom1.id},{self.classroom2.id}'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 2)
+        self.assertIn(self.student1_serializer.data, res.data)
+        self.assertIn(self.student2_serializer.data, res.data)
+
     def test_student_list_multiple_filters_positive(self):
         """Test successfully retrieving students list with multiple filters"""
         res = self.client.get(
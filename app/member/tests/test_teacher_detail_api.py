@@ -57,6 +57,17 @@ class TeacherDetailApiPositiveTests(TestCase):
             res.data['classes']
         )
 
+    def test_teacher_detail_fixed_number_of_queries(self):
+        """Test the detail view does not query each classroom separately"""
+        for i in range(5):
+            self.teacher.classes.add(sample_classroom(name=f"Extra{i}"))
+
+        with self.assertNumQueries(3):
+            res = self.client.get(teacher_detail_url(self.teacher.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['classes']), 7)
+
 
 class TeacherDetailApiNegativeTests(TestCase):
     """Test the teacher detail api for unsuccessful requests"""
@@ -109,6 +109,21 @@ class TeacherListPositiveTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_teacher_list_filter_classes_no_duplicates(self):
+        """Test a teacher in many of the filtered classes is listed once"""
+        self.teacher1.classes.add(self.classroom2, self.classroom3)
+        res = self.client.get(TEACHER_LIST_URL, {
+            'classes': f'{self.classroom1.id},{self.classroom2.id},'
+                       f'{self.classroom3.id}'
+        })
+        serializer = TeacherListSerializer(
+            [self.teacher1, self.teacher2, self.teacher3],
+            many=True
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, serializer.data)
+
     def test_teacher_list_multiple_filters_positive(self):
         """Test successfully listing teacher with multiple filters"""
         res = self.client.get(TEACHER_LIST_URL, {
@@ -1,6 +1,8 @@
+from django.urls import path
+
 from rest_framework.routers import DefaultRouter
 
-from member.views import StudentViewSet, TeacherViewSet
+from member.views import StudentViewSet, TeacherViewSet, MemberStatsView
 
 
 app_name = 'member'
@@ -9,4 +11,6 @@ router = DefaultRouter()
 router.register('students', StudentViewSet)
 router.register('teachers', TeacherViewSet)
 
-urlpatterns = router.urls
+urlpatterns = [
+    path('stats/', MemberStatsView.as_view(), name='stats'),
+] + router.urls
@@ -1,16 +1,254 @@
-from rest_framework import viewsets, mixins, permissions
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils.translation import gettext_lazy as _
 
+from rest_framework import viewsets, mixins, permissions, serializers, \
+    status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from member.bulk import save_members
 from member.models import Student, Teacher
+from member.pagination import KeysetPagination
+from member.search import MIN_WORD_LENGTH, get_search_words, \
+    search_members
+from member.summary import get_stats
 from member.serializers import \
     StudentListSerializer, \
     StudentDetailSerializer, \
     StudentCreateSerializer, \
     TeacherListSerializer, \
     TeacherDetailSerializer, \
-    TeacherCreateSerializer
+    TeacherCreateSerializer, \
+    StudentDeactivateSerializer, \
+    TeacherDeactivateSerializer, \
+    get_row_encoder
+from core.batch import BatchRetrieveMixin
+from core.conditional import ConditionalGetMixin
+from core.jobs import enqueue
+from core.middleware import SerializerTimingMixin
+from core.serializers import JobSerializer
+from core.sparse import SparseFieldsMixin
+from core.utils import get_int_from_param
+from core.parsers import NDJSONParser
+from core.renderers import NDJSONRenderer, CSVRenderer
+
+
+class MemberBulkMixin:
+    """Adds an action creating or updating many members at once"""
+
+    @action(
+        detail=False,
+        methods=['post', 'patch'],
+        parser_classes=[JSONParser, NDJSONParser],
+    )
+    def bulk(self, request):
+        """Create (POST) or update (PATCH) the members in the request
+
+        The body is either a JSON array or NDJSON, one member per line. Rows
+        being updated must include their id. Nothing is saved unless every
+        row is valid, otherwise a list with the errors of each row is returned.
+        With `?background=1` the rows are saved by a job, which is returned
+        to follow its progress.
+        """
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {'detail': _('Expected a list of members.')},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > settings.MEMBER_BULK_MAX_ROWS:
+            return Response(
+                {'detail': _('At most %(max)d members can be sent at once.')
+                    % {'max': settings.MEMBER_BULK_MAX_ROWS}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        partial = request.method == 'PATCH'
+        background = request.query_params.get('background')
+        if background in serializers.BooleanField.TRUE_VALUES:
+            job = enqueue(
+                'import_members',
+                {
+                    'model': self.queryset.model._meta.model_name,
+                    'rows': rows,
+                    'partial': partial,
+                },
+                user=request.user
+            )
+            return Response(
+                JobSerializer(job).data,
+                status=status.HTTP_202_ACCEPTED,
+                headers={
+                    'Location': reverse('core:job-detail', args=[job.pk])
+                }
+            )
+
+        members = save_members(
+            self.get_serializer_class(),
+            rows,
+            partial,
+            self.get_serializer_context()
+        )
+
+        return Response(
+            self.serializer_class(members, many=True).data,
+            status=status.HTTP_200_OK if partial else status.HTTP_201_CREATED
+        )
+
+
+class MemberDeactivateMixin:
+    """Adds an action deactivating many members at once"""
+
+    @action(detail=False, methods=['post'])
+    def deactivate(self, request):
+        """Deactivate the active members with the ids or filters sent
+
+        The filters are the ones of the list, sent in the body. The members
+        get the `departure_date` sent, today by default, and lose their
+        enrollments unless `unenroll` is false. The number of members
+        deactivated and of enrollments removed is returned.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        queryset = self.queryset.filter(**{
+            lookup: data[name]
+            for name, lookup in serializer.filter_lookups.items()
+            if name in data
+        })
+        if 'classes' in data:
+            queryset = _filter_by_classes(queryset, data['classes'])
+
+        deactivated, unenrolled = queryset.deactivate(
+            data.get('departure_date'),
+            data['unenroll']
+        )
+        return Response({
+            'deactivated': deactivated,
+            'enrollments_removed': unenrolled,
+        })
+
+
+class MemberExportMixin:
+    """Adds an action streaming the filtered members as NDJSON or CSV"""
+
+    @action(detail=False, renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """Stream every member matching the list filters
+
+        Rows are read from a server side cursor in chunks and written out
+        as they arrive, so memory use does not grow with the table. The
+        format is chosen with `?format=ndjson|csv` or the Accept header.
+        """
+        model = self.queryset.model
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not field.remote_field or not field.remote_field.parent_link
+        ]
+        rows = self.get_queryset() \
+            .values_list(*[field.attname for field in fields]) \
+            .iterator(chunk_size=settings.MEMBER_EXPORT_CHUNK_SIZE)
+
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream([field.name for field in fields], rows),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
+        filename = f'{model._meta.verbose_name_plural}.{renderer.format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+        return response
+
+
+class MemberFastListMixin:
+    """Adds a fast list mode building the rows without a serializer
+
+    The mode is turned on for every request by the `MEMBER_FAST_LIST`
+    setting, or per request with the `fast` query parameter. The response
+    is the same, but rows are read with `values()` and encoded directly.
+    """
+
+    def list(self, request, *args, **kwargs):
+        fast = get_int_from_param(request.query_params.get('fast'))
+        if fast is None:
+            fast = settings.MEMBER_FAST_LIST
+        # The rows are encoded with the default fields only
+        if not fast or self.get_sparse_params() != (None, None):
+            return super().list(request, *args, **kwargs)
+
+        encoder = get_row_encoder(self.get_serializer_class())
+        rows = self.filter_queryset(self.get_queryset()) \
+            .values(*encoder.columns)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(encoder.encode_many(page))
+
+        return Response(encoder.encode_many(rows))
+
+
+class MemberSearchMixin:
+    """Adds the `search` parameter to the member lists
+
+    Members containing every word of the search in their name, document,
+    email, phone or guardians are returned, the best matches first. The
+    results are not paginated, only the best `page_size` matches, up to
+    `MEMBER_SEARCH_MAX_RESULTS`, are returned.
+    """
+    search_query_param = 'search'
+
+    def get_search_words(self):
+        """Return the words searched, or None when not searching"""
+        term = self.request.query_params.get(self.search_query_param)
+        if term is None:
+            return None
+
+        words = get_search_words(term)
+        if not any(len(word) >= MIN_WORD_LENGTH for word in words):
+            raise ValidationError({self.search_query_param: [
+                _('Search for at least %(min)d characters.')
+                % {'min': MIN_WORD_LENGTH}
+            ]})
+        return words
+
+    def search_queryset(self, queryset):
+        """Return the queryset matching the search, if any"""
+        words = self.get_search_words()
+        if words is None:
+            return queryset
+        return search_members(queryset, words)
+
+    def paginate_queryset(self, queryset):
+        if self.request.query_params.get(self.search_query_param) is None:
+            return super().paginate_queryset(queryset)
+
+        limit = settings.MEMBER_SEARCH_MAX_RESULTS
+        page_size = self.paginator.get_page_size(self.request)
+        return list(queryset[:min(page_size or limit, limit)])
+
+    def get_paginated_response(self, data):
+        if self.request.query_params.get(self.search_query_param) is None:
+            return super().get_paginated_response(data)
+        return Response(data)
 
 
 class StudentViewSet(
+    SerializerTimingMixin,
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    BatchRetrieveMixin,
+    MemberSearchMixin,
+    MemberBulkMixin,
+    MemberDeactivateMixin,
+    MemberExportMixin,
+    MemberFastListMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -22,21 +260,25 @@ class StudentViewSet(
     queryset = Student.objects.all()
     serializer_class = StudentListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    last_modified_dependencies = ['grade', 'classes', 'classes__grade']
 
     def get_serializer_class(self):
         """Return the appropriate serializer class"""
-        if self.action == 'retrieve':
+        if self.action in ['retrieve', 'batch']:
             return StudentDetailSerializer
-        if self.action in ['create', 'update', 'partial_update']:
+        if self.action in ['create', 'update', 'partial_update', 'bulk']:
             return StudentCreateSerializer
+        if self.action == 'deactivate':
+            return StudentDeactivateSerializer
         return self.serializer_class
 
     def get_queryset(self):
         """Return the sorted queryset after applying the filters"""
-        filtered = self.queryset
+        filtered = self.get_sparse_queryset(self.queryset)
 
         show_inactive = self.request.query_params.get('show_inactive')
-        show_inactive = _get_int_from_param(show_inactive)
+        show_inactive = get_int_from_param(show_inactive)
         if not show_inactive or not bool(show_inactive):
             filtered = filtered.filter(active=True)
 
@@ -48,12 +290,21 @@ class StudentViewSet(
         classes = self.request.query_params.get('classes')
         classes = _get_list_from_param(classes)
         if classes:
-            filtered = filtered.filter(classes__id__in=classes)
+            filtered = _filter_by_classes(filtered, classes)
 
-        return filtered.order_by('fullname')
+        return self.search_queryset(filtered.order_by('fullname', 'id'))
 
 
 class TeacherViewSet(
+    SerializerTimingMixin,
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    BatchRetrieveMixin,
+    MemberSearchMixin,
+    MemberBulkMixin,
+    MemberDeactivateMixin,
+    MemberExportMixin,
+    MemberFastListMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -65,21 +316,25 @@ class TeacherViewSet(
     queryset = Teacher.objects.all()
     serializer_class = TeacherListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    last_modified_dependencies = ['classes', 'classes__grade']
 
     def get_serializer_class(self):
         """Return the appropriate serializer class"""
-        if self.action == 'retrieve':
+        if self.action in ['retrieve', 'batch']:
             return TeacherDetailSerializer
-        if self.action in ['create', 'update', 'partial_update']:
+        if self.action in ['create', 'update', 'partial_update', 'bulk']:
             return TeacherCreateSerializer
+        if self.action == 'deactivate':
+            return TeacherDeactivateSerializer
         return self.serializer_class
 
     def get_queryset(self):
         """Return the filtered and sorted queryset"""
-        queryset = self.queryset
+        queryset = self.get_sparse_queryset(self.queryset)
 
         show_inactive = self.request.query_params.get('show_inactive')
-        show_inactive = _get_int_from_param(show_inactive)
+        show_inactive = get_int_from_param(show_inactive)
         if not show_inactive:
             queryset = queryset.filter(active=True)
 
@@ -91,22 +346,34 @@ class TeacherViewSet(
         classes = self.request.query_params.get('classes')
         classes = _get_list_from_param(classes)
         if classes:
-            queryset = queryset.filter(classes__id__in=classes)
+            queryset = _filter_by_classes(queryset, classes)
 
-        return queryset.order_by('fullname')
+        return self.search_queryset(queryset.order_by('fullname', 'id'))
 
 
-def _get_int_from_param(param_str):
-    """Return a integer from the parameter string"""
-    if not param_str:
-        return None
+class MemberStatsView(APIView):
+    """Member counts and monthly payments for the dashboards"""
 
-    try:
-        i = int(param_str)
-    except ValueError:
-        return None
-    else:
-        return i
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """Return the stats of the students and teachers"""
+        return Response(get_stats())
+
+
+def _filter_by_classes(queryset, classes):
+    """Return the members enrolled in any of the given classes
+
+    The enrollments are checked with an EXISTS subquery instead of a join,
+    so members attending more than one of the classes are not repeated.
+    """
+    field = queryset.model.classes.field
+    enrollments = field.remote_field.through.objects.filter(**{
+        field.m2m_field_name(): OuterRef('pk'),
+        f'{field.m2m_reverse_field_name()}__in': classes,
+    })
+
+    return queryset.filter(Exists(enrollments))
 
 
 def _get_list_from_param(param_str):